@@ -10,6 +10,15 @@ from .connection_postgres import get_postgres_connection, get_postgres_cursor
 logger = logging.getLogger(__name__)
 
 class DatabaseAdapter:
+    """
+    Shared connection and cursor used by the repositories.
+
+    The lock only guards individual calls, while a query and its fetch are
+    separate calls, so repository methods must not be run concurrently from
+    several threads; code that needs parallel queries should open its own
+    connections with get_postgres_connection().
+    """
+
     def __init__(self) -> None:
         self._lock = threading.RLock()
         self._connection: Optional[psycopg2.extensions.connection] = None
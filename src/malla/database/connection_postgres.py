@@ -42,17 +42,21 @@ def get_postgres_connection() -> psycopg2.extensions.connection:
         raise
 
 
-def get_postgres_cursor(conn: psycopg2.extensions.connection) -> RealDictCursor:
+def get_postgres_cursor(
+    conn: psycopg2.extensions.connection, name: str | None = None
+) -> RealDictCursor:
     """
     Get a cursor with dict-like row access for PostgreSQL.
 
     Args:
         conn: PostgreSQL connection
+        name: Optional name to open a server-side cursor, which keeps the
+            result set in PostgreSQL and sends rows as they are fetched
 
     Returns:
         RealDictCursor: Cursor that returns rows as dictionaries
     """
-    return conn.cursor(cursor_factory=RealDictCursor)
+    return conn.cursor(name=name, cursor_factory=RealDictCursor)
 
 
 def get_sqlalchemy_engine() -> Engine:
@@ -165,6 +169,7 @@ def create_postgres_schema() -> None:
                 "CREATE INDEX IF NOT EXISTS idx_packet_traceroute_nodes ON packet_history(from_node_id, to_node_id, timestamp DESC) WHERE portnum_name = 'TRACEROUTE_APP'",
                 # Position data indexes
                 "CREATE INDEX IF NOT EXISTS idx_packet_position_lookup ON packet_history(portnum, from_node_id, timestamp DESC) WHERE portnum = 3 AND raw_payload IS NOT NULL",
+                "CREATE INDEX IF NOT EXISTS idx_packet_position_timestamp ON packet_history(portnum, timestamp DESC) WHERE portnum = 3 AND raw_payload IS NOT NULL",
                 # Node info indexes
                 "CREATE INDEX IF NOT EXISTS idx_node_hex_id ON node_info(hex_id)",
                 "CREATE INDEX IF NOT EXISTS idx_node_primary_channel ON node_info(primary_channel)",
@@ -281,6 +286,7 @@ def create_postgres_schema() -> None:
             "CREATE INDEX IF NOT EXISTS idx_packet_traceroute_gateway ON packet_history(gateway_id, timestamp DESC) WHERE portnum_name = 'TRACEROUTE_APP'",
             # Position data indexes
             "CREATE INDEX IF NOT EXISTS idx_packet_position_lookup ON packet_history(portnum, from_node_id, timestamp DESC) WHERE portnum = 3 AND raw_payload IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_packet_position_timestamp ON packet_history(portnum, timestamp DESC) WHERE portnum = 3 AND raw_payload IS NOT NULL",
             "CREATE INDEX IF NOT EXISTS idx_packet_position_recent ON packet_history(from_node_id, timestamp DESC) WHERE portnum = 3",
             # Node info indexes
             "CREATE INDEX IF NOT EXISTS idx_node_hex_id ON node_info(hex_id)",
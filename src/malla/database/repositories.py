@@ -7,16 +7,22 @@ This module provides data access layer with business logic for different entitie
 import json
 import logging
 import time
-from datetime import UTC, datetime, timezone, timedelta
+from collections.abc import Iterator
+from datetime import UTC, datetime
 from typing import Any
 
 from meshtastic.protobuf import mesh_pb2
 
-from ..utils.formatting import format_time_ago
+from ..utils.formatting import EST, EST_TIMESTAMP_FORMAT, format_time_ago
+from ..utils.traceroute_utils import RouteData, parse_traceroute_payload
 from .adapter import get_db_adapter
+from .connection_postgres import get_postgres_connection, get_postgres_cursor
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip when streaming traceroutes from the database
+TRACEROUTE_SCAN_FETCH_SIZE = 200
+
 
 class DashboardRepository:
     """Repository for dashboard statistics."""
@@ -531,11 +537,9 @@ class PacketRepository:
 
                     # Format timestamp if not already formatted
                     if packet["timestamp_str"] is None:
-                        from datetime import timezone, timedelta
-                        est = timezone(timedelta(hours=-5))  # EST is UTC-5
                         packet["timestamp_str"] = datetime.fromtimestamp(
-                            packet["timestamp"], tz=est
-                        ).strftime("%Y-%m-%d %H:%M:%S EST")
+                            packet["timestamp"], tz=EST
+                        ).strftime(EST_TIMESTAMP_FORMAT)
 
                     # Calculate hop count if not already set
                     if (
@@ -1565,7 +1569,7 @@ class NodeRepository:
                 recent_reported_packets.append(
                     {
                         "id": row["id"],
-                        "timestamp": ts.astimezone(timezone(timedelta(hours=-5))).strftime("%Y-%m-%d %H:%M:%S EST"),
+                        "timestamp": ts.astimezone(EST).strftime(EST_TIMESTAMP_FORMAT),
                         "timestamp_sort": row["timestamp"],
                         "timestamp_relative": format_time_ago(ts),
                         "from_node_id": from_node_id_val,
@@ -2422,6 +2426,42 @@ class NodeRepository:
 class TracerouteRepository:
     """Repository for traceroute operations."""
 
+    @staticmethod
+    def _traceroute_conditions(filters: dict) -> tuple[list[str], list[Any]]:
+        """Build the WHERE conditions and parameters for traceroute filters."""
+        where_conditions = ["portnum_name = 'TRACEROUTE_APP'"]
+        params: list[Any] = []
+
+        if filters.get("start_time"):
+            where_conditions.append("timestamp >= %s")
+            params.append(filters["start_time"])
+
+        if filters.get("end_time"):
+            where_conditions.append("timestamp <= %s")
+            params.append(filters["end_time"])
+
+        if filters.get("from_node"):
+            where_conditions.append("from_node_id = %s")
+            params.append(filters["from_node"])
+
+        if filters.get("to_node"):
+            where_conditions.append("to_node_id = %s")
+            params.append(filters["to_node"])
+
+        if filters.get("gateway_id"):
+            where_conditions.append("gateway_id = %s")
+            params.append(filters["gateway_id"])
+
+        # New: Optional filtering by primary_channel (matches packet.channel_id field)
+        if filters.get("primary_channel"):
+            where_conditions.append("channel_id = %s")
+            params.append(filters["primary_channel"])
+
+        if filters.get("processed_successfully_only"):
+            where_conditions.append("processed_successfully = true")
+
+        return where_conditions, params
+
     @staticmethod
     def get_traceroute_packets(
         limit: int = 100,
@@ -2441,36 +2481,9 @@ class TracerouteRepository:
             # cursor = conn.cursor()  # Using adapter
 
             # Build WHERE clause
-            where_conditions = ["portnum_name = 'TRACEROUTE_APP'"]
-            params = []
-
-            if filters.get("start_time"):
-                where_conditions.append("timestamp >= %s")
-                params.append(filters["start_time"])
-
-            if filters.get("end_time"):
-                where_conditions.append("timestamp <= %s")
-                params.append(filters["end_time"])
-
-            if filters.get("from_node"):
-                where_conditions.append("from_node_id = %s")
-                params.append(filters["from_node"])
-
-            if filters.get("to_node"):
-                where_conditions.append("to_node_id = %s")
-                params.append(filters["to_node"])
-
-            if filters.get("gateway_id"):
-                where_conditions.append("gateway_id = %s")
-                params.append(filters["gateway_id"])
-
-            # New: Optional filtering by primary_channel (matches packet.channel_id field)
-            if filters.get("primary_channel"):
-                where_conditions.append("channel_id = %s")
-                params.append(filters["primary_channel"])
-
-            if filters.get("processed_successfully_only"):
-                where_conditions.append("processed_successfully = true")
+            where_conditions, params = TracerouteRepository._traceroute_conditions(
+                filters
+            )
 
             # Check if route_node filtering is needed
             route_node_filter = filters.get("route_node")
@@ -2570,6 +2583,8 @@ class TracerouteRepository:
 
                 # Convert groups to aggregated packets
                 aggregated_packets = []
+                # Decoded routes, reused when the page's display is built
+                route_data_by_id: dict[int, RouteData] = {}
                 for _group_key, packets_in_group in groups.items():
                     # Sort by timestamp (newest first) within group
                     packets_in_group.sort(key=lambda x: x["timestamp"], reverse=True)
@@ -2690,22 +2705,20 @@ class TracerouteRepository:
                     # Success indicator
                     aggregated["success"] = aggregated["processed_successfully"]
 
-                    # Enhanced route display using TraceroutePacket
+                    # Route nodes are needed for filtering; the named route
+                    # display is only built for the returned page below
                     aggregated["route"] = None
                     aggregated["route_display"] = "No route data"
                     if aggregated.get("raw_payload"):
                         try:
-                            from ..models.traceroute import TraceroutePacket
-
-                            tr_packet = TraceroutePacket(aggregated, resolve_names=True)
-                            if tr_packet.route_data["route_nodes"]:
+                            route_data = parse_traceroute_payload(
+                                aggregated["raw_payload"]
+                            )
+                            if route_data["route_nodes"]:
                                 aggregated["route"] = json.dumps(
-                                    tr_packet.route_data["route_nodes"]
-                                )
-                                # Get enhanced route display with node names
-                                aggregated["route_display"] = (
-                                    tr_packet.format_path_display("display")
+                                    route_data["route_nodes"]
                                 )
+                                route_data_by_id[aggregated["id"]] = route_data
                         except Exception as e:
                             logger.debug(
                                 f"Failed to parse route for grouped packet {aggregated['id']}: {e}"
@@ -2801,6 +2814,33 @@ class TracerouteRepository:
                 # Apply pagination
                 packets = aggregated_packets[offset : offset + limit]
 
+                # Enhanced route display using TraceroutePacket, resolving the
+                # node names of the whole page with a single lookup
+                from ..models.traceroute import TraceroutePacket
+
+                routed_packets = []
+                for packet in packets:
+                    if not packet["route"]:
+                        continue
+                    try:
+                        tr_packet = TraceroutePacket(
+                            packet,
+                            resolve_names=False,
+                            pre_parsed_route_data=route_data_by_id.get(packet["id"]),
+                        )
+                    except Exception as e:
+                        logger.debug(
+                            f"Failed to parse route for grouped packet {packet['id']}: {e}"
+                        )
+                        continue
+                    routed_packets.append((packet, tr_packet))
+
+                TraceroutePacket.resolve_node_names_bulk(
+                    [tr_packet for _, tr_packet in routed_packets]
+                )
+                for packet, tr_packet in routed_packets:
+                    packet["route_display"] = tr_packet.format_path_display("display")
+
                 # Handle None total_count for grouped queries
                 if total_count is None:
                     # Estimate total_count based on results for grouped queries
@@ -2866,6 +2906,7 @@ class TracerouteRepository:
 
                 db.execute(query, tuple(params + [fetch_limit, fetch_offset]))
                 all_packets = []
+                all_routes: list[list[int]] = []
                 for row in db.fetchall():
                     packet = dict(row)  # Convert to regular dict
 
@@ -2885,17 +2926,17 @@ class TracerouteRepository:
                     ):
                         packet["raw_payload"] = bytes(packet["raw_payload"])
 
-                    # Extract route data from raw_payload if available
+                    # Extract route data from raw_payload if available; only the
+                    # route nodes are needed, so skip building full paths
                     packet["route"] = None
+                    route_nodes: list[int] = []
                     if packet.get("raw_payload"):
                         try:
-                            from ..models.traceroute import TraceroutePacket
-
-                            tr_packet = TraceroutePacket(packet, resolve_names=False)
-                            if tr_packet.route_data["route_nodes"]:
-                                packet["route"] = json.dumps(
-                                    tr_packet.route_data["route_nodes"]
-                                )
+                            route_nodes = parse_traceroute_payload(
+                                packet["raw_payload"]
+                            )["route_nodes"]
+                            if route_nodes:
+                                packet["route"] = json.dumps(route_nodes)
                         except Exception as e:
                             logger.debug(
                                 f"Failed to parse route for packet {packet['id']}: {e}"
@@ -2911,35 +2952,21 @@ class TracerouteRepository:
                         packet["hop_count"] = None
 
                     all_packets.append(packet)
+                    all_routes.append(route_nodes)
 
                 # Apply route_node filtering if specified
                 if needs_route_filtering:
                     filtered_packets = []
-                    for packet in all_packets:
+                    for packet, packet_route in zip(
+                        all_packets, all_routes, strict=True
+                    ):
                         # Check if the route_node appears in from_node_id, to_node_id, or route_nodes
                         if (
                             packet.get("from_node_id") == route_node_filter
                             or packet.get("to_node_id") == route_node_filter
+                            or route_node_filter in packet_route
                         ):
                             filtered_packets.append(packet)
-                            continue
-
-                        # Check if the node appears in the route_nodes array
-                        if packet.get("raw_payload"):
-                            try:
-                                from ..models.traceroute import TraceroutePacket
-
-                                tr_packet = TraceroutePacket(
-                                    packet, resolve_names=False
-                                )
-                                if route_node_filter in tr_packet.route_data.get(
-                                    "route_nodes", []
-                                ):
-                                    filtered_packets.append(packet)
-                            except Exception as e:
-                                logger.debug(
-                                    f"Failed to parse route for route_node filtering: {e}"
-                                )
 
                     # Now apply pagination to filtered results
                     total_count = len(filtered_packets)
@@ -2963,6 +2990,98 @@ class TracerouteRepository:
             logger.error("Error getting traceroute packets: %s", e)
             raise
 
+    @staticmethod
+    def get_traceroute_routes(
+        filters: dict | None = None, limit: int = 250
+    ) -> list[dict[str, Any]]:
+        """
+        Get the most recent traceroutes matching filters, for route analysis.
+
+        Accepts the same filters as get_traceroute_packets except route_node,
+        but only fetches the columns needed to analyze routes and skips the
+        total count and per-row enrichment.
+
+        Args:
+            filters: Traceroute filters (start_time, end_time, gateway_id, ...)
+            limit: Maximum number of traceroutes to return
+
+        Returns:
+            List of dicts with id, timestamp, from_node_id, to_node_id and
+            raw_payload for traceroutes with a payload, newest first
+        """
+        try:
+            db = get_db_adapter()
+
+            where_conditions, params = TracerouteRepository._traceroute_conditions(
+                filters or {}
+            )
+            where_conditions.append("raw_payload IS NOT NULL")
+
+            db.execute(
+                f"""
+                SELECT id, timestamp, from_node_id, to_node_id, raw_payload
+                FROM packet_history
+                WHERE {" AND ".join(where_conditions)}
+                ORDER BY timestamp DESC
+                LIMIT %s
+                """,
+                tuple(params + [limit]),
+            )
+            routes = list(db.fetchall())
+
+            db.close()
+            return routes
+
+        except Exception as e:
+            logger.error("Error getting traceroute routes: %s", e)
+            raise
+
+    @staticmethod
+    def get_node_traceroute_counts(node_id: int) -> dict[str, int]:
+        """
+        Count the traceroutes a node sent or received, in a single query.
+
+        Args:
+            node_id: Node ID to count traceroutes for
+
+        Returns:
+            Dictionary with source_total, source_successful, dest_total and
+            dest_successful
+        """
+        try:
+            db = get_db_adapter()
+
+            query = """
+                SELECT
+                    COUNT(*) FILTER (WHERE from_node_id = %s) AS source_total,
+                    COUNT(*) FILTER (
+                        WHERE from_node_id = %s AND processed_successfully
+                    ) AS source_successful,
+                    COUNT(*) FILTER (WHERE to_node_id = %s) AS dest_total,
+                    COUNT(*) FILTER (
+                        WHERE to_node_id = %s AND processed_successfully
+                    ) AS dest_successful
+                FROM packet_history
+                WHERE portnum_name = 'TRACEROUTE_APP'
+                AND %s IN (from_node_id, to_node_id)
+            """
+
+            db.execute(query, (node_id,) * 5)
+            row = db.fetchone()
+            db.close()
+
+            keys = (
+                "source_total",
+                "source_successful",
+                "dest_total",
+                "dest_successful",
+            )
+            return {key: (row[key] if row else 0) or 0 for key in keys}
+
+        except Exception as e:
+            logger.error("Error getting traceroute counts for %s: %s", node_id, e)
+            raise
+
     @staticmethod
     def get_traceroute_details(packet_id: int) -> dict[str, Any] | None:
         """Get details for a specific traceroute packet."""
@@ -2999,6 +3118,109 @@ class TracerouteRepository:
             logger.error("Error getting traceroute details: %s", e)
             raise
 
+    @staticmethod
+    def get_traceroute_analysis_data(
+        start_time: float, end_time: float, route_limit: int
+    ) -> dict[str, Any]:
+        """
+        Get traceroute counts and a sample of routes for a time window.
+
+        Counts are aggregated over every traceroute in the window; only the
+        columns needed for route analysis are fetched for the sample.
+
+        Args:
+            start_time: Start of the window (Unix timestamp)
+            end_time: End of the window (Unix timestamp)
+            route_limit: Maximum number of successful traceroutes to return
+
+        Returns:
+            Dictionary with total_count, successful_count and routes, the
+            most recent successful traceroutes with a payload
+        """
+        try:
+            db = get_db_adapter()
+
+            db.execute(
+                """
+                SELECT
+                    COUNT(*) AS total_count,
+                    COUNT(*) FILTER (WHERE processed_successfully) AS successful_count
+                FROM packet_history
+                WHERE portnum_name = 'TRACEROUTE_APP'
+                AND timestamp >= %s AND timestamp <= %s
+                """,
+                (start_time, end_time),
+            )
+            counts = db.fetchone()
+
+            db.execute(
+                """
+                SELECT from_node_id, to_node_id, raw_payload
+                FROM packet_history
+                WHERE portnum_name = 'TRACEROUTE_APP'
+                AND timestamp >= %s AND timestamp <= %s
+                AND processed_successfully = true
+                AND raw_payload IS NOT NULL
+                ORDER BY timestamp DESC
+                LIMIT %s
+                """,
+                (start_time, end_time, route_limit),
+            )
+            routes = list(db.fetchall())
+
+            db.close()
+
+            return {
+                "total_count": counts["total_count"] if counts else 0,
+                "successful_count": counts["successful_count"] if counts else 0,
+                "routes": routes,
+            }
+
+        except Exception as e:
+            logger.error("Error getting traceroute analysis data: %s", e)
+            raise
+
+    @staticmethod
+    def iter_recent_traceroute_routes(limit: int) -> Iterator[dict[str, Any]]:
+        """
+        Stream the most recent successful traceroutes with a payload.
+
+        Only the columns needed to analyze routes are fetched, without the
+        per-row enrichment done by get_traceroute_packets. Rows are read
+        through a server-side cursor on a dedicated connection, so at most
+        TRACEROUTE_SCAN_FETCH_SIZE payloads are held in memory at a time.
+
+        Args:
+            limit: Maximum number of traceroutes to yield
+
+        Yields:
+            Dicts with id, timestamp, from_node_id, to_node_id and raw_payload,
+            newest first
+        """
+        conn = get_postgres_connection()
+        try:
+            cursor = get_postgres_cursor(conn, name="recent_traceroute_routes")
+            cursor.execute(
+                """
+                SELECT id, timestamp, from_node_id, to_node_id, raw_payload
+                FROM packet_history
+                WHERE portnum_name = 'TRACEROUTE_APP'
+                AND processed_successfully = true
+                AND raw_payload IS NOT NULL
+                ORDER BY timestamp DESC
+                LIMIT %s
+                """,
+                (limit,),
+            )
+            while rows := cursor.fetchmany(TRACEROUTE_SCAN_FETCH_SIZE):
+                yield from rows
+
+        except Exception as e:
+            logger.error("Error streaming recent traceroute routes: %s", e)
+            raise
+        finally:
+            conn.close()
+
 
 class LocationRepository:
     """Repository for location operations."""
@@ -3009,6 +3231,8 @@ class LocationRepository:
     ) -> list[dict[str, Any]]:
         """Get latest location for all nodes from position packets.
         If filters contains 'node_ids', restrict results to those nodes only.
+        If filters contains 'min_age_hours', only nodes whose latest position
+        is at least that old are returned.
         """
         if filters is None:
             filters = {}
@@ -3044,9 +3268,20 @@ class LocationRepository:
                     else:
                         node_ids_int.append(int(nid))
                 if node_ids_int:
-                    placeholders = ",".join(["%s"] * len(node_ids_int))
-                    node_ids_clause = f"AND from_node_id IN ({placeholders})"
-                    node_ids_params = node_ids_int
+                    # Pass the IDs as one array parameter so the query text
+                    # does not change with the number of nodes
+                    node_ids_clause = "AND from_node_id = ANY(%s)"
+                    node_ids_params = [node_ids_int]
+
+            # min_age applies to each node's latest position, so it has to
+            # filter the aggregate rather than individual packets
+            having_clause = ""
+            having_params: list[Any] = []
+            if filters.get("min_age_hours"):
+                having_clause = "HAVING MAX(timestamp) <= %s"
+                having_params.append(
+                    time.time() - float(filters["min_age_hours"]) * 3600
+                )
 
             # Optimized query using window function instead of correlated subquery
             query = f"""
@@ -3060,6 +3295,7 @@ class LocationRepository:
                     AND from_node_id IS NOT NULL
                     {node_ids_clause}
                     GROUP BY from_node_id
+                    {having_clause}
                 )
                 SELECT
                     ph.from_node_id as node_id,
@@ -3091,7 +3327,7 @@ class LocationRepository:
                 logger.debug("Index creation skipped or failed: %s", e)
 
             query_start = time.time()
-            db.execute(query, tuple(node_ids_params))
+            db.execute(query, tuple(node_ids_params + having_params))
             raw_rows = db.fetchall()
             timing_breakdown["sql_query"] = time.time() - query_start
 
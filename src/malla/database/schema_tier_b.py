@@ -77,19 +77,124 @@ Key improvements:
 """
 
 import logging
+import math
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 
 from .connection_postgres import get_postgres_connection, get_postgres_cursor
 
 logger = logging.getLogger(__name__)
 
+# Number of daily traceroute_hops partitions to keep created ahead of time
+PARTITION_DAYS_AHEAD = 7
+
+# Name of the pg_cron job that refreshes longest_links_mv
+PG_CRON_REFRESH_JOB = "mv-refresh"
+
+# SQL function run by the pg_cron job
+MV_REFRESH_FUNCTION = "refresh_longest_links_mv_if_changed"
+
+# Advisory lock key serializing longest_links_mv refreshes
+MV_REFRESH_LOCK = "mv_refresh"
+
+# How long a view refresh may wait for its lock before giving up
+MV_REFRESH_LOCK_TIMEOUT = "30s"
+
+
+def _hops_partition_name(day: date) -> str:
+    """Return the name of the daily traceroute_hops partition for a date."""
+    return f"traceroute_hops_p{day:%Y%m%d}"
+
+
+def _traceroute_hops_is_partitioned(cursor: RealDictCursor) -> bool:
+    """
+    Check whether traceroute_hops is a partitioned table.
+
+    Deployments created before the table was partitioned keep their plain
+    table, since CREATE TABLE IF NOT EXISTS leaves it in place.
+    """
+    cursor.execute("""
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = 'traceroute_hops'
+    """)
+    return cursor.fetchone() is not None
+
+
+def ensure_traceroute_hops_partitions(
+    cursor: RealDictCursor, days_ahead: int = PARTITION_DAYS_AHEAD
+) -> int:
+    """
+    Create missing daily partitions of traceroute_hops.
+
+    Partitions are created for yesterday through ``days_ahead`` days from
+    today (UTC). Does nothing when traceroute_hops is a plain table, as on
+    deployments created before the table was partitioned.
+
+    Args:
+        cursor: Database cursor
+        days_ahead: How many days of future partitions to create
+
+    Returns:
+        Number of partitions created
+    """
+    if not _traceroute_hops_is_partitioned(cursor):
+        return 0
+
+    created = 0
+    today = datetime.now(UTC).date()
+    for offset in range(-1, days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = _hops_partition_name(day)
+        cursor.execute("SELECT to_regclass(%s) AS oid", (name,))
+        row = cursor.fetchone()
+        if row and row["oid"]:
+            continue
+
+        try:
+            cursor.execute("SAVEPOINT hops_partition")
+            cursor.execute(
+                f"""
+                CREATE TABLE {name} PARTITION OF traceroute_hops
+                FOR VALUES FROM ('{day.isoformat()} 00:00:00+00')
+                TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')
+                """
+            )
+            cursor.execute("RELEASE SAVEPOINT hops_partition")
+            created += 1
+        except Exception as e:
+            # Typically rows for this day already landed in the default partition
+            cursor.execute("ROLLBACK TO SAVEPOINT hops_partition")
+            logger.warning("Could not create partition %s: %s", name, e)
+
+    if created:
+        logger.info("Created %s traceroute_hops partitions", created)
+    return created
+
+
+def maintain_traceroute_hops_partitions() -> None:
+    """
+    Make sure upcoming daily traceroute_hops partitions exist.
+
+    Called periodically by the materialized view refresher.
+    """
+    try:
+        conn = get_postgres_connection()
+        cursor = get_postgres_cursor(conn)
+        ensure_traceroute_hops_partitions(cursor)
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.error("Failed to maintain traceroute_hops partitions: %s", e)
+
 
 def create_tier_b_schema() -> None:
     """
     Create the Tier B write-optimized database schema.
 
     This creates:
-    1. traceroute_hops table for normalized hop data
+    1. traceroute_hops table for normalized hop data, range-partitioned by day
     2. Materialized view for longest links aggregation
     3. All necessary indexes for optimal performance
     """
@@ -99,20 +204,32 @@ def create_tier_b_schema() -> None:
         conn = get_postgres_connection()
         cursor = get_postgres_cursor(conn)
 
-        # Create traceroute_hops table for normalized hop data
+        # Create traceroute_hops table for normalized hop data. It is
+        # partitioned by day so time-windowed queries only touch recent
+        # partitions; the primary key has to include the partition key.
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS traceroute_hops (
-                id SERIAL PRIMARY KEY,
+                id BIGSERIAL,
                 packet_id BIGINT NOT NULL,
                 hop_index INTEGER NOT NULL,
                 from_node_id BIGINT NOT NULL,
                 to_node_id BIGINT NOT NULL,
                 snr REAL,
                 timestamp TIMESTAMPTZ NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW()
-            )
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
         """)
 
+        # Catch-all for rows outside the pre-created daily partitions. A
+        # legacy plain table cannot take partitions and is left as it is.
+        if _traceroute_hops_is_partitioned(cursor):
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS traceroute_hops_default
+                PARTITION OF traceroute_hops DEFAULT
+            """)
+            ensure_traceroute_hops_partitions(cursor)
+
         # Create indexes for optimal query performance
         indexes = [
             # Primary query indexes
@@ -135,6 +252,99 @@ def create_tier_b_schema() -> None:
             except Exception as e:
                 logger.warning("Could not create index: %s", e)
 
+        # Count committed writes to traceroute_hops so refreshes can tell
+        # when the view is stale. The counter row is bumped by a deferred
+        # trigger, i.e. while the writing transaction commits, so a refresh
+        # that reads counter N also sees every write counted in N. The row
+        # lock is only held for that final step, once per transaction.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_change_state (
+                table_name TEXT PRIMARY KEY,
+                change_seq BIGINT NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO table_change_state (table_name)
+            VALUES ('traceroute_hops')
+            ON CONFLICT (table_name) DO NOTHING
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION mark_traceroute_hops_changed()
+            RETURNS trigger AS $$
+            BEGIN
+                -- Constraint triggers fire per row; count each transaction once
+                IF current_setting('malla.hops_changed_xact', true)
+                        IS DISTINCT FROM txid_current()::text THEN
+                    PERFORM set_config(
+                        'malla.hops_changed_xact', txid_current()::text, true
+                    );
+                    UPDATE table_change_state
+                    SET change_seq = change_seq + 1
+                    WHERE table_name = 'traceroute_hops';
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute(
+            "DROP TRIGGER IF EXISTS traceroute_hops_changed ON traceroute_hops"
+        )
+        cursor.execute("""
+            CREATE CONSTRAINT TRIGGER traceroute_hops_changed
+            AFTER INSERT OR UPDATE OR DELETE ON traceroute_hops
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION mark_traceroute_hops_changed()
+        """)
+        # Replaced by table_change_state, whose value only moves on commit
+        cursor.execute("DROP SEQUENCE IF EXISTS traceroute_hops_change_seq")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS mv_refresh_state (
+                view_name TEXT PRIMARY KEY,
+                change_seq BIGINT NOT NULL
+            )
+        """)
+        # The view is rebuilt below, so forget the counter it was refreshed at
+        cursor.execute(
+            "DELETE FROM mv_refresh_state WHERE view_name = 'longest_links_mv'"
+        )
+
+        # Refresh run by the pg_cron job. Like refresh_longest_links_mv with
+        # skip_if_unchanged, it takes the advisory lock, sets the lock timeout
+        # and refreshes only when the change counter moved. pg_cron sessions
+        # do not get the application's statement timeout, so none is reset.
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {MV_REFRESH_FUNCTION}()
+            RETURNS boolean AS $$
+            DECLARE
+                current_seq BIGINT;
+                refreshed_seq BIGINT;
+            BEGIN
+                IF NOT pg_try_advisory_xact_lock(hashtext('{MV_REFRESH_LOCK}')) THEN
+                    RETURN false;
+                END IF;
+                PERFORM set_config(
+                    'lock_timeout', '{MV_REFRESH_LOCK_TIMEOUT}', true
+                );
+
+                SELECT change_seq INTO current_seq
+                FROM table_change_state WHERE table_name = 'traceroute_hops';
+                current_seq := COALESCE(current_seq, 0);
+                SELECT change_seq INTO refreshed_seq
+                FROM mv_refresh_state WHERE view_name = 'longest_links_mv';
+                IF refreshed_seq IS NOT DISTINCT FROM current_seq THEN
+                    RETURN false;
+                END IF;
+
+                REFRESH MATERIALIZED VIEW CONCURRENTLY longest_links_mv;
+                INSERT INTO mv_refresh_state (view_name, change_seq)
+                VALUES ('longest_links_mv', current_seq)
+                ON CONFLICT (view_name) DO UPDATE
+                SET change_seq = EXCLUDED.change_seq;
+                RETURN true;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+
         # Drop materialized view if it exists to ensure we can create it with a unique index
         cursor.execute("DROP MATERIALIZED VIEW IF EXISTS longest_links_mv")
 
@@ -180,12 +390,65 @@ def create_tier_b_schema() -> None:
         raise
 
 
-def refresh_longest_links_mv() -> None:
+def _set_refresh_timeouts(cursor: RealDictCursor) -> None:
+    """
+    Configure the current transaction for materialized view refreshes.
+
+    Connections default to a 7 second statement timeout, which a full
+    refresh can easily exceed. A lock timeout is set instead, so a refresh
+    stuck behind a conflicting lock fails fast and is retried next cycle.
+    """
+    cursor.execute("SET LOCAL statement_timeout = 0")
+    cursor.execute(f"SET LOCAL lock_timeout = '{MV_REFRESH_LOCK_TIMEOUT}'")
+
+
+def _longest_links_mv_change_state(
+    cursor: RealDictCursor,
+) -> tuple[int | None, bool]:
+    """
+    Compare the traceroute_hops change counter with the last refresh.
+
+    Databases whose schema predates the counter have no change state; the
+    view is then always treated as stale.
+
+    Returns:
+        Tuple of (current change counter, or None without change state,
+        whether hops changed since the counter recorded at the last refresh
+        of longest_links_mv)
+    """
+    cursor.execute("""
+        SELECT
+            to_regclass('table_change_state') IS NOT NULL
+            AND to_regclass('mv_refresh_state') IS NOT NULL AS tracked
+    """)
+    row = cursor.fetchone()
+    if not row or not row["tracked"]:
+        return None, True
+
+    cursor.execute("""
+        SELECT
+            (SELECT change_seq FROM table_change_state
+             WHERE table_name = 'traceroute_hops') AS change_seq,
+            (SELECT change_seq FROM mv_refresh_state
+             WHERE view_name = 'longest_links_mv') AS refreshed_seq
+    """)
+    row = cursor.fetchone()
+    change_seq = row["change_seq"] or 0
+    return change_seq, row["refreshed_seq"] != change_seq
+
+
+def refresh_longest_links_mv(skip_if_unchanged: bool = False) -> None:
     """
     Refresh the longest_links_mv materialized view.
 
     This should be called periodically (e.g., every 5-10 minutes)
-    to keep the materialized view up to date.
+    to keep the materialized view up to date. Concurrent callers are
+    serialized with an advisory lock; a caller that cannot take the lock
+    skips its refresh.
+
+    Args:
+        skip_if_unchanged: Skip the refresh when traceroute_hops has not
+            changed since the last one
     """
     logger.info("Refreshing longest_links_mv materialized view")
 
@@ -193,19 +456,131 @@ def refresh_longest_links_mv() -> None:
         conn = get_postgres_connection()
         cursor = get_postgres_cursor(conn)
 
-        # Use concurrent refresh to avoid locking the view
-        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY longest_links_mv")
+        cursor.execute(
+            "SELECT pg_try_advisory_lock(hashtext(%s)) AS locked",
+            (MV_REFRESH_LOCK,),
+        )
+        row = cursor.fetchone()
+        if not row or not row["locked"]:
+            conn.close()
+            logger.info("longest_links_mv refresh already in progress, skipping")
+            return
 
-        conn.commit()
-        conn.close()
+        try:
+            # Read the counter before refreshing so writes that land during
+            # the refresh leave the view marked stale for the next cycle
+            change_seq, changed = _longest_links_mv_change_state(cursor)
+            if skip_if_unchanged and not changed:
+                logger.info("No new hops since last refresh of longest_links_mv")
+                return
+
+            # Use concurrent refresh to avoid locking the view
+            _set_refresh_timeouts(cursor)
+            cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY longest_links_mv")
+            if change_seq is not None:
+                cursor.execute(
+                    """
+                    INSERT INTO mv_refresh_state (view_name, change_seq)
+                    VALUES ('longest_links_mv', %s)
+                    ON CONFLICT (view_name) DO UPDATE
+                    SET change_seq = EXCLUDED.change_seq
+                    """,
+                    (change_seq,),
+                )
+            conn.commit()
 
-        logger.info("longest_links_mv materialized view refreshed successfully")
+            logger.info("longest_links_mv materialized view refreshed successfully")
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (MV_REFRESH_LOCK,))
+            conn.close()
 
     except Exception as e:
         logger.error("Failed to refresh longest_links_mv: %s", e)
         # Don't raise - this is a background operation
 
 
+def schedule_longest_links_refresh(refresh_interval_minutes: int = 5) -> bool:
+    """
+    Schedule longest_links_mv refreshes inside PostgreSQL with pg_cron.
+
+    The job runs the refresh function created by create_tier_b_schema and is
+    upserted by name, so calling this repeatedly is safe. Requires the
+    pg_cron extension to be installed in the database.
+
+    Args:
+        refresh_interval_minutes: How often to refresh (1-59 minutes)
+
+    Returns:
+        True if the refresh is scheduled in the database, False if pg_cron is
+        unavailable and the caller should refresh on its own
+    """
+    if not 1 <= refresh_interval_minutes <= 59:
+        logger.info(
+            "pg_cron scheduling needs an interval of 1-59 minutes, got %s",
+            refresh_interval_minutes,
+        )
+        return False
+
+    try:
+        conn = get_postgres_connection()
+        cursor = get_postgres_cursor(conn)
+
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_cron'")
+        if not cursor.fetchone():
+            conn.close()
+            logger.info("pg_cron extension not installed; using in-process refresher")
+            return False
+
+        cursor.execute(
+            "SELECT cron.schedule(%s, %s, %s)",
+            (
+                PG_CRON_REFRESH_JOB,
+                f"*/{refresh_interval_minutes} * * * *",
+                f"SELECT {MV_REFRESH_FUNCTION}()",
+            ),
+        )
+
+        conn.commit()
+        conn.close()
+
+        logger.info(
+            f"Scheduled pg_cron job {PG_CRON_REFRESH_JOB} every {refresh_interval_minutes} minutes"
+        )
+        return True
+
+    except Exception as e:
+        logger.warning("Could not schedule pg_cron refresh: %s", e)
+        return False
+
+
+def unschedule_longest_links_refresh() -> None:
+    """
+    Remove the pg_cron refresh job, if there is one.
+
+    Called on shutdown so the job does not keep running in the database
+    after the application stops or is reconfigured.
+    """
+    try:
+        conn = get_postgres_connection()
+        cursor = get_postgres_cursor(conn)
+
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_cron'")
+        if cursor.fetchone():
+            cursor.execute(
+                "SELECT cron.unschedule(jobid) FROM cron.job WHERE jobname = %s",
+                (PG_CRON_REFRESH_JOB,),
+            )
+            if cursor.fetchone():
+                logger.info(f"Unscheduled pg_cron job {PG_CRON_REFRESH_JOB}")
+
+        conn.commit()
+        conn.close()
+
+    except Exception as e:
+        logger.warning("Could not unschedule pg_cron refresh: %s", e)
+
+
 def refresh_longest_links_materialized_views() -> None:
     """
     Refresh all longest links materialized views.
@@ -220,6 +595,7 @@ def refresh_longest_links_materialized_views() -> None:
 
         # First, ensure the materialized views exist
         _ensure_longest_links_materialized_views(conn, cursor)
+        _set_refresh_timeouts(cursor)
 
         # Refresh single-hop view
         try:
@@ -259,6 +635,7 @@ def get_longest_links_optimized(
     min_snr: float = -20.0,
     max_results: int = 100,
     hours: int = 168,  # 7 days
+    max_distance_km: float | None = None,
 ) -> list[dict[str, Any]]:
     """
     Get longest links using the optimized Tier B pipeline.
@@ -271,6 +648,8 @@ def get_longest_links_optimized(
         min_snr: Minimum SNR in dB
         max_results: Maximum number of results to return
         hours: Number of hours to look back (default 7 days)
+        max_distance_km: Optional maximum distance in kilometers; links with
+            a known distance above it are dropped before being built
 
     Returns:
         List of link data with distance calculations
@@ -351,6 +730,14 @@ def get_longest_links_optimized(
                         f"Failed to parse position for node {pos_row['from_node_id']}: {e}"
                     )
 
+        # Radians and latitude cosines are computed once per node, not for
+        # both ends of every link the node appears in
+        node_trig = {
+            node_id: (lat_rad, math.radians(pos["longitude"]), math.cos(lat_rad))
+            for node_id, pos in positions.items()
+            for lat_rad in (math.radians(pos["latitude"]),)
+        }
+
         # Convert to expected format with real distance calculation
         links: list[dict[str, Any]] = []
         for row in results:
@@ -367,28 +754,17 @@ def get_longest_links_optimized(
 
             # Calculate distance using the Haversine formula when coordinates are available
             distance_km: float | None = None  # Unknown by default
-            if (
-                source_pos["latitude"] != 0.0
-                and dest_pos["latitude"] != 0.0
-                and source_pos["longitude"] != 0.0
-                and dest_pos["longitude"] != 0.0
-            ):
-                import math
-
-                lat1, lon1 = (
-                    math.radians(source_pos["latitude"]),
-                    math.radians(source_pos["longitude"]),
-                )
-                lat2, lon2 = (
-                    math.radians(dest_pos["latitude"]),
-                    math.radians(dest_pos["longitude"]),
-                )
+            source_trig = node_trig.get(source_id)
+            dest_trig = node_trig.get(dest_id)
+            if source_trig is not None and dest_trig is not None:
+                lat1, lon1, cos_lat1 = source_trig
+                lat2, lon2, cos_lat2 = dest_trig
 
                 dlat = lat2 - lat1
                 dlon = lon2 - lon1
                 a = (
                     math.sin(dlat / 2) ** 2
-                    + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+                    + cos_lat1 * cos_lat2 * math.sin(dlon / 2) ** 2
                 )
                 c = 2 * math.asin(math.sqrt(a))
                 distance_km = 6371 * c  # Earth's radius in km
@@ -402,6 +778,13 @@ def get_longest_links_optimized(
                     f"No position data for distance calculation: {source_id} -> {dest_id}"
                 )
 
+            if (
+                max_distance_km is not None
+                and distance_km is not None
+                and distance_km > max_distance_km
+            ):
+                continue
+
             link = {
                 "from_node_id": source_id,
                 "to_node_id": dest_id,
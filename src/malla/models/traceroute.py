@@ -445,15 +445,31 @@ class TraceroutePacket:
         # Import here to avoid circular dependencies
         from ..utils.node_utils import get_bulk_node_names
 
-        # Collect all unique node IDs
-        all_node_ids = set()
+        # Get names in bulk
+        self.apply_node_names(get_bulk_node_names(list(self.get_node_ids())))
+
+    def get_node_ids(self) -> set[int]:
+        """Get the IDs of the packet's endpoints and all nodes on its paths."""
+        all_node_ids = {
+            node_id
+            for node_id in (self.from_node_id, self.to_node_id)
+            if node_id is not None
+        }
         all_node_ids.update(self.forward_path.node_ids)
         if self.return_path:
             all_node_ids.update(self.return_path.node_ids)
         all_node_ids.update(self.actual_rf_path.node_ids)
+        return all_node_ids
 
-        # Get names in bulk
-        node_names = get_bulk_node_names(list(all_node_ids))
+    def apply_node_names(self, node_names: dict[int, str]) -> None:
+        """
+        Fill in node names on the packet and its paths from a lookup.
+
+        Args:
+            node_names: Mapping of node ID to display name; missing nodes are
+                shown by their hex ID
+        """
+        self.resolve_names = True
 
         # Resolve packet-level node names with Optional safety
         if self.from_node_id is not None:
@@ -489,6 +505,28 @@ class TraceroutePacket:
                     hop.to_node_id, f"!{hop.to_node_id:08x}"
                 )
 
+    @staticmethod
+    def resolve_node_names_bulk(packets: list["TraceroutePacket"]) -> None:
+        """
+        Resolve node names for several packets with a single lookup.
+
+        Args:
+            packets: Packets created with resolve_names=False
+        """
+        if not packets:
+            return
+
+        # Import here to avoid circular dependencies
+        from ..utils.node_utils import get_bulk_node_names
+
+        all_node_ids: set[int] = set()
+        for packet in packets:
+            all_node_ids.update(packet.get_node_ids())
+
+        node_names = get_bulk_node_names(list(all_node_ids))
+        for packet in packets:
+            packet.apply_node_names(node_names)
+
     def _calculate_distance_meters(
         self, lat1: float, lon1: float, lat2: float, lon2: float
     ) -> float:
@@ -13,6 +13,7 @@ from ..database.adapter import get_db_adapter
 # Import from the new modular architecture
 from ..database.repositories import LocationRepository
 from ..models.traceroute import TraceroutePacket
+from ..utils.formatting import EST, EST_TIMESTAMP_FORMAT
 from ..utils.node_utils import (
     get_bulk_node_names,
 )
@@ -66,11 +67,9 @@ def get_packet_details(packet_id: int) -> dict[str, Any] | None:
                 pass
 
         # Add derived fields
-        from datetime import timezone, timedelta
-        est = timezone(timedelta(hours=-5))  # EST is UTC-5
-        packet["timestamp_str"] = datetime.fromtimestamp(packet["timestamp"], tz=est).strftime(
-            "%Y-%m-%d %H:%M:%S EST"
-        )
+        packet["timestamp_str"] = datetime.fromtimestamp(
+            packet["timestamp"], tz=EST
+        ).strftime(EST_TIMESTAMP_FORMAT)
         packet["hop_count"] = (
             (packet["hop_start"] - packet["hop_limit"])
             if packet["hop_start"] is not None and packet["hop_limit"] is not None
@@ -152,11 +151,9 @@ def get_packet_details(packet_id: int) -> dict[str, Any] | None:
 
         for row in db.fetchall():
             reception = dict(row)
-            from datetime import timezone, timedelta
-            est = timezone(timedelta(hours=-5))  # EST is UTC-5
             reception["timestamp_str"] = datetime.fromtimestamp(
-                reception["timestamp"], tz=est
-            ).strftime("%Y-%m-%d %H:%M:%S EST")
+                reception["timestamp"], tz=EST
+            ).strftime(EST_TIMESTAMP_FORMAT)
             reception["hop_count"] = (
                 (reception["hop_start"] - reception["hop_limit"])
                 if reception["hop_start"] is not None
@@ -7,14 +7,19 @@ It can be used to initialize, refresh, and monitor the pipeline.
 """
 
 import argparse
+import json
 import logging
 
 # Add the parent directory to the path so we can import malla modules
 import os
 import sys
+import time
+from pathlib import Path
+from typing import Any
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from malla.config import get_config
 from malla.database.connection import get_db_connection
 from malla.database.connection_postgres import get_postgres_cursor
 from malla.services.tier_b_initializer import (
@@ -28,16 +33,134 @@ from malla.services.tier_b_initializer import (
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+# Cached results of check-schema/stats, reused with --stale-ok. The file
+# records which database they came from and only serves that database.
+PROBE_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "malla"
+    / "schema_probe.json"
+)
+PROBE_CACHE_TTL_SECONDS = 60
+
+SCHEMA_PROBE_QUERY = """
+    SELECT c.relname
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+    AND c.relname IN ('traceroute_hops', 'longest_links_mv')
+"""
+
+STATS_QUERIES = {
+    "hop_count": "SELECT COUNT(*) as count FROM traceroute_hops",
+    "recent_hop_count": """
+        SELECT COUNT(*) as count
+        FROM traceroute_hops
+        WHERE timestamp >= NOW() - INTERVAL '24 hours'
+    """,
+    "mv_count": "SELECT COUNT(*) as count FROM longest_links_mv",
+}
+
+
+def _explain(cursor: Any, query: str, params: tuple[Any, ...] | None = None) -> None:
+    """
+    Run a query under EXPLAIN (ANALYZE, BUFFERS) and log the JSON plan.
+
+    Only use this for read-only queries: EXPLAIN ANALYZE executes the statement.
+
+    Args:
+        cursor: Database cursor
+        query: SQL query to explain
+        params: Optional query parameters
+    """
+    cursor.execute(EXPLAIN_PREFIX + query, params)
+    row = cursor.fetchone()
+    plan = row["QUERY PLAN"] if row else None
+    logger.debug("Query plan for %s:\n%s", " ".join(query.split()), json.dumps(plan, indent=2))
+
+
+def _database_identity() -> str:
+    """Identify the configured database (without credentials) for the probe cache."""
+    config = get_config()
+    return (
+        f"{config.database_user}@{config.database_host}:"
+        f"{config.database_port}/{config.database_name}"
+    )
+
+
+def _load_probe_cache() -> dict[str, Any]:
+    """
+    Load the probe cache entries recorded for the configured database.
+
+    Returns:
+        Cache entries by name, empty if the file is missing, unreadable or
+        belongs to another database
+    """
+    try:
+        cache = json.loads(PROBE_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict) or cache.get("database") != _database_identity():
+        return {}
+    return cache
+
+
+def _read_probe_cache(key: str) -> dict[str, Any] | None:
+    """
+    Return a cached probe result if it is younger than the cache TTL.
+
+    Args:
+        key: Cache entry name ("schema" or "stats")
+
+    Returns:
+        Cached entry, or None if missing, stale, unreadable or cached for
+        another database
+    """
+    entry = _load_probe_cache().get(key)
+    if not entry or time.time() - entry.get("ts", 0) >= PROBE_CACHE_TTL_SECONDS:
+        return None
+    return entry
+
+
+def _write_probe_cache(key: str, entry: dict[str, Any]) -> None:
+    """Store a probe result in the on-disk cache, ignoring I/O errors."""
+    cache = _load_probe_cache()
+    cache["database"] = _database_identity()
+    cache[key] = {**entry, "ts": time.time()}
+    try:
+        PROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        PROBE_CACHE_PATH.write_text(json.dumps(cache))
+    except OSError as e:
+        logger.debug("Could not write probe cache: %s", e)
+
+
+def _invalidate_probe_cache() -> None:
+    """Drop cached probe results after the schema may have changed."""
+    try:
+        PROBE_CACHE_PATH.unlink(missing_ok=True)
+    except OSError as e:
+        logger.debug("Could not remove probe cache: %s", e)
+
+
+def _write_lines(lines: list[str]) -> None:
+    """Write a block of report lines to stdout with a single write call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 
 def init_pipeline() -> bool:
     """Initialize the Tier B pipeline."""
     logger.info("Initializing Tier B write-optimized pipeline...")
+    _invalidate_probe_cache()
     return initialize_tier_b_pipeline()
 
 
 def shutdown_pipeline() -> None:
     """Shutdown the Tier B pipeline."""
     logger.info("Shutting down Tier B pipeline...")
+    _invalidate_probe_cache()
     shutdown_tier_b_pipeline()
 
 
@@ -45,81 +168,147 @@ def status() -> None:
     """Show pipeline status."""
     status_info = get_pipeline_status()
 
-    print("Tier B Pipeline Status:")
-    print("=" * 40)
-    print(f"Pipeline Type: {status_info['pipeline_type']}")
-    print(f"Schema Created: {status_info['schema_created']}")
-    print(f"Refresher Running: {status_info['materialized_view_refresher_running']}")
-    print(f"Features: {', '.join(status_info['features'])}")
+    _write_lines(
+        [
+            "Tier B Pipeline Status:",
+            "=" * 40,
+            f"Pipeline Type: {status_info['pipeline_type']}",
+            f"Schema Created: {status_info['schema_created']}",
+            f"Refresher Running: {status_info['materialized_view_refresher_running']}",
+            f"Features: {', '.join(status_info['features'])}",
+        ]
+    )
+
 
+def refresh_view(debug: bool = False, dry_run: bool = False, force: bool = False) -> bool:
+    """
+    Refresh the materialized view if new hops arrived since the last refresh.
 
-def refresh_view() -> bool:
-    """Force refresh the materialized view."""
-    logger.info("Forcing refresh of materialized view...")
-    return force_refresh_materialized_view()
+    Args:
+        debug: Log the query plan of the view definition (requires dry_run)
+        dry_run: Do not refresh; only inspect the view definition
+        force: Refresh even when there is no new data
 
+    Returns:
+        True if the refresh (or dry run) was successful, False otherwise
+    """
+    if dry_run:
+        return _explain_refresh(debug)
 
-def check_schema() -> bool:
-    """Check if the Tier B schema exists."""
+    if debug:
+        logger.debug("Skipping EXPLAIN for a real refresh; use --dry-run to inspect the plan")
+
+    logger.info("Refreshing materialized view...")
+    return force_refresh_materialized_view(skip_if_unchanged=not force)
+
+
+def _explain_refresh(debug: bool) -> bool:
+    """Explain the longest_links_mv definition instead of refreshing it."""
     try:
         conn = get_db_connection()
         cursor = get_postgres_cursor(conn)
 
-        # Check if traceroute_hops table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_schema = 'public'
-                AND table_name = 'traceroute_hops'
-            )
-        """)
-        hops_table_exists = cursor.fetchone()["exists"]
+        cursor.execute(
+            "SELECT definition FROM pg_matviews WHERE matviewname = 'longest_links_mv'"
+        )
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            logger.error("Materialized view longest_links_mv does not exist")
+            return False
 
-        # Check if materialized view exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_schema = 'public'
-                AND table_name = 'longest_links_mv'
-            )
-        """)
-        mv_exists = cursor.fetchone()["exists"]
+        if debug:
+            _explain(cursor, row["definition"].rstrip().rstrip(";"))
 
+        # EXPLAIN ANALYZE is read-only for a SELECT, but keep the dry run clean
+        conn.rollback()
         conn.close()
 
-        print("Schema Check:")
-        print("=" * 20)
-        print(f"traceroute_hops table: {'✓' if hops_table_exists else '✗'}")
-        print(f"longest_links_mv view: {'✓' if mv_exists else '✗'}")
+        logger.info("Dry run: materialized view was not refreshed")
+        return True
+
+    except Exception as e:
+        logger.error("Error during refresh dry run: %s", e)
+        return False
+
+
+def check_schema(debug: bool = False, stale_ok: bool = False) -> bool:
+    """
+    Check if the Tier B schema exists.
+
+    Args:
+        debug: Log the query plan of the schema probe
+        stale_ok: Trust a recent successful check instead of connecting
+    """
+    if stale_ok and _read_probe_cache("schema"):
+        _write_lines(["Schema Check:", "=" * 20, "cached: ✓"])
+        return True
+
+    try:
+        conn = get_db_connection()
+        cursor = get_postgres_cursor(conn)
+
+        if debug:
+            _explain(cursor, SCHEMA_PROBE_QUERY)
+
+        # Look up both relations in a single catalog query; pg_class is much
+        # cheaper than information_schema and also covers materialized views
+        cursor.execute(SCHEMA_PROBE_QUERY)
+        existing = {row["relname"] for row in cursor.fetchall()}
+        hops_table_exists = "traceroute_hops" in existing
+        mv_exists = "longest_links_mv" in existing
 
-        return hops_table_exists and mv_exists
+        conn.close()
+
+        _write_lines(
+            [
+                "Schema Check:",
+                "=" * 20,
+                f"traceroute_hops table: {'✓' if hops_table_exists else '✗'}",
+                f"longest_links_mv view: {'✓' if mv_exists else '✗'}",
+            ]
+        )
+
+        if hops_table_exists and mv_exists:
+            _write_probe_cache("schema", {"ok": True})
+            return True
+        return False
 
     except Exception as e:
         logger.error("Error checking schema: %s", e)
         return False
 
 
-def show_stats() -> None:
-    """Show statistics about the Tier B pipeline."""
+def show_stats(debug: bool = False, stale_ok: bool = False) -> None:
+    """
+    Show statistics about the Tier B pipeline.
+
+    Args:
+        debug: Log the query plan of each statistics query
+        stale_ok: Print recently cached statistics instead of connecting
+    """
+    if stale_ok:
+        cached = _read_probe_cache("stats")
+        if cached:
+            _write_lines(cached["lines"])
+            return
+
     try:
         conn = get_db_connection()
         cursor = get_postgres_cursor(conn)
 
-        # Get hop count
-        cursor.execute("SELECT COUNT(*) as count FROM traceroute_hops")
-        hop_count = cursor.fetchone()["count"]
+        # Scalar counts don't need dict rows; a plain cursor returns tuples
+        count_cursor = conn.cursor()
+        counts = {}
+        for name, query in STATS_QUERIES.items():
+            if debug:
+                _explain(cursor, query)
+            count_cursor.execute(query)
+            counts[name] = count_cursor.fetchone()[0]
 
-        # Get recent hop count (last 24 hours)
-        cursor.execute("""
-            SELECT COUNT(*) as count
-            FROM traceroute_hops
-            WHERE timestamp >= NOW() - INTERVAL '24 hours'
-        """)
-        recent_hop_count = cursor.fetchone()["count"]
-
-        # Get materialized view stats
-        cursor.execute("SELECT COUNT(*) as count FROM longest_links_mv")
-        mv_count = cursor.fetchone()["count"]
+        hop_count = counts["hop_count"]
+        recent_hop_count = counts["recent_hop_count"]
+        mv_count = counts["mv_count"]
 
         # Get last refresh time
         cursor.execute("""
@@ -132,12 +321,16 @@ def show_stats() -> None:
 
         conn.close()
 
-        print("Tier B Pipeline Statistics:")
-        print("=" * 40)
-        print(f"Total hops stored: {hop_count:,}")
-        print(f"Recent hops (24h): {recent_hop_count:,}")
-        print(f"Links in materialized view: {mv_count:,}")
-        print(f"Last MV refresh: {last_refresh_time or 'Unknown'}")
+        lines = [
+            "Tier B Pipeline Statistics:",
+            "=" * 40,
+            f"Total hops stored: {hop_count:,}",
+            f"Recent hops (24h): {recent_hop_count:,}",
+            f"Links in materialized view: {mv_count:,}",
+            f"Last MV refresh: {last_refresh_time or 'Unknown'}",
+        ]
+        _write_lines(lines)
+        _write_probe_cache("stats", {"lines": lines})
 
     except Exception as e:
         logger.error("Error getting stats: %s", e)
@@ -148,23 +341,56 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Tier B Pipeline Management")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
+    # Options shared by all commands
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--debug",
+        action="store_true",
+        help="Log EXPLAIN (ANALYZE, BUFFERS) plans for the queries that are run",
+    )
+
     # Init command
-    subparsers.add_parser("init", help="Initialize the Tier B pipeline")
+    subparsers.add_parser("init", parents=[common], help="Initialize the Tier B pipeline")
 
     # Shutdown command
-    subparsers.add_parser("shutdown", help="Shutdown the Tier B pipeline")
+    subparsers.add_parser("shutdown", parents=[common], help="Shutdown the Tier B pipeline")
 
     # Status command
-    subparsers.add_parser("status", help="Show pipeline status")
+    subparsers.add_parser("status", parents=[common], help="Show pipeline status")
 
     # Refresh command
-    subparsers.add_parser("refresh", help="Force refresh materialized view")
+    refresh_parser = subparsers.add_parser(
+        "refresh", parents=[common], help="Refresh materialized view if there is new data"
+    )
+    refresh_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Do not refresh; with --debug, explain the view definition instead",
+    )
+    refresh_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Refresh even if no new hops arrived since the last refresh",
+    )
+
+    # Options for read-only probes that may be answered from the local cache
+    cacheable = argparse.ArgumentParser(add_help=False)
+    cacheable.add_argument(
+        "--stale-ok",
+        action="store_true",
+        help=f"Reuse a result cached within the last {PROBE_CACHE_TTL_SECONDS}s "
+        "instead of connecting to the database",
+    )
 
     # Check schema command
-    subparsers.add_parser("check-schema", help="Check if schema exists")
+    subparsers.add_parser(
+        "check-schema", parents=[common, cacheable], help="Check if schema exists"
+    )
 
     # Stats command
-    subparsers.add_parser("stats", help="Show pipeline statistics")
+    subparsers.add_parser(
+        "stats", parents=[common, cacheable], help="Show pipeline statistics"
+    )
 
     args = parser.parse_args()
 
@@ -172,6 +398,9 @@ def main() -> None:
         parser.print_help()
         return
 
+    if args.debug:
+        logger.setLevel(logging.DEBUG)
+
     try:
         if args.command == "init":
             success = init_pipeline()
@@ -184,15 +413,17 @@ def main() -> None:
             status()
 
         elif args.command == "refresh":
-            success = refresh_view()
+            success = refresh_view(
+                debug=args.debug, dry_run=args.dry_run, force=args.force
+            )
             sys.exit(0 if success else 1)
 
         elif args.command == "check-schema":
-            success = check_schema()
+            success = check_schema(debug=args.debug, stale_ok=args.stale_ok)
             sys.exit(0 if success else 1)
 
         elif args.command == "stats":
-            show_stats()
+            show_stats(debug=args.debug, stale_ok=args.stale_ok)
 
     except KeyboardInterrupt:
         logger.info("Operation cancelled by user")
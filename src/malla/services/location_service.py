@@ -5,26 +5,75 @@ Location service for Meshtastic Mesh Health Web UI
 import logging
 import math
 import time
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
 from datetime import UTC, datetime
 from typing import Any
 
 from ..database.repositories import LocationRepository
+from ..utils.formatting import EST_TIMESTAMP_FORMAT
+from ..utils.geo_utils import (
+    EARTH_RADIUS_KM,
+    GeoPointIndex,
+    find_close_pairs,
+    summarize_pairwise_distances,
+)
 
 logger = logging.getLogger(__name__)
 
+# Timestamps are rendered with time.strftime on struct_time tuples, which
+# avoids building a datetime per row: EST values from a shifted gmtime tuple,
+# link last-seen values in server local time
+EST_UTC_OFFSET_SECONDS = -5 * 3600
+LAST_SEEN_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Location freshness categories and the age (seconds) at which each of the
+# first four ends: < 1 hour, < 1 day, < 1 week, < 1 month, >= 1 month
+FRESHNESS_CATEGORIES = ("very_fresh", "fresh", "recent", "old", "very_old")
+FRESHNESS_BOUNDS_SECONDS = (3600, 86400, 7 * 86400, 30 * 86400)
+
+# Gateway ids are stored as "!<hex node id>"; GATEWAY_NODE_ID_SQL converts a
+# matching gateway_id to the numeric node id in PostgreSQL and yields NULL for
+# anything else. The check lives inside CASE because PostgreSQL may evaluate
+# WHERE conditions in any order, so a separate filter could not stop the cast
+# from failing the whole query on a malformed id.
+GATEWAY_ID_PATTERN = "^![0-9a-fA-F]{1,8}$"
+GATEWAY_NODE_ID_SQL = (
+    f"CASE WHEN gateway_id ~ '{GATEWAY_ID_PATTERN}' THEN "
+    "('x' || lpad(substring(gateway_id from 2), 8, '0'))::bit(32)::bigint END"
+)
+
+# Rows fetched per round trip when streaming packet link aggregates
+PACKET_LINKS_FETCH_SIZE = 10000
+
+# Haversine constants
+DEG2RAD = math.pi / 180
+HALF_DEG2RAD = DEG2RAD / 2
+EARTH_DIAMETER_KM = 2 * EARTH_RADIUS_KM
+
 
 class LocationService:
     """Service for location-related operations and calculations."""
 
+    # Node positions and their spatial index, shared by the statistics,
+    # hop distance and neighbor queries
+    _cache: dict[str, tuple[float, Any]] = {}
+    _cache_ttl_seconds = 30
+
     @staticmethod
     def get_node_locations(
         filters: dict[str, Any] | None = None,
+        include_network: bool = True,
     ) -> list[dict[str, Any]]:
         """
         Get all node locations with formatted display information and network topology data.
 
         Args:
             filters: Optional filters to apply (start_time, end_time, gateway_id, node_ids, etc.)
+            include_network: Whether to query traceroute topology and packet links
+                for neighbor data. Callers that only need positions can skip it;
+                rows then report no neighbors and no network statistics.
 
         Returns:
             List of location dictionaries with additional display fields and network analysis
@@ -45,90 +94,71 @@ class LocationService:
         if not locations:
             return []
 
-        # Apply age filtering if specified
-        age_filter_start = time.time()
+        # min_age_hours is applied by the repository query; max_age filtering
+        # is handled client-side
         current_time = datetime.now().timestamp()
-        # Remove server-side max_age filtering - now handled client-side
-        # if filters.get("max_age_hours"):
-        #     max_age_seconds = filters["max_age_hours"] * 3600
-        #     cutoff_time = current_time - max_age_seconds
-        #     locations = [loc for loc in locations if loc["timestamp"] >= cutoff_time]
-        #     logger.info(
-        #         f"Applied max_age_hours filter: {len(locations)} locations remain after filtering"
-        #     )
-
-        if filters.get("min_age_hours"):
-            min_age_seconds = filters["min_age_hours"] * 3600
-            cutoff_time = current_time - min_age_seconds
-            locations = [loc for loc in locations if loc["timestamp"] <= cutoff_time]
-            logger.info(
-                f"Applied min_age_hours filter: {len(locations)} locations remain after filtering"
-            )
-        timing_breakdown["age_filtering"] = time.time() - age_filter_start
 
-        if not locations:
-            return []
+        # Time range and gateway filters shared by the topology and packet
+        # link queries
+        shared_filters = {
+            key: filters[key]
+            for key in ("start_time", "end_time", "gateway_id")
+            if filters.get(key)
+        }
 
         # Get network topology data from traceroute analysis
         network_start = time.time()
-        try:
-            from ..services.traceroute_service import TracerouteService
-
-            # Extract time parameters from filters for network analysis
-            hours = 24  # Default to 24 hours – sufficient for map neighbour analysis
-            if filters.get("start_time") and filters.get("end_time"):
-                # Calculate hours from time range
-                time_diff = filters["end_time"] - filters["start_time"]
-                hours = max(
-                    1, min(168, int(time_diff / 3600))
-                )  # Between 1 and 168 hours
-            elif filters.get("max_age_hours"):
-                hours = min(168, filters["max_age_hours"])
-
-            # Pass the same filters to network analysis for consistency
-            network_filters = {}
-            if filters.get("start_time"):
-                network_filters["start_time"] = filters["start_time"]
-            if filters.get("end_time"):
-                network_filters["end_time"] = filters["end_time"]
-            if filters.get("gateway_id"):
-                network_filters["gateway_id"] = filters["gateway_id"]
-
-            network_data = TracerouteService.get_network_graph_data(
-                hours=hours,
-                include_indirect=False,
-                filters=network_filters,
-                limit_packets=2000,
-            )
-        except Exception as e:
-            logger.warning("Failed to get network topology data: %s", e)
+        if not include_network:
             network_data = {"nodes": [], "links": []}
+        else:
+            try:
+                from ..services.traceroute_service import TracerouteService
+
+                # Extract time parameters from filters for network analysis
+                hours = 24  # Default to 24 hours – sufficient for map neighbour analysis
+                if filters.get("start_time") and filters.get("end_time"):
+                    # Calculate hours from time range
+                    time_diff = filters["end_time"] - filters["start_time"]
+                    hours = max(
+                        1, min(168, int(time_diff / 3600))
+                    )  # Between 1 and 168 hours
+                elif filters.get("max_age_hours"):
+                    hours = min(168, filters["max_age_hours"])
+
+                # Pass the same filters to network analysis for consistency.
+                # get_network_graph_data adds its own keys, so give it a copy.
+                network_data = TracerouteService.get_network_graph_data(
+                    hours=hours,
+                    include_indirect=False,
+                    filters=dict(shared_filters),
+                    limit_packets=2000,
+                )
+            except Exception as e:
+                logger.warning("Failed to get network topology data: %s", e)
+                network_data = {"nodes": [], "links": []}
         timing_breakdown["network_topology"] = time.time() - network_start
 
         # Create lookup maps for network data
         network_processing_start = time.time()
-        network_nodes = {node["id"]: node for node in network_data.get("nodes", [])}
+        network_links = network_data.get("links") or []
+        network_nodes = {node["id"]: node for node in network_data.get("nodes") or []}
 
-        # Create neighbor count maps
-        neighbor_counts = {}
-        neighbor_details: dict[int, list[dict[str, Any]]] = {}
+        # Create neighbor count maps. neighbor_index maps node -> neighbor ->
+        # the entry stored in neighbor_details so packet links merge in O(1).
+        neighbor_counts: defaultdict[int, int] = defaultdict(int)
+        neighbor_details: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+        neighbor_index: defaultdict[int, dict[int, dict[str, Any]]] = defaultdict(dict)
 
         # Process network links to build neighbor relationships
-        for link in network_data.get("links", []):
+        warn = logger.warning
+        for link in network_links:
             if "source" not in link or "target" not in link:
-                logger.warning("Link missing source/target fields: %s", link)
+                warn("Link missing source/target fields: %s", link)
                 continue
             source_id = link["source"]
             target_id = link["target"]
 
             # Track neighbors
-            if source_id not in neighbor_counts:
-                neighbor_counts[source_id] = 0
-                neighbor_details[source_id] = []
-            if target_id not in neighbor_counts:
-                neighbor_counts[target_id] = 0
-                neighbor_details[target_id] = []
-
             neighbor_counts[source_id] += 1
             neighbor_counts[target_id] += 1
 
@@ -136,101 +166,77 @@ class LocationService:
             avg_snr = link.get("avg_snr")
             traceroute_count = link.get("packet_count", 0)
 
-            neighbor_details[source_id].append(
-                {
-                    "neighbor_id": target_id,
-                    "avg_snr": avg_snr,
-                    "traceroute_count": traceroute_count,
-                    "packet_count": 0,  # Will be updated if direct packets exist
-                }
-            )
-            neighbor_details[target_id].append(
-                {
-                    "neighbor_id": source_id,
-                    "avg_snr": avg_snr,
-                    "traceroute_count": traceroute_count,
-                    "packet_count": 0,  # Will be updated if direct packets exist
-                }
-            )
+            source_entry = {
+                "neighbor_id": target_id,
+                "avg_snr": avg_snr,
+                "traceroute_count": traceroute_count,
+                "packet_count": 0,  # Will be updated if direct packets exist
+            }
+            target_entry = {
+                "neighbor_id": source_id,
+                "avg_snr": avg_snr,
+                "traceroute_count": traceroute_count,
+                "packet_count": 0,  # Will be updated if direct packets exist
+            }
+            neighbor_details[source_id].append(source_entry)
+            neighbor_details[target_id].append(target_entry)
+            # Keep the first entry per pair, matching the previous linear lookup
+            neighbor_index[source_id].setdefault(target_id, source_entry)
+            neighbor_index[target_id].setdefault(source_id, target_entry)
 
         # Get direct packet links to include in neighbor data
         try:
             # Pass the same filters to get packet links for consistency
-            packet_filters = {}
-            if filters.get("start_time"):
-                packet_filters["start_time"] = filters["start_time"]
-            if filters.get("end_time"):
-                packet_filters["end_time"] = filters["end_time"]
-            if filters.get("gateway_id"):
-                packet_filters["gateway_id"] = filters["gateway_id"]
-
-            packet_links = LocationService.get_packet_links(packet_filters)
+            packet_links = (
+                LocationService.get_packet_links(shared_filters)
+                if include_network
+                else []
+            )
 
             # Process packet links to add to neighbor details
             for link in packet_links:
                 from_node_id = link["from_node_id"]
                 to_node_id = link["to_node_id"]
                 packet_count = link.get("total_hops_seen", 0)
-
-                # Initialize neighbor tracking if not already present
-                if from_node_id not in neighbor_counts:
-                    neighbor_counts[from_node_id] = 0
-                    neighbor_details[from_node_id] = []
-                if to_node_id not in neighbor_counts:
-                    neighbor_counts[to_node_id] = 0
-                    neighbor_details[to_node_id] = []
+                avg_rssi = link.get("avg_rssi")
 
                 # Check if we already have this neighbor relationship from traceroute data
-                existing_neighbor_from = next(
-                    (
-                        n
-                        for n in neighbor_details[from_node_id]
-                        if n["neighbor_id"] == to_node_id
-                    ),
-                    None,
-                )
-                existing_neighbor_to = next(
-                    (
-                        n
-                        for n in neighbor_details[to_node_id]
-                        if n["neighbor_id"] == from_node_id
-                    ),
-                    None,
-                )
+                existing_neighbor_from = neighbor_index[from_node_id].get(to_node_id)
+                existing_neighbor_to = neighbor_index[to_node_id].get(from_node_id)
 
                 if existing_neighbor_from:
                     # Update existing neighbor with packet data
                     existing_neighbor_from["packet_count"] = packet_count
-                    existing_neighbor_from["avg_rssi"] = link.get("avg_rssi")
+                    existing_neighbor_from["avg_rssi"] = avg_rssi
                 else:
                     # Add new neighbor from packet data
                     neighbor_counts[from_node_id] += 1
-                    neighbor_details[from_node_id].append(
-                        {
-                            "neighbor_id": to_node_id,
-                            "avg_snr": link.get("avg_snr"),
-                            "avg_rssi": link.get("avg_rssi"),
-                            "traceroute_count": 0,
-                            "packet_count": packet_count,
-                        }
-                    )
+                    entry = {
+                        "neighbor_id": to_node_id,
+                        "avg_snr": link.get("avg_snr"),
+                        "avg_rssi": avg_rssi,
+                        "traceroute_count": 0,
+                        "packet_count": packet_count,
+                    }
+                    neighbor_details[from_node_id].append(entry)
+                    neighbor_index[from_node_id][to_node_id] = entry
 
                 if existing_neighbor_to:
                     # Update existing neighbor with packet data
                     existing_neighbor_to["packet_count"] = packet_count
-                    existing_neighbor_to["avg_rssi"] = link.get("avg_rssi")
+                    existing_neighbor_to["avg_rssi"] = avg_rssi
                 else:
                     # Add new neighbor from packet data
                     neighbor_counts[to_node_id] += 1
-                    neighbor_details[to_node_id].append(
-                        {
-                            "neighbor_id": from_node_id,
-                            "avg_snr": link.get("avg_snr"),
-                            "avg_rssi": link.get("avg_rssi"),
-                            "traceroute_count": 0,
-                            "packet_count": packet_count,
-                        }
-                    )
+                    entry = {
+                        "neighbor_id": from_node_id,
+                        "avg_snr": link.get("avg_snr"),
+                        "avg_rssi": avg_rssi,
+                        "traceroute_count": 0,
+                        "packet_count": packet_count,
+                    }
+                    neighbor_details[to_node_id].append(entry)
+                    neighbor_index[to_node_id][from_node_id] = entry
 
         except Exception as e:
             logger.warning("Failed to get packet links for neighbor data: %s", e)
@@ -240,27 +246,13 @@ class LocationService:
         # Enhance location data with network topology information
         enhancement_start = time.time()
         # current_time already calculated above for age filtering
-        enhanced_locations = []
-
-        for location in locations:
-            node_id = location["node_id"]
-
-            # Calculate age in hours
-            age_hours = (current_time - location["timestamp"]) / 3600
-
-            # Format timestamp string
-            from datetime import timedelta, timezone
-
-            est = timezone(timedelta(hours=-5))  # EST is UTC-5
-            timestamp_dt = datetime.fromtimestamp(location["timestamp"], tz=est)
-            timestamp_str = timestamp_dt.strftime("%Y-%m-%d %H:%M:%S EST")
-
-            # Get network data for this node
-            network_node = network_nodes.get(node_id, {})
-            direct_neighbors = neighbor_counts.get(node_id, 0)
-            neighbors = neighbor_details.get(node_id, [])
-
-            enhanced_location = {
+        inv_3600 = 1 / 3600.0
+        no_network_node: dict[str, Any] = {}
+        get_network_node = network_nodes.get
+        get_neighbor_count = neighbor_counts.get
+        get_neighbor_details = neighbor_details.get
+        enhanced_locations = [
+            {
                 # Original location data
                 "node_id": location["node_id"],
                 "hex_id": location["hex_id"],
@@ -275,10 +267,15 @@ class LocationService:
                 "altitude": location["altitude"],
                 "timestamp": location["timestamp"],
                 # Enhanced fields for map display
-                "age_hours": round(age_hours, 2),
-                "timestamp_str": timestamp_str,
-                "direct_neighbors": direct_neighbors,
-                "neighbors": neighbors,
+                "age_hours": round(
+                    (current_time - location["timestamp"]) * inv_3600, 2
+                ),
+                "timestamp_str": time.strftime(
+                    EST_TIMESTAMP_FORMAT,
+                    time.gmtime(location["timestamp"] + EST_UTC_OFFSET_SECONDS),
+                ),
+                "direct_neighbors": get_neighbor_count(location["node_id"], 0),
+                "neighbors": get_neighbor_details(location["node_id"], []),
                 "sats_in_view": location.get("sats_in_view"),
                 "precision_bits": location.get("precision_bits"),
                 "precision_meters": location.get("precision_meters"),
@@ -287,8 +284,11 @@ class LocationService:
                 "avg_snr": network_node.get("avg_snr"),
                 "last_seen_network": network_node.get("last_seen"),
             }
-
-            enhanced_locations.append(enhanced_location)
+            for location in locations
+            for network_node in (
+                get_network_node(location["node_id"], no_network_node),
+            )
+        ]
         timing_breakdown["enhancement"] = time.time() - enhancement_start
 
         total_service_time = time.time() - service_start
@@ -334,15 +334,6 @@ class LocationService:
             elif filters.get("max_age_hours"):
                 hours = min(168, filters["max_age_hours"])
 
-            # Pass the same filters to network analysis for consistency
-            network_filters = {}
-            if filters.get("start_time"):
-                network_filters["start_time"] = filters["start_time"]
-            if filters.get("end_time"):
-                network_filters["end_time"] = filters["end_time"]
-            if filters.get("gateway_id"):
-                network_filters["gateway_id"] = filters["gateway_id"]
-
             # Use Tier B optimized pipeline for traceroute links
             from ..database.schema_tier_b import get_longest_links_optimized
 
@@ -352,69 +343,50 @@ class LocationService:
                 min_snr=-50.0,  # Include all SNR values
                 max_results=1000,  # Get up to 1000 links
                 hours=hours,
+                # Drop long distance links (likely MQTT/internet)
+                max_distance_km=250,
             )
 
-            # Convert Tier B format to network graph format with distance filtering
-            network_data: dict[str, Any] = {"links": [], "nodes": {}}
-            max_distance_km = 250  # Filter out links longer than 250km
+            # Convert Tier B links straight to the map format
+            current_time = datetime.now().timestamp()
+            inv_3600 = 1 / 3600.0
+            strftime = time.strftime
+            localtime = time.localtime
 
             logger.info("Processing %s tier_b_links", len(tier_b_links))
+            traceroute_links = []
+            append = traceroute_links.append
             for link in tier_b_links:
-                logger.debug("Link structure: %s", list(link.keys()))
-
-                # Check distance and filter out long-distance links (likely MQTT/internet)
-                distance_km = link.get("distance_km")
-                if distance_km is not None and distance_km > max_distance_km:
-                    logger.debug(
-                        f"Filtering out link from {link['from_node_id']} to {link['to_node_id']} - distance {distance_km}km > {max_distance_km}km"
-                    )
-                    continue
-
-                network_data["links"].append(
+                last_seen = link["last_seen"]
+                if hasattr(last_seen, "timestamp"):
+                    last_seen = last_seen.timestamp()
+                packet_count = link["traceroute_count"]
+
+                # Calculate success rate (using packet count as proxy), clamped
+                # to 10-100%. Higher packet count suggests more reliable link
+                success_rate = packet_count * 10
+                if success_rate < 10:
+                    success_rate = 10
+                elif success_rate > 100:
+                    success_rate = 100
+
+                append(
                     {
-                        "source": link["from_node_id"],
-                        "target": link["to_node_id"],
-                        "last_seen": link["last_seen"].timestamp()
-                        if hasattr(link["last_seen"], "timestamp")
-                        else link["last_seen"],
-                        "packet_count": link["traceroute_count"],
+                        "from_node_id": link["from_node_id"],
+                        "to_node_id": link["to_node_id"],
+                        "success_rate": success_rate,
                         "avg_snr": link["snr"],
+                        "age_hours": round((current_time - last_seen) * inv_3600, 2),
+                        "last_seen_str": strftime(
+                            LAST_SEEN_FORMAT, localtime(last_seen)
+                        ),
+                        "is_bidirectional": True,  # Network graph links are bidirectional by design
+                        "total_hops_seen": packet_count,
                         "last_packet_id": None,  # Not available in Tier B format
-                        "distance_km": distance_km,
+                        "distance_km": link.get("distance_km"),
                     }
                 )
 
-            # Convert network links to map-compatible format
-            traceroute_links = []
-            current_time = datetime.now().timestamp()
-
-            for link in network_data.get("links", []):
-                # Calculate age in hours
-                age_hours = (current_time - link["last_seen"]) / 3600
-
-                # Format last seen string
-                last_seen_dt = datetime.fromtimestamp(link["last_seen"])
-                last_seen_str = last_seen_dt.strftime("%Y-%m-%d %H:%M:%S")
-
-                # Calculate success rate (using packet count as proxy)
-                # Higher packet count suggests more reliable link
-                success_rate = min(100, max(10, link["packet_count"] * 10))
-
-                traceroute_link = {
-                    "from_node_id": link["source"],
-                    "to_node_id": link["target"],
-                    "success_rate": success_rate,
-                    "avg_snr": link.get("avg_snr"),
-                    "age_hours": round(age_hours, 2),
-                    "last_seen_str": last_seen_str,
-                    "is_bidirectional": True,  # Network graph links are bidirectional by design
-                    "total_hops_seen": link["packet_count"],
-                    "last_packet_id": link.get("last_packet_id"),
-                    "distance_km": link.get("distance_km"),
-                }
-
-                traceroute_links.append(traceroute_link)
-
             logger.info("Generated %s traceroute links", len(traceroute_links))
             return traceroute_links
 
@@ -454,7 +426,7 @@ class LocationService:
         try:
             # Use provided locations list if available to avoid duplicate heavy queries
             if locations is None:
-                locations = LocationRepository.get_node_locations()
+                locations = LocationService.get_cached_node_locations()
 
             if not locations:
                 return {
@@ -475,10 +447,9 @@ class LocationService:
             # Count recent nodes (last 24 hours)
             current_time = datetime.now().timestamp()
             twenty_four_hours_ago = current_time - (24 * 3600)
-            recent_nodes = [
-                loc for loc in locations if loc["timestamp"] >= twenty_four_hours_ago
-            ]
-            recent_nodes_count = len(recent_nodes)
+            recent_nodes_count = sum(
+                1 for loc in locations if loc["timestamp"] >= twenty_four_hours_ago
+            )
 
             # Get position packet statistics from database
             from ..database.connection import get_db_connection
@@ -487,41 +458,53 @@ class LocationService:
             conn = get_db_connection()
             cursor = get_postgres_cursor(conn)
 
-            # Total position packets
-            cursor.execute("""
-                SELECT COUNT(*) as total_count
-                FROM packet_history
-                WHERE portnum = 3  -- POSITION_APP
-                AND raw_payload IS NOT NULL
-            """)
-            result = cursor.fetchone()
-            total_position_packets = result["total_count"] if result else 0
-
-            # Recent position packets (last 24 hours)
+            # Total and recent (last 24 hours) position packets in one scan
             cursor.execute(
                 """
-                SELECT COUNT(*) as recent_count
+                SELECT
+                    COUNT(*) as total_count,
+                    COUNT(*) FILTER (WHERE timestamp > %s) as recent_count
                 FROM packet_history
                 WHERE portnum = 3  -- POSITION_APP
                 AND raw_payload IS NOT NULL
-                AND timestamp > %s
             """,
                 (twenty_four_hours_ago,),
             )
             result = cursor.fetchone()
+            total_position_packets = result["total_count"] if result else 0
             recent_position_packets = result["recent_count"] if result else 0
 
             conn.close()
 
-            # Calculate geographic boundaries and center
-            lats = [loc["latitude"] for loc in locations]
-            lons = [loc["longitude"] for loc in locations]
-            alts = [
-                loc["altitude"] for loc in locations if loc.get("altitude") is not None
-            ]
+            # Calculate geographic boundaries, center and elevation range in a
+            # single pass instead of building and scanning per-field lists
+            min_lat = max_lat = locations[0]["latitude"]
+            min_lon = max_lon = locations[0]["longitude"]
+            min_alt = max_alt = None
+            alt_total = 0.0
+            alt_count = 0
+            for loc in locations:
+                lat = loc["latitude"]
+                lon = loc["longitude"]
+                if lat < min_lat:
+                    min_lat = lat
+                elif lat > max_lat:
+                    max_lat = lat
+                if lon < min_lon:
+                    min_lon = lon
+                elif lon > max_lon:
+                    max_lon = lon
+                alt = loc.get("altitude")
+                if alt is not None:
+                    if alt_count == 0:
+                        min_alt = max_alt = alt
+                    elif alt < min_alt:
+                        min_alt = alt
+                    elif alt > max_alt:
+                        max_alt = alt
+                    alt_total += alt
+                    alt_count += 1
 
-            min_lat, max_lat = min(lats), max(lats)
-            min_lon, max_lon = min(lons), max(lons)
             center_lat = (min_lat + max_lat) / 2
             center_lon = (min_lon + max_lon) / 2
 
@@ -538,13 +521,13 @@ class LocationService:
 
             # Elevation statistics
             elevation_stats = {}
-            if alts:
+            if alt_count:
                 elevation_stats = {
-                    "min_elevation": min(alts),
-                    "max_elevation": max(alts),
-                    "avg_elevation": sum(alts) / len(alts),
-                    "nodes_with_elevation": len(alts),
-                    "elevation_range": max(alts) - min(alts),
+                    "min_elevation": min_alt,
+                    "max_elevation": max_alt,
+                    "avg_elevation": alt_total / alt_count,
+                    "nodes_with_elevation": alt_count,
+                    "elevation_range": max_alt - min_alt,
                 }
 
             # Calculate distances between nodes for density analysis
@@ -591,45 +574,40 @@ class LocationService:
         logger.info("Calculating hop distances between nodes")
 
         try:
-            locations = LocationService.get_node_locations()
+            locations = LocationService.get_cached_node_locations()
 
             if len(locations) < 2:
                 return []
 
-            # Calculate distances between all pairs
-            distances = []
-
-            for i, loc1 in enumerate(locations):
-                for _j, loc2 in enumerate(locations[i + 1 :], i + 1):
-                    distance_km = LocationService.calculate_haversine_distance(
-                        loc1["latitude"],
-                        loc1["longitude"],
-                        loc2["latitude"],
-                        loc2["longitude"],
-                    )
+            # Only pairs within a reasonable hop distance (< 50km for mesh networks)
+            close_pairs = find_close_pairs(
+                [(loc["latitude"], loc["longitude"]) for loc in locations], 50
+            )
 
-                    # Only include reasonable hop distances (< 50km for mesh networks)
-                    if distance_km <= 50:
-                        distances.append(
-                            {
-                                "node1_id": loc1["node_id"],
-                                "node1_name": loc1["display_name"],
-                                "node2_id": loc2["node_id"],
-                                "node2_name": loc2["display_name"],
-                                "distance_km": round(distance_km, 2),
-                                "distance_meters": round(distance_km * 1000, 0),
-                                "node1_location": {
-                                    "latitude": loc1["latitude"],
-                                    "longitude": loc1["longitude"],
-                                    "altitude": loc1.get("altitude"),
-                                },
-                                "node2_location": {
-                                    "latitude": loc2["latitude"],
-                                    "longitude": loc2["longitude"],
-                                    "altitude": loc2.get("altitude"),
-                                },
-                            }
-                        )
+            distances = []
+            for i, j, distance_km in close_pairs:
+                loc1 = locations[i]
+                loc2 = locations[j]
+                distances.append(
+                    {
+                        "node1_id": loc1["node_id"],
+                        "node1_name": loc1["display_name"],
+                        "node2_id": loc2["node_id"],
+                        "node2_name": loc2["display_name"],
+                        "distance_km": round(distance_km, 2),
+                        "distance_meters": round(distance_km * 1000, 0),
+                        "node1_location": {
+                            "latitude": loc1["latitude"],
+                            "longitude": loc1["longitude"],
+                            "altitude": loc1.get("altitude"),
+                        },
+                        "node2_location": {
+                            "latitude": loc2["latitude"],
+                            "longitude": loc2["longitude"],
+                            "altitude": loc2.get("altitude"),
+                        },
+                    }
+                )
 
             # Sort by distance
             distances.sort(key=lambda x: x["distance_km"])
@@ -658,50 +636,43 @@ class LocationService:
         logger.info("Finding neighbors for node %s within %skm", node_id, max_distance_km)
 
         try:
-            locations = LocationService.get_node_locations()
+            locations, index, node_positions = LocationService._get_location_index()
 
             # Find target node location
-            target_location = None
-            for loc in locations:
-                if loc["node_id"] == node_id:
-                    target_location = loc
-                    break
-
-            if not target_location:
+            position = node_positions.get(node_id)
+            if position is None:
                 logger.warning("No location found for node %s", node_id)
                 return []
+            target_location = locations[position]
 
             # Find neighbors within distance
             neighbors = []
 
-            for loc in locations:
+            for i, distance_km in index.query_radius(
+                target_location["latitude"],
+                target_location["longitude"],
+                max_distance_km,
+            ):
+                loc = locations[i]
                 if loc["node_id"] == node_id:
                     continue  # Skip self
 
-                distance_km = LocationService.calculate_haversine_distance(
-                    target_location["latitude"],
-                    target_location["longitude"],
-                    loc["latitude"],
-                    loc["longitude"],
+                neighbors.append(
+                    {
+                        "node_id": loc["node_id"],
+                        "display_name": loc["display_name"],
+                        "distance_km": round(distance_km, 2),
+                        "distance_meters": round(distance_km * 1000, 0),
+                        "location": {
+                            "latitude": loc["latitude"],
+                            "longitude": loc["longitude"],
+                            "altitude": loc.get("altitude"),
+                        },
+                        "hw_model": loc.get("hw_model"),
+                        "last_updated": loc.get("timestamp"),
+                    }
                 )
 
-                if distance_km <= max_distance_km:
-                    neighbors.append(
-                        {
-                            "node_id": loc["node_id"],
-                            "display_name": loc["display_name"],
-                            "distance_km": round(distance_km, 2),
-                            "distance_meters": round(distance_km * 1000, 0),
-                            "location": {
-                                "latitude": loc["latitude"],
-                                "longitude": loc["longitude"],
-                                "altitude": loc.get("altitude"),
-                            },
-                            "hw_model": loc.get("hw_model"),
-                            "last_updated": loc.get("timestamp"),
-                        }
-                    )
-
             # Sort by distance
             neighbors.sort(key=lambda x: x["distance_km"])
 
@@ -712,6 +683,104 @@ class LocationService:
             logger.error("Error finding neighbors for node %s: %s", node_id, e)
             raise
 
+    @staticmethod
+    def _get_location_index() -> tuple[
+        list[dict[str, Any]], GeoPointIndex, dict[int, int]
+    ]:
+        """
+        Get node locations together with a spatial index over them.
+
+        All are cached for a short time so repeated neighbor queries don't
+        rebuild the location list and indexes for every node.
+
+        Returns:
+            Tuple of (locations, index, node_positions) where index positions
+            refer to locations and node_positions maps node_id to its position
+        """
+        cache_key = "location_index"
+        now = time.time()
+
+        if cache_key in LocationService._cache:
+            cached_time, cached_data = LocationService._cache[cache_key]
+            if now - cached_time < LocationService._cache_ttl_seconds:
+                return cached_data
+
+        locations = LocationService.get_cached_node_locations()
+        index = GeoPointIndex([(loc["latitude"], loc["longitude"]) for loc in locations])
+        # Built in reverse so the first location of a node wins
+        node_positions = {
+            locations[i]["node_id"]: i for i in range(len(locations) - 1, -1, -1)
+        }
+        LocationService._cache[cache_key] = (now, (locations, index, node_positions))
+        return locations, index, node_positions
+
+    @staticmethod
+    def get_cached_node_locations(
+        filters: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Get node positions, reusing a recent result for the same filters.
+
+        Statistics, hop distances and neighbor queries only need coordinates,
+        so the traceroute and packet-link enhancement is skipped and the
+        result is shared when a page asks for them back to back.
+
+        Args:
+            filters: Optional filters, as accepted by get_node_locations
+
+        Returns:
+            List of enhanced location dictionaries
+        """
+        filters = filters or {}
+        cache_key = f"locations:{sorted(filters.items())!r}"
+        now = time.time()
+
+        if cache_key in LocationService._cache:
+            cached_time, cached_data = LocationService._cache[cache_key]
+            if now - cached_time < LocationService._cache_ttl_seconds:
+                return cached_data
+
+        locations = LocationService.get_node_locations(filters, include_network=False)
+        LocationService._cache[cache_key] = (now, locations)
+        return locations
+
+    @staticmethod
+    def _get_locations_by_node(node_ids: set[int]) -> dict[int, dict[str, Any]]:
+        """
+        Get the latest location of each node, keyed by node id.
+
+        The last lookup is kept for a short time and reused while it covers
+        every requested node, so repeated map polls over the same links skip
+        the position query.
+
+        Args:
+            node_ids: Node ids to look up
+
+        Returns:
+            Mapping of node_id to location for the nodes that have one
+        """
+        cache_key = "locations_by_node"
+        now = time.time()
+
+        if cache_key in LocationService._cache:
+            cached_time, (cached_ids, cached_map) = LocationService._cache[cache_key]
+            if (
+                now - cached_time < LocationService._cache_ttl_seconds
+                and node_ids <= cached_ids
+            ):
+                return cached_map
+
+        locations = LocationRepository.get_node_locations({"node_ids": list(node_ids)})
+        location_map = {loc["node_id"]: loc for loc in locations}
+        LocationService._cache[cache_key] = (now, (frozenset(node_ids), location_map))
+        return location_map
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the location service cache."""
+        LocationService._cache.clear()
+        logger.info("Location service cache cleared")
+
     @staticmethod
     def calculate_haversine_distance(
         lat1: float, lon1: float, lat2: float, lon2: float
@@ -726,27 +795,58 @@ class LocationService:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        R = 6371.0
+        sin = math.sin
+        cos = math.cos
+        a = (
+            sin((lat2 - lat1) * HALF_DEG2RAD) ** 2
+            + cos(lat1 * DEG2RAD)
+            * cos(lat2 * DEG2RAD)
+            * sin((lon2 - lon1) * HALF_DEG2RAD) ** 2
+        )
+        return EARTH_DIAMETER_KM * math.asin(math.sqrt(min(1.0, a)))
 
-        # Convert decimal degrees to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
+    @staticmethod
+    def calculate_haversine_distance_batch(
+        lat1: Sequence[float],
+        lon1: Sequence[float],
+        lat2: Sequence[float],
+        lon2: Sequence[float],
+    ) -> list[float]:
+        """
+        Calculate great circle distances for many point pairs at once.
 
-        # Haversine formula
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+        Equivalent to calling calculate_haversine_distance for each index, but
+        the math functions and constants are bound once for the whole batch.
 
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        Args:
+            lat1, lon1: Latitudes and longitudes of the first points
+            lat2, lon2: Latitudes and longitudes of the second points
 
-        distance = R * c
-        return distance
+        Returns:
+            Distances in kilometers, one per pair
+        """
+        sin = math.sin
+        cos = math.cos
+        asin = math.asin
+        sqrt = math.sqrt
+        half = HALF_DEG2RAD
+        deg2rad = DEG2RAD
+        diameter = EARTH_DIAMETER_KM
+        return [
+            diameter
+            * asin(
+                sqrt(
+                    min(
+                        1.0,
+                        sin((la2 - la1) * half) ** 2
+                        + cos(la1 * deg2rad)
+                        * cos(la2 * deg2rad)
+                        * sin((lo2 - lo1) * half) ** 2,
+                    )
+                )
+            )
+            for la1, lo1, la2, lo2 in zip(lat1, lon1, lat2, lon2, strict=True)
+        ]
 
     @staticmethod
     def _calculate_coverage_area(
@@ -773,45 +873,48 @@ class LocationService:
         if not locations:
             return {}
 
-        # Categorize by age
-        age_categories = {
-            "very_fresh": 0,  # < 1 hour
-            "fresh": 0,  # < 1 day
-            "recent": 0,  # < 1 week
-            "old": 0,  # < 1 month
-            "very_old": 0,  # >= 1 month
-        }
-
-        ages = []
+        # Categorize by age: bisecting the bucket bounds gives the category
+        # index directly instead of walking an if/elif ladder per location.
+        # It is a single C call, which beats summing the four ">= bound"
+        # comparisons when run by the interpreter.
+        counts = [0] * len(FRESHNESS_CATEGORIES)
+        # Age statistics are kept as running values in the same pass
+        age_count = 0
+        age_sum = 0.0
+        age_min = math.inf
+        age_max = -math.inf
 
         for loc in locations:
-            if loc.get("timestamp"):
-                age_seconds = current_timestamp - loc["timestamp"]
-                ages.append(age_seconds)
-
-                age_hours = age_seconds / 3600
-                age_days = age_hours / 24
-
-                if age_hours < 1:
-                    age_categories["very_fresh"] += 1
-                elif age_days < 1:
-                    age_categories["fresh"] += 1
-                elif age_days < 7:
-                    age_categories["recent"] += 1
-                elif age_days < 30:
-                    age_categories["old"] += 1
-                else:
-                    age_categories["very_old"] += 1
+            timestamp = loc.get("timestamp")
+            if timestamp:
+                age_seconds = current_timestamp - timestamp
+                counts[bisect_right(FRESHNESS_BOUNDS_SECONDS, age_seconds)] += 1
+                age_count += 1
+                age_sum += age_seconds
+                if age_seconds < age_min:
+                    age_min = age_seconds
+                if age_seconds > age_max:
+                    age_max = age_seconds
+
+        age_categories = dict(zip(FRESHNESS_CATEGORIES, counts, strict=True))
+
+        if not age_count:
+            return {
+                "categories": age_categories,
+                "average_age_days": 0,
+                "oldest_location_days": 0,
+                "newest_location_days": 0,
+            }
 
         # Calculate statistics
-        avg_age_seconds = sum(ages) / len(ages) if ages else 0
-        avg_age_days = avg_age_seconds / (24 * 3600)
+        seconds_per_day = 24 * 3600
+        avg_age_days = age_sum / age_count / seconds_per_day
 
         return {
             "categories": age_categories,
             "average_age_days": round(avg_age_days, 2),
-            "oldest_location_days": round(max(ages) / (24 * 3600), 2) if ages else 0,
-            "newest_location_days": round(min(ages) / (24 * 3600), 2) if ages else 0,
+            "oldest_location_days": round(age_max / seconds_per_day, 2),
+            "newest_location_days": round(age_min / seconds_per_day, 2),
         }
 
     @staticmethod
@@ -820,23 +923,13 @@ class LocationService:
         if len(locations) < 2:
             return {"node_density_per_km2": 0, "average_node_separation_km": 0}
 
-        # Calculate all pairwise distances
-        distances = []
-
-        for i, loc1 in enumerate(locations):
-            for _j, loc2 in enumerate(locations[i + 1 :], i + 1):
-                distance = LocationService.calculate_haversine_distance(
-                    loc1["latitude"],
-                    loc1["longitude"],
-                    loc2["latitude"],
-                    loc2["longitude"],
-                )
-                distances.append(distance)
-
-        # Calculate statistics
-        avg_separation = sum(distances) / len(distances) if distances else 0
-        min_separation = min(distances) if distances else 0
-        max_separation = max(distances) if distances else 0
+        # Summarize all pairwise distances without materializing them
+        pair_count, total_distance, min_separation, max_separation = (
+            LocationService._get_pairwise_summary(
+                [(loc["latitude"], loc["longitude"]) for loc in locations]
+            )
+        )
+        avg_separation = total_distance / pair_count if pair_count else 0
 
         # Estimate density (very rough approximation)
         # Calculate coverage area and divide by number of nodes
@@ -854,9 +947,50 @@ class LocationService:
             "average_node_separation_km": round(avg_separation, 2),
             "min_node_separation_km": round(min_separation, 2),
             "max_node_separation_km": round(max_separation, 2),
-            "total_node_pairs": len(distances),
+            "total_node_pairs": pair_count,
         }
 
+    @staticmethod
+    def _get_pairwise_summary(
+        coords: list[tuple[float, float]],
+    ) -> tuple[int, float, float, float]:
+        """
+        Summarize pairwise distances, reusing the result for unchanged points.
+
+        The summary is quadratic in the number of nodes, while the location
+        list behind the statistics page is itself cached, so back-to-back
+        requests usually ask for the same points again.
+
+        Args:
+            coords: (latitude, longitude) pairs in decimal degrees
+
+        Returns:
+            Tuple of (pair_count, total_km, min_km, max_km)
+        """
+        cache_key = "pairwise_summary"
+        now = time.time()
+
+        if cache_key in LocationService._cache:
+            cached_time, (cached_coords, summary) = LocationService._cache[cache_key]
+            if (
+                now - cached_time < LocationService._cache_ttl_seconds
+                and cached_coords == coords
+            ):
+                return summary
+
+        summary = summarize_pairwise_distances(coords)
+        LocationService._cache[cache_key] = (now, (coords, summary))
+        return summary
+
+    @staticmethod
+    def _stream_rows(conn: Any, cursor: Any) -> Iterator[dict[str, Any]]:
+        """Yield query rows in chunks, closing the connection once done."""
+        try:
+            while rows := cursor.fetchmany(PACKET_LINKS_FETCH_SIZE):
+                yield from rows
+        finally:
+            conn.close()
+
     @staticmethod
     def get_packet_links(
         filters: dict[str, Any] | None = None,
@@ -892,13 +1026,12 @@ class LocationService:
 
         try:
             # Lazily import here to avoid circular deps and keep startup fast
-            from datetime import datetime
-
             from ..database.connection import get_db_connection
             from ..database.connection_postgres import get_postgres_cursor
 
             conn = get_db_connection()
-            cursor = get_postgres_cursor(conn)
+            # Server-side cursor: rows are streamed in chunks as they are merged
+            cursor = get_postgres_cursor(conn, name="packet_links")
 
             # ------------------------------------------------------------------
             # Build WHERE clause based on provided filters.
@@ -933,115 +1066,93 @@ class LocationService:
                 where_clauses.append("gateway_id = %s")
                 params.append(gw_hex)
 
+            # Only gateways stored as "!<hex>" can be mapped to a node id; the
+            # id is parsed in SQL so rows arrive with the receiving node ready
+            # to use. Unparseable ids (NULL) and self-receptions are dropped
+            # before aggregation.
+            where_clauses.append(f"{GATEWAY_NODE_ID_SQL} <> from_node_id")
+
             where_sql = "WHERE " + " AND ".join(where_clauses)
 
+            # Aggregate each direction, then merge both directions of a node
+            # pair in the same query: packet counts add up, the newest
+            # reception wins and SNR / RSSI are the mean of the directional
+            # means (AVG skips a direction without samples).
             query = f"""
+                WITH directed AS (
+                    SELECT
+                        from_node_id,
+                        {GATEWAY_NODE_ID_SQL} AS gateway_node_id,
+                        COUNT(*)               AS packet_count,
+                        AVG(CAST(rssi AS FLOAT)) AS avg_rssi,
+                        AVG(CAST(snr  AS FLOAT)) AS avg_snr,
+                        MAX(timestamp)         AS last_seen
+                    FROM packet_history
+                    {where_sql}
+                    GROUP BY from_node_id, gateway_node_id
+                )
                 SELECT
-                    from_node_id,
-                    gateway_id,
-                    COUNT(*)               AS packet_count,
-                    AVG(CAST(rssi AS FLOAT)) AS avg_rssi,
-                    AVG(CAST(snr  AS FLOAT)) AS avg_snr,
-                    MAX(timestamp)         AS last_seen
-                FROM packet_history
-                {where_sql}
-                GROUP BY from_node_id, gateway_id
+                    LEAST(from_node_id, gateway_node_id)    AS node_a,
+                    GREATEST(from_node_id, gateway_node_id) AS node_b,
+                    SUM(packet_count)::bigint AS packet_count,
+                    MAX(packet_count)         AS max_direction_count,
+                    AVG(avg_rssi)             AS avg_rssi,
+                    AVG(avg_snr)              AS avg_snr,
+                    MAX(last_seen)            AS last_seen,
+                    COUNT(*) > 1              AS is_bidirectional
+                FROM directed
+                GROUP BY node_a, node_b
             """
             cursor.execute(query, tuple(params))
-            rows = cursor.fetchall()
-            conn.close()
+            rows = LocationService._stream_rows(conn, cursor)
 
             # ------------------------------------------------------------------
             # Convert DB rows into link dictionaries.
             # ------------------------------------------------------------------
+            now_ts = time.time()
             link_map: dict[tuple[int, int], dict[str, Any]] = {}
-            now_ts = datetime.now().timestamp()
+            last_seens: dict[tuple[int, int], float] = {}
 
             for row in rows:
-                from_node_id: int | None = row["from_node_id"]
-                gw_id_raw: str | None = row["gateway_id"]
-                if from_node_id is None or not gw_id_raw:
-                    continue
-
-                # Parse the gateway node id.  The DB stores "!<8-char-hex>".
-                try:
-                    to_node_id = int(gw_id_raw.lstrip("!"), 16)
-                except ValueError:
-                    logger.warning(
-                        "Skipping gateway id that could not be parsed: %s", gw_id_raw
-                    )
-                    continue
-
-                # Ignore self-reception – should already be filtered but extra guard.
-                if from_node_id == to_node_id:
-                    continue
-
-                # Symmetric key → (smaller, larger) ensures undirected uniqueness
-                if from_node_id < to_node_id:
-                    key: tuple[int, int] = (from_node_id, to_node_id)
-                else:
-                    key = (to_node_id, from_node_id)
-
-                # Calculate derived metrics.
-                age_hours = (
-                    (now_ts - row["last_seen"]) / 3600.0 if row["last_seen"] else None
-                )
-                last_seen_str = (
-                    datetime.fromtimestamp(row["last_seen"]).strftime(
-                        "%Y-%m-%d %H:%M:%S"
-                    )
-                    if row["last_seen"]
-                    else None
-                )
-
-                # Crude success-rate proxy: scale packet count to 10-100 like traceroute_links
-                success_rate = max(10, min(100, row["packet_count"] * 10))
-
-                link_payload = {
+                key: tuple[int, int] = (row["node_a"], row["node_b"])
+                last_seen = row["last_seen"]
+                if last_seen:
+                    last_seens[key] = last_seen
+                # The map shows one decimal at most; full-precision averages
+                # only bloat the JSON for every link
+                avg_snr = row["avg_snr"]
+                avg_rssi = row["avg_rssi"]
+
+                link_map[key] = {
                     "from_node_id": key[0],
                     "to_node_id": key[1],
-                    "success_rate": success_rate,
-                    "avg_snr": row["avg_snr"],
-                    "avg_rssi": row["avg_rssi"],
-                    "age_hours": round(age_hours, 2) if age_hours is not None else None,
-                    "last_seen_str": last_seen_str,
-                    "is_bidirectional": False,  # will be updated below if we see both directions
+                    # Crude success-rate proxy: scale the busier direction's
+                    # packet count to 10-100 like traceroute_links
+                    "success_rate": max(10, min(100, row["max_direction_count"] * 10)),
+                    "avg_snr": round(avg_snr, 1) if avg_snr is not None else None,
+                    "avg_rssi": round(avg_rssi, 1) if avg_rssi is not None else None,
+                    "age_hours": (
+                        round((now_ts - last_seen) / 3600.0, 2) if last_seen else None
+                    ),
+                    # Formatted only for links that are returned, see below
+                    "last_seen_str": None,
+                    "is_bidirectional": row["is_bidirectional"],
                     "total_hops_seen": row["packet_count"],
                     "last_packet_id": None,
                 }
 
-                if key in link_map:
-                    # We have already seen the opposite direction – merge stats.
-                    existing = link_map[key]
-                    existing["total_hops_seen"] += row["packet_count"]
-                    existing["success_rate"] = min(
-                        100, max(existing["success_rate"], success_rate)
-                    )
-                    existing["is_bidirectional"] = True
-                    # Update recency if this direction newer
-                    if age_hours is not None and (
-                        existing.get("age_hours") is None
-                        or age_hours < existing["age_hours"]
-                    ):
-                        existing["age_hours"] = round(age_hours, 2)
-                        existing["last_seen_str"] = last_seen_str
-                    # Merge SNR / RSSI averages (simple mean of means)
-                    if row["avg_snr"] is not None:
-                        if existing["avg_snr"] is None:
-                            existing["avg_snr"] = row["avg_snr"]
-                        else:
-                            existing["avg_snr"] = (
-                                existing["avg_snr"] + row["avg_snr"]
-                            ) / 2.0
-                    if row["avg_rssi"] is not None:
-                        if existing["avg_rssi"] is None:
-                            existing["avg_rssi"] = row["avg_rssi"]
-                        else:
-                            existing["avg_rssi"] = (
-                                existing["avg_rssi"] + row["avg_rssi"]
-                            ) / 2.0
-                else:
-                    link_map[key] = link_payload
+            def with_last_seen_str(links: list[dict[str, Any]]) -> list[dict[str, Any]]:
+                """Format last_seen_str for the links that survive filtering."""
+                strftime = time.strftime
+                localtime = time.localtime
+                for link in links:
+                    key = (link["from_node_id"], link["to_node_id"])
+                    last_seen = last_seens.get(key)
+                    if last_seen is not None:
+                        link["last_seen_str"] = strftime(
+                            LAST_SEEN_FORMAT, localtime(last_seen)
+                        )
+                return links
 
             # Apply distance filtering to packet links (same as traceroute links)
             max_distance_km = 250  # Filter out links longer than 250km
@@ -1049,8 +1160,6 @@ class LocationService:
 
             # Get node locations for distance calculation
             try:
-                from ..database.repositories import LocationRepository
-
                 # Get all unique node IDs from links
                 all_node_ids = set()
                 for key in link_map.keys():
@@ -1058,54 +1167,83 @@ class LocationService:
                     all_node_ids.add(key[1])
 
                 # Get locations for these nodes
-                locations = LocationRepository.get_node_locations(
-                    {"node_ids": list(all_node_ids)}
+                location_map = LocationService._get_locations_by_node(all_node_ids)
+
+                # Great circle distance is never less than the latitude
+                # difference, so pairs further apart in latitude than the limit
+                # are rejected without computing their distance
+                max_dlat_deg = math.degrees(max_distance_km / EARTH_RADIUS_KM)
+
+                # None: no position, False: too far in latitude, True: measure
+                links = list(link_map.values())
+                candidates: list[bool | None] = []
+                from_locs = []
+                to_locs = []
+                for link in links:
+                    from_loc = location_map.get(link["from_node_id"])
+                    to_loc = location_map.get(link["to_node_id"])
+                    if from_loc is None or to_loc is None:
+                        candidates.append(None)
+                    elif abs(from_loc["latitude"] - to_loc["latitude"]) > max_dlat_deg:
+                        candidates.append(False)
+                    else:
+                        candidates.append(True)
+                        from_locs.append(from_loc)
+                        to_locs.append(to_loc)
+
+                # Calculate the remaining distances in one batch, then filter in
+                # link order
+                distances = iter(
+                    LocationService.calculate_haversine_distance_batch(
+                        [loc["latitude"] for loc in from_locs],
+                        [loc["longitude"] for loc in from_locs],
+                        [loc["latitude"] for loc in to_locs],
+                        [loc["longitude"] for loc in to_locs],
+                    )
                 )
-                location_map = {loc["node_id"]: loc for loc in locations}
-
-                # Calculate distances and filter
-                for link in link_map.values():
-                    from_node_id = link["from_node_id"]
-                    to_node_id = link["to_node_id"]
-
-                    # Check if we have positions for both nodes
-                    if from_node_id in location_map and to_node_id in location_map:
-                        from_loc = location_map[from_node_id]
-                        to_loc = location_map[to_node_id]
-
-                        # Calculate distance
-                        distance_km = LocationService.calculate_haversine_distance(
-                            from_loc["latitude"],
-                            from_loc["longitude"],
-                            to_loc["latitude"],
-                            to_loc["longitude"],
-                        )
 
-                        # Only include links under 250km
-                        if distance_km <= max_distance_km:
-                            link["distance_km"] = round(distance_km, 2)
-                            filtered_links.append(link)
-                        else:
-                            logger.debug(
-                                f"Filtering out packet link from {from_node_id} to {to_node_id} - distance {distance_km:.2f}km > {max_distance_km}km"
-                            )
-                    else:
+                for link, candidate in zip(links, candidates, strict=True):
+                    if candidate is None:
                         # If no position data, include the link (fallback for nodes without GPS)
                         link["distance_km"] = None
                         filtered_links.append(link)
+                        continue
+
+                    if candidate is False:
+                        logger.debug(
+                            "Filtering out packet link from %s to %s - latitude difference > %skm",
+                            link["from_node_id"],
+                            link["to_node_id"],
+                            max_distance_km,
+                        )
+                        continue
+
+                    # Only include links under 250km
+                    distance_km = next(distances)
+                    if distance_km <= max_distance_km:
+                        link["distance_km"] = round(distance_km, 2)
+                        filtered_links.append(link)
+                    else:
+                        logger.debug(
+                            "Filtering out packet link from %s to %s - distance %.2fkm > %skm",
+                            link["from_node_id"],
+                            link["to_node_id"],
+                            distance_km,
+                            max_distance_km,
+                        )
 
                 logger.info(
                     "Generated %d packet-based RF links (filtered from %d by distance)",
                     len(filtered_links),
                     len(link_map),
                 )
-                return filtered_links
+                return with_last_seen_str(filtered_links)
 
             except Exception as dist_error:
                 logger.warning(
                     f"Could not apply distance filtering: {dist_error}, returning all links"
                 )
-                return list(link_map.values())
+                return with_last_seen_str(list(link_map.values()))
 
         except Exception as e:
             logger.error("Error getting packet links: %s", e)
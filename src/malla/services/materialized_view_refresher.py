@@ -7,29 +7,37 @@ ensuring fast query performance for the longest links analysis.
 
 import logging
 import threading
-import time
 
-from ..database.schema_tier_b import refresh_longest_links_mv
+from ..database.schema_tier_b import (
+    maintain_traceroute_hops_partitions,
+    refresh_longest_links_mv,
+)
 
 logger = logging.getLogger(__name__)
 
+# Delay before retrying a refresh cycle that failed
+RETRY_DELAY_SECONDS = 60
+
 
 class MaterializedViewRefresher:
     """
     Background service for refreshing materialized views.
 
     This service runs in a separate thread and periodically refreshes
-    the longest_links_mv materialized view to keep it up to date.
+    the longest_links_mv materialized view to keep it up to date. Each
+    cycle also creates any missing daily traceroute_hops partitions.
     """
 
-    def __init__(self, refresh_interval_minutes: int = 5):
+    def __init__(self, refresh_interval_minutes: int = 5, refresh_view: bool = True):
         """
         Initialize the materialized view refresher.
 
         Args:
             refresh_interval_minutes: How often to refresh the materialized view (default: 5 minutes)
+            refresh_view: Refresh the view each cycle; False when pg_cron already does it
         """
         self.refresh_interval_minutes = refresh_interval_minutes
+        self.refresh_view = refresh_view
         self.refresh_interval_seconds = refresh_interval_minutes * 60
         self._running = False
         self._thread: threading.Thread | None = None
@@ -69,17 +77,24 @@ class MaterializedViewRefresher:
 
         while self._running and not self._stop_event.is_set():
             try:
-                # Refresh the materialized view
-                refresh_longest_links_mv()
+                # Keep upcoming daily hop partitions in place
+                maintain_traceroute_hops_partitions()
+
+                # Refresh the materialized view unless pg_cron owns it; quiet
+                # periods without new hops skip the refresh entirely
+                if self.refresh_view:
+                    refresh_longest_links_mv(skip_if_unchanged=True)
 
-                # Wait for the next refresh interval
-                if self._stop_event.wait(self.refresh_interval_seconds):
-                    break  # Stop event was set
+                delay = self.refresh_interval_seconds
 
             except Exception as e:
                 logger.error("Error refreshing materialized view: %s", e)
-                # Continue running even if one refresh fails
-                time.sleep(60)  # Wait a minute before retrying
+                # Continue running even if one refresh fails, retrying sooner
+                delay = min(RETRY_DELAY_SECONDS, self.refresh_interval_seconds)
+
+            # Wait for the next cycle; stop() wakes the wait immediately
+            if self._stop_event.wait(delay):
+                break  # Stop event was set
 
         logger.info("Materialized view refresher loop stopped")
 
@@ -100,12 +115,15 @@ class MaterializedViewRefresher:
 _refresher: MaterializedViewRefresher | None = None
 
 
-def start_materialized_view_refresher(refresh_interval_minutes: int = 5) -> None:
+def start_materialized_view_refresher(
+    refresh_interval_minutes: int = 5, refresh_view: bool = True
+) -> None:
     """
     Start the global materialized view refresher.
 
     Args:
         refresh_interval_minutes: How often to refresh (default: 5 minutes)
+        refresh_view: Refresh the view each cycle; False when pg_cron already does it
     """
     global _refresher
 
@@ -113,7 +131,7 @@ def start_materialized_view_refresher(refresh_interval_minutes: int = 5) -> None
         logger.warning("Materialized view refresher is already initialized")
         return
 
-    _refresher = MaterializedViewRefresher(refresh_interval_minutes)
+    _refresher = MaterializedViewRefresher(refresh_interval_minutes, refresh_view)
     _refresher.start()
 
 
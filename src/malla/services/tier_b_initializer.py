@@ -10,7 +10,12 @@ This module initializes the Tier B write-optimized pipeline by:
 import logging
 from typing import Any
 
-from ..database.schema_tier_b import create_tier_b_schema, refresh_longest_links_mv
+from ..database.schema_tier_b import (
+    create_tier_b_schema,
+    refresh_longest_links_mv,
+    schedule_longest_links_refresh,
+    unschedule_longest_links_refresh,
+)
 from .materialized_view_refresher import (
     start_materialized_view_refresher,
     stop_materialized_view_refresher,
@@ -25,8 +30,10 @@ def initialize_tier_b_pipeline(refresh_interval_minutes: int = 5) -> bool:
 
     This function:
     1. Creates the database schema (traceroute_hops table, materialized view, indexes)
-    2. Starts the background materialized view refresher
-    3. Performs an initial refresh of the materialized view
+    2. Performs an initial refresh of the materialized view
+    3. Schedules periodic refreshes with pg_cron when the extension is installed
+    4. Starts the background refresher, which refreshes the view itself only
+       when pg_cron is unavailable
 
     Args:
         refresh_interval_minutes: How often to refresh the materialized view (default: 5 minutes)
@@ -47,11 +54,16 @@ def initialize_tier_b_pipeline(refresh_interval_minutes: int = 5) -> bool:
         refresh_longest_links_mv()
         logger.info("Initial materialized view refresh completed")
 
+        # Prefer in-database scheduling; the CLI refresh stays a manual override
+        scheduled_in_db = schedule_longest_links_refresh(refresh_interval_minutes)
+
         # Start the background refresher
         logger.info(
             f"Starting materialized view refresher (interval: {refresh_interval_minutes} minutes)..."
         )
-        start_materialized_view_refresher(refresh_interval_minutes)
+        start_materialized_view_refresher(
+            refresh_interval_minutes, refresh_view=not scheduled_in_db
+        )
         logger.info("Materialized view refresher started successfully")
 
         logger.info("Tier B pipeline initialization completed successfully")
@@ -66,12 +78,14 @@ def shutdown_tier_b_pipeline() -> None:
     """
     Shutdown the Tier B pipeline.
 
-    This stops the background materialized view refresher.
+    This stops the background materialized view refresher and removes the
+    pg_cron refresh job, if one was scheduled.
     """
     logger.info("Shutting down Tier B pipeline")
 
     try:
         stop_materialized_view_refresher()
+        unschedule_longest_links_refresh()
         logger.info("Tier B pipeline shutdown completed")
     except Exception as e:
         logger.error("Error during Tier B pipeline shutdown: %s", e)
@@ -99,15 +113,18 @@ def get_pipeline_status() -> dict[str, Any]:
     }
 
 
-def force_refresh_materialized_view() -> bool:
+def force_refresh_materialized_view(skip_if_unchanged: bool = False) -> bool:
     """
     Force an immediate refresh of the materialized view.
 
+    Args:
+        skip_if_unchanged: Skip the refresh when no hops arrived since the last one
+
     Returns:
         True if refresh was successful, False otherwise
     """
     try:
-        refresh_longest_links_mv()
+        refresh_longest_links_mv(skip_if_unchanged=skip_if_unchanged)
         logger.info("Forced refresh of materialized view completed")
         return True
     except Exception as e:
@@ -10,7 +10,10 @@ This service provides comprehensive traceroute analysis functionality including:
 
 import logging
 import math
-from datetime import datetime, timedelta
+import time
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
 from typing import Any
 
 from ..database.repositories import (
@@ -19,12 +22,44 @@ from ..database.repositories import (
 from ..models.traceroute import (
     TraceroutePacket,  # Use the correct TraceroutePacket class
 )
-from ..utils.cache import cache_key_for_traceroute_analytics, get_analytics_cache
+from ..utils.cache import (
+    cache_key_for_network_graph,
+    cache_key_for_node_traceroute_stats,
+    cache_key_for_route_patterns,
+    cache_key_for_traceroute_analytics,
+    get_analytics_cache,
+)
 from ..utils.node_utils import get_bulk_node_names
 from ..utils.traceroute_utils import parse_traceroute_payload
 
 logger = logging.getLogger(__name__)
 
+# Node ID used as the destination of broadcast packets
+BROADCAST_NODE_ID = 0xFFFFFFFF
+
+# How long route pattern and per-node traceroute stats are served from cache
+ROUTE_STATS_CACHE_TTL_SECONDS = 120
+# The network graph is rebuilt on every map/graph refresh, so keep it briefly
+NETWORK_GRAPH_CACHE_TTL_SECONDS = 60
+# Recent successful traceroutes searched for a node's intermediate hops
+NODE_PARTICIPATION_SAMPLE_SIZE = 1000
+
+
+@dataclass(slots=True)
+class _LinkStats:
+    """Running totals for one direct RF link in the network graph."""
+
+    source: int
+    target: int
+    last_seen: float
+    last_packet_id: int
+    packet_count: int = 0
+    # SNR of the hops transmitted by each end of the link
+    source_snr_total: float = 0.0
+    source_snr_count: int = 0
+    target_snr_total: float = 0.0
+    target_snr_count: int = 0
+
 
 class TracerouteService:
     """Service for traceroute analysis and management."""
@@ -75,19 +110,19 @@ class TracerouteService:
                 limit=per_page, offset=offset, filters=filters, search=search
             )
 
-            # Enhance with business logic
-            enhanced_traceroutes = []
-            for tr in result["packets"]:
-                # Convert memoryview to bytes for JSON serialization
-                if "raw_payload" in tr and isinstance(tr["raw_payload"], memoryview):
-                    tr["raw_payload"] = bytes(tr["raw_payload"])
-
-                # Create TraceroutePacket for enhanced analysis
-                tr_packet = TraceroutePacket(packet_data=tr, resolve_names=True)
+            # Build packets without names, then resolve the whole page at once.
+            # Payloads are left as they are: TraceroutePacket and the API's
+            # base64 encoding both accept memoryview, so no copy is needed here.
+            tr_packets = [
+                TraceroutePacket(packet_data=tr, resolve_names=False)
+                for tr in result["packets"]
+            ]
+            TraceroutePacket.resolve_node_names_bulk(tr_packets)
 
-                # Add enhanced fields
-                enhanced_tr = tr.copy()
-                enhanced_tr.update(
+            # Enhance with business logic; fields are added to the repository
+            # rows in place, so the rows are returned without copying the list
+            for tr, tr_packet in zip(result["packets"], tr_packets, strict=True):
+                tr.update(
                     {
                         "has_return_path": tr_packet.has_return_path(),
                         "is_complete": tr_packet.is_complete(),
@@ -96,10 +131,9 @@ class TracerouteService:
                         "rf_hops": len(tr_packet.get_rf_hops()),
                     }
                 )
-                enhanced_traceroutes.append(enhanced_tr)
 
             return {
-                "traceroutes": enhanced_traceroutes,
+                "traceroutes": result["packets"],
                 "total_count": result["total_count"],
                 "page": page,
                 "per_page": per_page,
@@ -115,6 +149,13 @@ class TracerouteService:
         """
         Get comprehensive traceroute analysis for the specified time period.
 
+        total_traceroutes, successful_traceroutes and success_rate cover every
+        traceroute in the window. The route fields (traceroutes_with_return,
+        return_path_rate, unique_routes, avg_route_length and
+        top_participating_nodes) need decoded payloads and are computed over
+        the most recent successful traceroutes only; analyzed_traceroutes is
+        the size of that sample.
+
         Args:
             hours: Number of hours to analyze
 
@@ -139,28 +180,22 @@ class TracerouteService:
                 logger.warning("Hours limited to %s for performance", hours)
 
             # Calculate time range
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=hours)
-
-            filters = {
-                "start_time": start_time.timestamp(),
-                "end_time": end_time.timestamp(),
-                "processed_successfully_only": True,  # Only get successful packets
-            }
-
-            # Reduce limit significantly for better performance
-            # Use smaller limit and add early processing optimization
-            limit = min(200, 50 + (hours * 2))  # Scale with hours but cap at 200
-            logger.info("Using limit of %s packets for analysis", limit)
-
-            # Get raw traceroute data
-            result = TracerouteRepository.get_traceroute_packets(
-                limit=limit,  # Much smaller limit for analysis
-                filters=filters,
+            end_time = time.time()
+            start_time = end_time - hours * 3600
+
+            # Scale the route sample with hours but cap it at 200
+            route_limit = min(200, 50 + (hours * 2))
+            logger.info("Using a sample of %s routes for analysis", route_limit)
+
+            # Counts are aggregated in the database over the whole window; only
+            # the route sample needs its payload parsed here
+            data = TracerouteRepository.get_traceroute_analysis_data(
+                start_time=start_time,
+                end_time=end_time,
+                route_limit=route_limit,
             )
-
-            # Analyze the data with optimized processing
-            total_traceroutes = len(result["packets"])
+            total_traceroutes = data["total_count"]
+            successful_traceroutes = data["successful_count"]
 
             # Early return if no data
             if total_traceroutes == 0:
@@ -170,6 +205,7 @@ class TracerouteService:
                     "total_traceroutes": 0,
                     "successful_traceroutes": 0,
                     "success_rate": 0,
+                    "analyzed_traceroutes": 0,
                     "traceroutes_with_return": 0,
                     "return_path_rate": 0,
                     "unique_routes": 0,
@@ -177,85 +213,50 @@ class TracerouteService:
                     "top_participating_nodes": [],
                 }
 
-            successful_traceroutes = 0
             traceroutes_with_return = 0
-            route_lengths = []
-            unique_routes: set[tuple[int, int, tuple[int, ...]]] = set()
-            node_participation: dict[int, int] = {}
-
-            # Process packets with early optimization
-            processed_count = 0
-            max_processing = min(
-                100, total_traceroutes
-            )  # Limit processing for performance
-
-            for tr in result["packets"]:
-                if processed_count >= max_processing:
-                    logger.info(
-                        f"Stopping analysis after {processed_count} packets for performance"
-                    )
-                    break
-
-                if tr["processed_successfully"]:
-                    successful_traceroutes += 1
-
-                    # Parse route data only if payload exists
-                    if tr["raw_payload"]:
-                        try:
-                            route_data = parse_traceroute_payload(tr["raw_payload"])
-
-                            if route_data["route_back"]:
-                                traceroutes_with_return += 1
-
-                            route_length = len(route_data["route_nodes"])
-                            route_lengths.append(route_length)
-
-                            # Track unique routes (limit to prevent memory issues)
-                            if len(unique_routes) < 1000:  # Cap unique routes
-                                route_key = (
-                                    tr["from_node_id"],
-                                    tr["to_node_id"],
-                                    tuple(route_data["route_nodes"]),
-                                )
-                                unique_routes.add(route_key)
-
-                            # Track node participation (limit to top nodes)
-                            if len(node_participation) < 500:  # Cap node participation
-                                for node_id in (
-                                    [tr["from_node_id"]]
-                                    + route_data["route_nodes"]
-                                    + [tr["to_node_id"]]
-                                ):
-                                    if node_id:
-                                        node_participation[node_id] = (
-                                            node_participation.get(node_id, 0) + 1
-                                        )
-                        except Exception as e:
-                            logger.warning("Error parsing route data: %s", e)
-                            continue
+            parsed_routes = 0
+            total_route_length = 0
+            unique_routes: set[tuple[int, ...]] = set()
+            node_participation: Counter[int] = Counter()
 
-                processed_count += 1
+            for tr in data["routes"]:
+                try:
+                    route_data = parse_traceroute_payload(tr["raw_payload"])
+                except Exception as e:
+                    logger.warning("Error parsing route data: %s", e)
+                    continue
+
+                if route_data["route_back"]:
+                    traceroutes_with_return += 1
+
+                route_nodes = route_data["route_nodes"]
+                parsed_routes += 1
+                total_route_length += len(route_nodes)
+                unique_routes.add((tr["from_node_id"], tr["to_node_id"], *route_nodes))
+
+                node_participation.update(
+                    node_id
+                    for node_id in chain(
+                        (tr["from_node_id"],),
+                        route_nodes,
+                        (tr["to_node_id"],),
+                    )
+                    if node_id
+                )
 
             # Calculate statistics
-            success_rate = (
-                (successful_traceroutes / total_traceroutes * 100)
-                if total_traceroutes > 0
-                else 0
-            )
+            success_rate = successful_traceroutes / total_traceroutes * 100
+            # Return paths are only known for the parsed sample
             return_path_rate = (
-                (traceroutes_with_return / successful_traceroutes * 100)
-                if successful_traceroutes > 0
-                else 0
+                (traceroutes_with_return / parsed_routes * 100) if parsed_routes else 0
             )
 
             avg_route_length = (
-                sum(route_lengths) / len(route_lengths) if route_lengths else 0
+                total_route_length / parsed_routes if parsed_routes else 0
             )
 
             # Get top participating nodes
-            top_nodes = sorted(
-                node_participation.items(), key=lambda x: x[1], reverse=True
-            )[:10]
+            top_nodes = node_participation.most_common(10)
             top_node_names = get_bulk_node_names([node_id for node_id, _ in top_nodes])
 
             top_nodes_with_names = [
@@ -272,6 +273,7 @@ class TracerouteService:
                 "total_traceroutes": total_traceroutes,
                 "successful_traceroutes": successful_traceroutes,
                 "success_rate": round(success_rate, 1),
+                "analyzed_traceroutes": parsed_routes,
                 "traceroutes_with_return": traceroutes_with_return,
                 "return_path_rate": round(return_path_rate, 1),
                 "unique_routes": len(unique_routes),
@@ -302,91 +304,113 @@ class TracerouteService:
         """
         logger.info("Getting route patterns (limit=%s)", limit)
 
+        # Check cache first
+        cache = get_analytics_cache()
+        cache_key = cache_key_for_route_patterns(limit)
+        cached_result = cache.get(cache_key)
+
+        if cached_result is not None:
+            logger.info("Returning cached route patterns (limit=%s)", limit)
+            return cached_result
+
         try:
-            # Get recent successful traceroutes
-            filters = {"processed_successfully_only": True}
-            result = TracerouteRepository.get_traceroute_packets(
-                limit=1000,  # Analyze more data
-                filters=filters,
+            # Stream recent successful traceroutes, fetching only what is analyzed
+            routes = TracerouteRepository.iter_recent_traceroute_routes(limit=1000)
+            analyzed_traceroutes = 0
+
+            # Analyze patterns; counting touches only the Counter, and examples
+            # are kept apart until the first few of each pattern are collected
+            pattern_counts: Counter[tuple[tuple[int, int], tuple[int, ...]]] = (
+                Counter()
             )
-
-            # Analyze patterns
-            route_patterns: dict[
-                tuple[tuple[int, int], tuple[int, ...]], dict[str, Any]
+            pattern_examples: dict[
+                tuple[tuple[int, int], tuple[int, ...]], list[dict[str, Any]]
             ] = {}
-            directional_patterns: dict[tuple[int, int, tuple[int, ...]], int] = {}
 
-            for tr in result["packets"]:
-                if tr["raw_payload"] and tr["processed_successfully"]:
-                    route_data = parse_traceroute_payload(tr["raw_payload"])
+            # Identical payloads share one route tuple instead of each
+            # allocating its own lists and tuple
+            routes_by_payload: dict[bytes, tuple[int, ...]] = {}
 
-                    # Create pattern key (normalized)
+            for tr in routes:
+                analyzed_traceroutes += 1
+                raw_payload = bytes(tr["raw_payload"])
+                route_nodes = routes_by_payload.get(raw_payload)
+                if route_nodes is None:
+                    route_data = parse_traceroute_payload(raw_payload)
                     route_nodes = tuple(route_data["route_nodes"])
-                    if route_nodes:
-                        # Bidirectional pattern (normalized by sorting endpoints)
-                        endpoints = tuple(
-                            sorted([tr["from_node_id"], tr["to_node_id"]])
-                        )
-                        pattern_key = (endpoints, route_nodes)
-
-                        if pattern_key not in route_patterns:
-                            route_patterns[pattern_key] = {
-                                "count": 0,
-                                "endpoints": endpoints,
-                                "route_nodes": route_nodes,
-                                "avg_success_rate": 0,
-                                "examples": [],
-                            }
-
-                        route_patterns[pattern_key]["count"] += 1
-                        if len(route_patterns[pattern_key]["examples"]) < 3:
-                            route_patterns[pattern_key]["examples"].append(
-                                {
-                                    "packet_id": tr["id"],
-                                    "timestamp": tr["timestamp"],
-                                    "from_node": tr["from_node_id"],
-                                    "to_node": tr["to_node_id"],
-                                }
-                            )
+                    routes_by_payload[raw_payload] = route_nodes
 
-                        # Directional pattern
-                        dir_key = (tr["from_node_id"], tr["to_node_id"], route_nodes)
-                        directional_patterns[dir_key] = (
-                            directional_patterns.get(dir_key, 0) + 1
-                        )
+                # Create pattern key (normalized)
+                if not route_nodes:
+                    continue
+
+                # Bidirectional pattern (normalized by sorting endpoints)
+                from_node_id = tr["from_node_id"]
+                to_node_id = tr["to_node_id"]
+                endpoints = (
+                    (from_node_id, to_node_id)
+                    if from_node_id <= to_node_id
+                    else (to_node_id, from_node_id)
+                )
+                pattern_key = (endpoints, route_nodes)
+
+                pattern_counts[pattern_key] += 1
+                examples = pattern_examples.setdefault(pattern_key, [])
+                if len(examples) < 3:
+                    examples.append(
+                        {
+                            "packet_id": tr["id"],
+                            "timestamp": tr["timestamp"],
+                            "from_node": from_node_id,
+                            "to_node": to_node_id,
+                        }
+                    )
 
             # Sort patterns by frequency
-            sorted_patterns = sorted(
-                route_patterns.items(), key=lambda x: x[1]["count"], reverse=True
-            )[:limit]
+            sorted_patterns = pattern_counts.most_common(limit)
 
             # Enhance with node names
             all_node_ids: set[int] = set()
-            for (endpoints, route_nodes), _data in sorted_patterns:
+            for (endpoints, route_nodes), _count in sorted_patterns:
                 all_node_ids.update(endpoints)
                 all_node_ids.update(route_nodes)
 
             node_names = get_bulk_node_names(list(all_node_ids))
+            # Nodes repeat across patterns, so format each fallback name once
+            for node_id in all_node_ids:
+                if node_id not in node_names:
+                    node_names[node_id] = f"!{node_id:08x}"
 
             enhanced_patterns = []
-            for (endpoints, route_nodes), data in sorted_patterns:
-                pattern = data.copy()
+            for pattern_key, count in sorted_patterns:
+                endpoints, route_nodes = pattern_key
+                pattern: dict[str, Any] = {
+                    "count": count,
+                    "endpoints": endpoints,
+                    "route_nodes": route_nodes,
+                    "avg_success_rate": 0,
+                    "examples": pattern_examples[pattern_key],
+                }
                 pattern["endpoints_names"] = [
-                    node_names.get(node_id, f"!{node_id:08x}") for node_id in endpoints
+                    node_names[node_id] for node_id in endpoints
                 ]
                 pattern["route_nodes_names"] = [
-                    node_names.get(node_id, f"!{node_id:08x}")
-                    for node_id in route_nodes
+                    node_names[node_id] for node_id in route_nodes
                 ]
                 pattern["route_display"] = " -> ".join(pattern["route_nodes_names"])
                 enhanced_patterns.append(pattern)
 
-            return {
+            result = {
                 "patterns": enhanced_patterns,
-                "total_patterns": len(route_patterns),
-                "analyzed_traceroutes": len(result["packets"]),
+                "total_patterns": len(pattern_counts),
+                "analyzed_traceroutes": analyzed_traceroutes,
             }
 
+            # Cache the result for 2 minutes
+            cache.set(cache_key, result, ttl=ROUTE_STATS_CACHE_TTL_SECONDS)
+
+            return result
+
         except Exception as e:
             logger.error("Error getting route patterns: %s", e)
             raise
@@ -404,48 +428,39 @@ class TracerouteService:
         """
         logger.info("Getting traceroute stats for node %s", node_id)
 
-        try:
-            # Get traceroutes involving this node as source or destination
-            source_filters = {"from_node": node_id}
-            dest_filters = {"to_node": node_id}
-
-            source_result = TracerouteRepository.get_traceroute_packets(
-                limit=1000, filters=source_filters
-            )
-            dest_result = TracerouteRepository.get_traceroute_packets(
-                limit=1000, filters=dest_filters
-            )
+        # Check cache first
+        cache = get_analytics_cache()
+        cache_key = cache_key_for_node_traceroute_stats(node_id)
+        cached_result = cache.get(cache_key)
 
-            # Analyze as source
-            source_total = len(source_result["packets"])
-            source_successful = sum(
-                1 for tr in source_result["packets"] if tr["processed_successfully"]
-            )
+        if cached_result is not None:
+            logger.info("Returning cached traceroute stats for node %s", node_id)
+            return cached_result
 
-            # Analyze as destination
-            dest_total = len(dest_result["packets"])
-            dest_successful = sum(
-                1 for tr in dest_result["packets"] if tr["processed_successfully"]
-            )
+        try:
+            # Source and destination counts over all traceroutes in one query
+            counts = TracerouteRepository.get_node_traceroute_counts(node_id)
+            source_total = counts["source_total"]
+            source_successful = counts["source_successful"]
+            dest_total = counts["dest_total"]
+            dest_successful = counts["dest_successful"]
+
+            # Intermediate hops are only recorded in the forward route of the
+            # payload, so they are counted over recent successful traceroutes
+            participation_count = 0
+            for tr in TracerouteRepository.get_traceroute_routes(
+                filters={"processed_successfully_only": True},
+                limit=NODE_PARTICIPATION_SAMPLE_SIZE,
+            ):
+                route_data = parse_traceroute_payload(tr["raw_payload"])
+                if node_id in route_data["route_nodes"]:
+                    participation_count += 1
 
             # Get node name
             node_names = get_bulk_node_names([node_id])
             node_name = node_names.get(node_id, f"!{node_id:08x}")
 
-            # Analyze route participation (as intermediate hop)
-            # This requires checking all traceroutes for this node in route_nodes
-            participation_count = 0
-            all_traceroutes = TracerouteRepository.get_traceroute_packets(
-                limit=1000, filters={"processed_successfully_only": True}
-            )
-
-            for tr in all_traceroutes["packets"]:
-                if tr["raw_payload"]:
-                    route_data = parse_traceroute_payload(tr["raw_payload"])
-                    if node_id in route_data.get("route_nodes", []):
-                        participation_count += 1
-
-            return {
+            result = {
                 "node_id": node_id,
                 "node_name": node_name,
                 "as_source": {
@@ -466,6 +481,11 @@ class TracerouteService:
                 "total_involvement": source_total + dest_total + participation_count,
             }
 
+            # Cache the result for 2 minutes
+            cache.set(cache_key, result, ttl=ROUTE_STATS_CACHE_TTL_SECONDS)
+
+            return result
+
         except Exception as e:
             logger.error("Error getting node traceroute stats: %s", e)
             raise
@@ -477,7 +497,6 @@ class TracerouteService:
         """Return longest single-hop and multi-hop links ranked by distance (km)."""
         logger.info("Computing longest links analysis (distance-based)")
         try:
-            from ..database.repositories import NodeRepository
             from ..database.schema_tier_b import get_longest_links_optimized
 
             # Get single-hop links with error handling
@@ -567,15 +586,8 @@ class TracerouteService:
                 logger.error("Error getting multi-hop links data: %s", e)
                 multi_hop_links = []
 
-            # Sort by distance to find the longest
-            if single_hop_links:
-                single_hop_links.sort(
-                    key=lambda x: x.get("distance_km", 0) or 0, reverse=True
-                )
-            if multi_hop_links:
-                multi_hop_links.sort(
-                    key=lambda x: x.get("total_distance_km", 0) or 0, reverse=True
-                )
+            # Both queries already return links longest first, so the lists are
+            # not sorted again here
 
             # Get node names with error handling
             try:
@@ -587,24 +599,20 @@ class TracerouteService:
                     node_ids.add(link["from_node_id"])
                     node_ids.add(link["to_node_id"])
 
-                node_names = NodeRepository.get_bulk_node_names(list(node_ids))
+                node_names = get_bulk_node_names(list(node_ids))
                 logger.info("Retrieved names for %s nodes", len(node_names))
+                # Nodes repeat across links, so format each fallback name once
+                for link_node_id in node_ids:
+                    if link_node_id not in node_names:
+                        node_names[link_node_id] = f"!{link_node_id:08x}"
 
                 # Add node names to links
                 for link in single_hop_links:
-                    link["from_node_name"] = node_names.get(
-                        link["from_node_id"], f"!{link['from_node_id']:08x}"
-                    )
-                    link["to_node_name"] = node_names.get(
-                        link["to_node_id"], f"!{link['to_node_id']:08x}"
-                    )
+                    link["from_node_name"] = node_names[link["from_node_id"]]
+                    link["to_node_name"] = node_names[link["to_node_id"]]
                 for link in multi_hop_links:
-                    link["from_node_name"] = node_names.get(
-                        link["from_node_id"], f"!{link['from_node_id']:08x}"
-                    )
-                    link["to_node_name"] = node_names.get(
-                        link["to_node_id"], f"!{link['to_node_id']:08x}"
-                    )
+                    link["from_node_name"] = node_names[link["from_node_id"]]
+                    link["to_node_name"] = node_names[link["to_node_id"]]
             except Exception as e:
                 logger.error("Error getting node names: %s", e)
                 # Use fallback names
@@ -616,17 +624,22 @@ class TracerouteService:
                     link["to_node_name"] = f"!{link['to_node_id']:08x}"
 
             longest_direct_distance = "N/A"
-            if single_hop_links and single_hop_links[0].get("distance_km") is not None:
-                longest_direct_distance = f"{single_hop_links[0]['distance_km']:.2f} km"
+            if single_hop_links:
+                longest_direct = max(
+                    single_hop_links, key=lambda x: x.get("distance_km") or 0
+                )
+                if longest_direct.get("distance_km") is not None:
+                    longest_direct_distance = f"{longest_direct['distance_km']:.2f} km"
 
             longest_path_distance = "N/A"
-            if (
-                multi_hop_links
-                and multi_hop_links[0].get("total_distance_km") is not None
-            ):
-                longest_path_distance = (
-                    f"{multi_hop_links[0]['total_distance_km']:.2f} km"
+            if multi_hop_links:
+                longest_path = max(
+                    multi_hop_links, key=lambda x: x.get("total_distance_km") or 0
                 )
+                if longest_path.get("total_distance_km") is not None:
+                    longest_path_distance = (
+                        f"{longest_path['total_distance_km']:.2f} km"
+                    )
 
             result = {
                 "summary": {
@@ -684,6 +697,18 @@ class TracerouteService:
             f"Building network graph data for {hours} hours (min_snr={min_snr}dB)"
         )
 
+        # Check cache first; the key uses the filters as passed in, before the
+        # time range defaults are added below
+        cache = get_analytics_cache()
+        cache_key = cache_key_for_network_graph(
+            hours, min_snr, include_indirect, limit_packets, filters
+        )
+        cached_result = cache.get(cache_key)
+
+        if cached_result is not None:
+            logger.info("Returning cached network graph data")
+            return cached_result
+
         try:
             # Build filters for traceroute data
             if filters is None:
@@ -692,32 +717,27 @@ class TracerouteService:
             # Use provided time filters or calculate from hours parameter
             if not filters.get("start_time") and not filters.get("end_time"):
                 # Calculate time range from hours parameter
-                from datetime import datetime, timedelta
-
-                end_time = datetime.now()
-                start_time = end_time - timedelta(hours=hours)
-
-                filters["start_time"] = start_time.timestamp()
-                filters["end_time"] = end_time.timestamp()
+                end_time = time.time()
+                filters["start_time"] = end_time - hours * 3600
+                filters["end_time"] = end_time
 
             # Always filter for successfully processed packets
             filters["processed_successfully_only"] = True
 
-            # Get traceroute data
-            result = TracerouteRepository.get_traceroute_packets(
-                limit=limit_packets,
-                filters=filters,
-                group_packets=False,  # Disable grouping to avoid payload corruption
+            # Get traceroute data; only the route columns are needed, so skip
+            # the enrichment get_traceroute_packets does for every row
+            traceroutes = TracerouteRepository.get_traceroute_routes(
+                filters=filters, limit=limit_packets
             )
 
             # Track nodes and links
-            nodes = {}  # node_id -> node_data
-            direct_links = {}  # (node1, node2) -> link_data
+            node_index: dict[int, int] = {}  # node_id -> index, in first-seen order
+            direct_links: dict[tuple[int, int], _LinkStats] = {}
             indirect_connections = {}  # (node1, node2) -> connection_data
 
             # Statistics
             stats = {
-                "packets_analyzed": len(result["packets"]),
+                "packets_analyzed": len(traceroutes),
                 "packets_with_rf_hops": 0,
                 "total_rf_hops": 0,
                 "links_found": 0,
@@ -725,85 +745,90 @@ class TracerouteService:
                 "links_filtered_due_to_snr_0": 0,
             }
 
-            # Process each traceroute packet
-            for tr_data in result["packets"]:
-                if not tr_data["raw_payload"]:
-                    continue
+            # A min_snr of -200 means "no limit", so only None values are
+            # filtered; resolve that once instead of for every hop
+            snr_floor = -math.inf if min_snr == -200 else min_snr
 
+            # Process each traceroute packet
+            for tr_data in traceroutes:
                 try:
-                    # Create TraceroutePacket object for analysis
+                    # RF hops are only built from SNR readings, so skip packets
+                    # without any before constructing a TraceroutePacket, which
+                    # then reuses this decode instead of parsing again.
+                    route_data = parse_traceroute_payload(bytes(tr_data["raw_payload"]))
+                    if not route_data["snr_towards"] and not route_data["snr_back"]:
+                        continue
+
+                    # Create TraceroutePacket object for analysis; names are
+                    # resolved for all graph nodes at once afterwards
                     tr_packet = TraceroutePacket(
-                        packet_data=tr_data, resolve_names=True
+                        packet_data=tr_data,
+                        resolve_names=False,
+                        pre_parsed_route_data=route_data,
                     )
 
                     # Get RF hops (actual radio transmissions)
                     rf_hops = tr_packet.get_rf_hops()
+
                     if not rf_hops:
                         continue
 
                     stats["packets_with_rf_hops"] += 1
                     stats["total_rf_hops"] += len(rf_hops)
 
+                    timestamp = tr_data["timestamp"]
+                    packet_id = tr_data["id"]
+
                     # Process direct RF links
                     for hop in rf_hops:
-                        # Filter by SNR - if min_snr is -200, it means "no limit" so only filter None values
-                        if hop.snr is None or (min_snr != -200 and hop.snr < min_snr):
+                        snr = hop.snr
+                        from_id = hop.from_node_id
+                        to_id = hop.to_node_id
+
+                        # Filter by SNR
+                        if snr is None or snr < snr_floor:
                             stats["links_filtered_by_snr"] += 1
                             continue
                         # filter 0db links (MQTT or UDP)
-                        if hop.snr == 0:
+                        if snr == 0:
                             stats["links_filtered_due_to_snr_0"] += 1
                             continue
-                        if 4294967295 in [hop.from_node_id, hop.to_node_id]:
+                        if from_id == BROADCAST_NODE_ID or to_id == BROADCAST_NODE_ID:
                             continue
-                        # Add nodes to the graph
-                        for node_id, node_name in [
-                            (hop.from_node_id, hop.from_node_name),
-                            (hop.to_node_id, hop.to_node_name),
-                        ]:
-                            if node_id not in nodes:
-                                nodes[node_id] = {
-                                    "id": node_id,
-                                    "name": node_name or f"!{node_id:08x}",
-                                    "packet_count": 0,
-                                    "total_snr": 0.0,
-                                    "snr_count": 0,
-                                    "connections": set(),
-                                    "last_seen": tr_data["timestamp"],
-                                }
+                        # Create bidirectional link key (lower node ID first)
+                        link_key = (
+                            (from_id, to_id) if from_id <= to_id else (to_id, from_id)
+                        )
 
-                            # Update node stats
-                            nodes[node_id]["packet_count"] += 1
-                            if tr_data["timestamp"] > nodes[node_id]["last_seen"]:
-                                nodes[node_id]["last_seen"] = tr_data["timestamp"]
-
-                        # Create bidirectional link key (sorted to ensure consistency)
-                        link_key = tuple(sorted([hop.from_node_id, hop.to_node_id]))
-
-                        # Add/update direct link
-                        if link_key not in direct_links:
-                            direct_links[link_key] = {
-                                "source": link_key[0],
-                                "target": link_key[1],
-                                "snr_values": [hop.snr],
-                                "packet_count": 1,
-                                "last_seen": tr_data["timestamp"],
-                                "last_packet_id": tr_data["id"],
-                            }
+                        # Add/update direct link. Node stats are derived from
+                        # the links after the loop, so a hop only touches its
+                        # link here.
+                        link = direct_links.get(link_key)
+                        if link is None:
+                            link = direct_links[link_key] = _LinkStats(
+                                source=link_key[0],
+                                target=link_key[1],
+                                last_seen=timestamp,
+                                last_packet_id=packet_id,
+                            )
                             stats["links_found"] += 1
+
+                            # Register new nodes in the order they are first seen
+                            node_index.setdefault(from_id, len(node_index))
+                            node_index.setdefault(to_id, len(node_index))
+
+                        link.packet_count += 1
+                        if timestamp > link.last_seen:
+                            link.last_seen = timestamp
+                            link.last_packet_id = packet_id
+
+                        # A node's average SNR covers the hops it transmitted
+                        if from_id == link_key[0]:
+                            link.source_snr_total += snr
+                            link.source_snr_count += 1
                         else:
-                            link = direct_links[link_key]
-                            link["snr_values"].append(hop.snr)
-                            link["packet_count"] += 1
-                            if tr_data["timestamp"] > link["last_seen"]:
-                                link["last_seen"] = tr_data["timestamp"]
-                                link["last_packet_id"] = tr_data["id"]
-
-                        # Track connections for nodes
-                        nodes[hop.from_node_id]["connections"].add(hop.to_node_id)
-                        nodes[hop.to_node_id]["connections"].add(hop.from_node_id)
-                        nodes[hop.from_node_id]["total_snr"] += hop.snr
-                        nodes[hop.from_node_id]["snr_count"] += 1
+                            link.target_snr_total += snr
+                            link.target_snr_count += 1
 
                     # Process indirect connections if requested
                     if include_indirect and len(rf_hops) > 1:
@@ -812,43 +837,88 @@ class TracerouteService:
                         last_hop = rf_hops[-1]
 
                         # Create indirect connection key
-                        indirect_key = tuple(
-                            sorted([first_hop.from_node_id, last_hop.to_node_id])
+                        path_start = first_hop.from_node_id
+                        path_end = last_hop.to_node_id
+                        indirect_key = (
+                            (path_start, path_end)
+                            if path_start <= path_end
+                            else (path_end, path_start)
                         )
 
                         # Only add if it's not already a direct link
                         if indirect_key not in direct_links:
-                            if indirect_key not in indirect_connections:
+                            conn = indirect_connections.get(indirect_key)
+                            if conn is None:
+                                # Average the hops that have an SNR reading
+                                snr_total = 0.0
+                                snr_count = 0
+                                for hop in rf_hops:
+                                    if hop.snr:
+                                        snr_total += hop.snr
+                                        snr_count += 1
+
                                 indirect_connections[indirect_key] = {
                                     "source": indirect_key[0],
                                     "target": indirect_key[1],
                                     "hop_count": len(rf_hops),
                                     "path_count": 1,
-                                    "avg_snr": sum(
-                                        hop.snr for hop in rf_hops if hop.snr
-                                    )
-                                    / len([h for h in rf_hops if h.snr]),
-                                    "last_seen": tr_data["timestamp"],
-                                    "last_packet_id": tr_data["id"],
+                                    "avg_snr": (
+                                        snr_total / snr_count if snr_count else None
+                                    ),
+                                    "last_seen": timestamp,
+                                    "last_packet_id": packet_id,
                                 }
                             else:
-                                conn = indirect_connections[indirect_key]
                                 conn["path_count"] += 1
-                                if tr_data["timestamp"] > conn["last_seen"]:
-                                    conn["last_seen"] = tr_data["timestamp"]
-                                    conn["last_packet_id"] = tr_data["id"]
-
+                                if timestamp > conn["last_seen"]:
+                                    conn["last_seen"] = timestamp
+                                    conn["last_packet_id"] = packet_id
                 except Exception as e:
                     logger.warning(
                         f"Error processing traceroute packet {tr_data['id']}: {e}"
                     )
                     continue
 
+            # Aggregate node stats from the links they take part in: every hop
+            # of a link counts towards both of its nodes. Stats are kept in
+            # parallel lists indexed through node_index.
+            node_count = len(node_index)
+            node_packet_counts = [0] * node_count
+            node_snr_totals = [0.0] * node_count
+            node_snr_counts = [0] * node_count
+            node_connections = [0] * node_count
+            node_last_seen = [0.0] * node_count
+
+            for link_data in direct_links.values():
+                source = node_index[link_data.source]
+                target = node_index[link_data.target]
+
+                node_packet_counts[source] += link_data.packet_count
+                node_snr_totals[source] += link_data.source_snr_total
+                node_snr_counts[source] += link_data.source_snr_count
+                node_connections[source] += 1
+
+                node_packet_counts[target] += link_data.packet_count
+                node_snr_totals[target] += link_data.target_snr_total
+                node_snr_counts[target] += link_data.target_snr_count
+                # Links are unique per node pair, so each one is a distinct
+                # neighbour; a link to itself counts once
+                if target != source:
+                    node_connections[target] += 1
+
+                last_seen = link_data.last_seen
+                node_last_seen[source] = max(node_last_seen[source], last_seen)
+                node_last_seen[target] = max(node_last_seen[target], last_seen)
+
+            node_ids = list(node_index)
+
+            # Resolve names for all nodes in the graph with a single lookup
+            node_names = get_bulk_node_names(node_ids)
+
             # Get location data for all nodes in the graph
             # Import here to avoid circular dependencies
             from ..database.repositories import LocationRepository
 
-            node_ids = list(nodes.keys())
             logger.info("Fetching location data for %s nodes", len(node_ids))
 
             try:
@@ -864,25 +934,28 @@ class TracerouteService:
             # Process direct links - calculate average SNR and strength
             processed_links = []
             for link_data in direct_links.values():
-                avg_snr = sum(link_data["snr_values"]) / len(link_data["snr_values"])
+                # Every hop's SNR is in one of the per-side totals
+                avg_snr = (
+                    link_data.source_snr_total + link_data.target_snr_total
+                ) / link_data.packet_count
 
                 # Calculate link strength based on SNR and packet count
                 # Higher SNR and more packets = stronger link
                 strength = min(
                     10,
-                    max(1, (avg_snr + 20) / 5 + math.log10(link_data["packet_count"])),
+                    max(1, (avg_snr + 20) / 5 + math.log10(link_data.packet_count)),
                 )
 
                 processed_links.append(
                     {
-                        "source": link_data["source"],
-                        "target": link_data["target"],
+                        "source": link_data.source,
+                        "target": link_data.target,
                         "type": "direct",
                         "avg_snr": round(avg_snr, 1),
-                        "packet_count": link_data["packet_count"],
+                        "packet_count": link_data.packet_count,
                         "strength": round(strength, 1),
-                        "last_seen": link_data["last_seen"],
-                        "last_packet_id": link_data["last_packet_id"],
+                        "last_seen": link_data.last_seen,
+                        "last_packet_id": link_data.last_packet_id,
                     }
                 )
 
@@ -914,28 +987,31 @@ class TracerouteService:
 
             # Process nodes - calculate average SNR and connectivity, add location data
             processed_nodes = []
-            for node_data in nodes.values():
-                # Convert set to count for JSON serialization
-                node_data["connections"] = len(node_data["connections"])
+            for node_id, index in node_index.items():
+                packet_count = node_packet_counts[index]
 
                 # Calculate average SNR for this node
                 avg_snr = None
-                if node_data["snr_count"] > 0:
-                    avg_snr = round(node_data["total_snr"] / node_data["snr_count"], 1)
+                if node_snr_counts[index] > 0:
+                    avg_snr = round(node_snr_totals[index] / node_snr_counts[index], 1)
+
+                # Only format the hex fallback for nodes without a name
+                name = node_names.get(node_id)
+                if name is None:
+                    name = f"!{node_id:08x}"
 
                 # Get location data for this node
-                location = location_map.get(node_data["id"])
+                location = location_map.get(node_id)
 
                 node_info = {
-                    "id": node_data["id"],
-                    "name": node_data["name"],
-                    "packet_count": node_data["packet_count"],
-                    "connections": node_data["connections"],
+                    "id": node_id,
+                    "name": name,
+                    "packet_count": packet_count,
+                    "connections": node_connections[index],
                     "avg_snr": avg_snr,
-                    "last_seen": node_data["last_seen"],
-                    "size": min(
-                        20, max(5, math.log10(node_data["packet_count"] + 1) * 3)
-                    ),  # Visual size
+                    "last_seen": node_last_seen[index],
+                    # Visual size
+                    "size": min(20, max(5, math.log10(packet_count + 1) * 3)),
                 }
 
                 # Add location data if available
@@ -948,7 +1024,7 @@ class TracerouteService:
 
                 processed_nodes.append(node_info)
 
-            return {
+            result = {
                 "nodes": processed_nodes,
                 "links": processed_links,
                 "indirect_connections": processed_indirect,
@@ -960,6 +1036,9 @@ class TracerouteService:
                 },
             }
 
+            cache.set(cache_key, result, ttl=NETWORK_GRAPH_CACHE_TTL_SECONDS)
+            return result
+
         except Exception as e:
             logger.error("Error building network graph data: %s", e)
             raise
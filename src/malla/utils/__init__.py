@@ -11,7 +11,13 @@ from .formatting import (
     format_route_display,
     format_time_ago,
 )
-from .geo_utils import calculate_bearing, calculate_distance
+from .geo_utils import (
+    GeoPointIndex,
+    calculate_bearing,
+    calculate_distance,
+    find_close_pairs,
+    summarize_pairwise_distances,
+)
 from .node_utils import convert_node_id, get_bulk_node_names, get_node_display_name
 from .serialization_utils import convert_bytes_to_base64
 from .traceroute_utils import parse_traceroute_payload
@@ -31,4 +37,7 @@ __all__ = [
     "convert_bytes_to_base64",
     "calculate_distance",
     "calculate_bearing",
+    "find_close_pairs",
+    "summarize_pairwise_distances",
+    "GeoPointIndex",
 ]
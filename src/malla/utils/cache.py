@@ -103,6 +103,33 @@ def cache_key_for_traceroute_analytics(hours: int) -> str:
     return f"traceroute_analytics_{hours}h"
 
 
+def cache_key_for_route_patterns(limit: int) -> str:
+    """Generate cache key for traceroute route patterns."""
+    return f"route_patterns_{limit}"
+
+
+def cache_key_for_node_traceroute_stats(node_id: int) -> str:
+    """Generate cache key for a node's traceroute statistics."""
+    return f"node_traceroute_stats_{node_id}"
+
+
+def cache_key_for_network_graph(
+    hours: int,
+    min_snr: float,
+    include_indirect: bool,
+    limit_packets: int,
+    filters: dict[str, Any] | None = None,
+) -> str:
+    """Generate cache key for traceroute network graph data."""
+    filter_part = ",".join(
+        f"{key}={value}" for key, value in sorted((filters or {}).items())
+    )
+    return (
+        f"network_graph_{hours}h_{min_snr}_{include_indirect}_{limit_packets}"
+        f"_{filter_part}"
+    )
+
+
 def cache_key_for_node_stats() -> str:
     """Generate cache key for node statistics."""
     return "node_stats"
@@ -3,10 +3,14 @@ Formatting utility functions for Meshtastic Mesh Health Web UI
 """
 
 import logging
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
+# Packet and location timestamps are displayed in EST (UTC-5, no DST)
+EST = timezone(timedelta(hours=-5))
+EST_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S EST"
+
 
 def format_time_ago(dt: datetime | None) -> str:
     """Format a datetime as relative time string."""
@@ -3,6 +3,10 @@ Geographic utility functions for Meshtastic Mesh Health Web UI
 """
 
 import math
+from bisect import bisect_left, bisect_right
+
+# Mean Earth radius in km
+EARTH_RADIUS_KM = 6371.0
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -69,3 +73,219 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
 
     # Normalize to 0-360 degrees
     return (bearing_deg + 360) % 360
+
+
+def find_close_pairs(
+    coords: list[tuple[float, float]], max_distance_km: float
+) -> list[tuple[int, int, float]]:
+    """
+    Find all pairs of points that are at most ``max_distance_km`` apart.
+
+    Points are swept in latitude order: the great circle distance between two
+    points is never less than their latitude difference, so each point only
+    has to be compared with the band of points whose latitude is close enough.
+    Radians and cosines are computed once per point instead of once per pair.
+
+    Args:
+        coords: (latitude, longitude) pairs in decimal degrees
+        max_distance_km: Maximum distance between two points in kilometers
+
+    Returns:
+        List of (i, j, distance_km) tuples with i < j indexing ``coords``
+    """
+    n = len(coords)
+    if n < 2:
+        return []
+
+    # Work on arrays already in sweep order so the inner loop reads them
+    # sequentially and never copies the remainder of the order list
+    order = sorted(range(n), key=lambda k: coords[k][0])
+    lat_rad = [math.radians(coords[k][0]) for k in order]
+    xs, ys, zs = _unit_vectors([coords[k] for k in order])
+    max_dlat = max_distance_km / EARTH_RADIUS_KM
+    # Candidates are compared by squared chord length between unit vectors,
+    # which grows monotonically with distance, so the pair loop needs no trig
+    # and asin/sqrt only run for pairs that are kept
+    max_chord_sq = _max_chord_sq(max_distance_km)
+
+    asin = math.asin
+    sqrt = math.sqrt
+    diameter = 2 * EARTH_RADIUS_KM
+
+    pairs = []
+    append = pairs.append
+    for p in range(n - 1):
+        lat_p = lat_rad[p]
+        x_p = xs[p]
+        y_p = ys[p]
+        z_p = zs[p]
+        for q in range(p + 1, n):
+            if lat_rad[q] - lat_p > max_dlat:
+                break
+            dx = xs[q] - x_p
+            dy = ys[q] - y_p
+            dz = zs[q] - z_p
+            chord_sq = dx * dx + dy * dy + dz * dz
+            if chord_sq <= max_chord_sq:
+                distance = diameter * asin(min(1.0, 0.5 * sqrt(chord_sq)))
+                i = order[p]
+                j = order[q]
+                append((i, j, distance) if i < j else (j, i, distance))
+
+    return pairs
+
+
+def summarize_pairwise_distances(
+    coords: list[tuple[float, float]],
+) -> tuple[int, float, float, float]:
+    """
+    Summarize the great circle distances between every pair of points.
+
+    The distances are folded into running totals as they are computed, so no
+    list of N*(N-1)/2 distances is ever built; at most one row of the pair
+    triangle is held at a time. Each point is converted once to a unit
+    vector; the haversine term of a pair is then a quarter of the squared
+    chord between the vectors, so the pair loop needs no sin/cos.
+
+    Args:
+        coords: (latitude, longitude) pairs in decimal degrees
+
+    Returns:
+        Tuple of (pair_count, total_km, min_km, max_km); all zero for fewer
+        than two points
+    """
+    n = len(coords)
+    if n < 2:
+        return 0, 0.0, 0.0, 0.0
+
+    # Halved unit vectors: the distance between two of them is half the
+    # chord, i.e. the sine of the central half-angle
+    xs, ys, zs = _unit_vectors(coords)
+    points = [(0.5 * x, 0.5 * y, 0.5 * z) for x, y, z in zip(xs, ys, zs, strict=True)]
+
+    asin = math.asin
+    dist = math.dist
+
+    # Work one row of the pair triangle at a time so the per-pair arithmetic
+    # runs inside math.dist/map/sum/min/max rather than in bytecode. Half-angle
+    # sines order like the distances, so only a row's extremes need asin.
+    total = 0.0
+    min_sine = math.inf
+    max_sine = 0.0
+    for i in range(n - 1):
+        point = points[i]
+        row = [dist(point, other) for other in points[i + 1 :]]
+        row_max = max(row)
+        if row_max > 1.0:
+            # Rounding can push near-antipodal pairs just past asin's domain
+            row = [sine if sine < 1.0 else 1.0 for sine in row]
+            row_max = 1.0
+        total += sum(map(asin, row))
+        row_min = min(row)
+        if row_min < min_sine:
+            min_sine = row_min
+        if row_max > max_sine:
+            max_sine = row_max
+    min_angle = asin(min_sine)
+    max_angle = asin(max_sine)
+
+    diameter = 2 * EARTH_RADIUS_KM
+    return (
+        n * (n - 1) // 2,
+        total * diameter,
+        min_angle * diameter,
+        max_angle * diameter,
+    )
+
+
+def _max_chord_sq(max_distance_km: float) -> float:
+    """Squared unit-sphere chord length matching a great circle distance."""
+    half_angle = min(max_distance_km / (2 * EARTH_RADIUS_KM), math.pi / 2)
+    return 4 * math.sin(half_angle) ** 2
+
+
+def _unit_vectors(
+    coords: list[tuple[float, float]],
+) -> tuple[list[float], list[float], list[float]]:
+    """Convert (latitude, longitude) pairs to unit vector components."""
+    xs = []
+    ys = []
+    zs = []
+    for lat, lon in coords:
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        cos_lat = math.cos(lat_rad)
+        xs.append(cos_lat * math.cos(lon_rad))
+        ys.append(cos_lat * math.sin(lon_rad))
+        zs.append(math.sin(lat_rad))
+    return xs, ys, zs
+
+
+class GeoPointIndex:
+    """
+    Spatial index for radius queries over a fixed set of points.
+
+    Points are kept sorted by latitude so a query only computes the distance
+    for the band of points whose latitude is within reach. Points are stored
+    as unit vectors so candidates are checked by chord length without trig.
+    """
+
+    def __init__(self, coords: list[tuple[float, float]]):
+        """
+        Build the index.
+
+        Args:
+            coords: (latitude, longitude) pairs in decimal degrees
+        """
+        lat_rad = [math.radians(lat) for lat, _ in coords]
+        order = sorted(range(len(coords)), key=lat_rad.__getitem__)
+
+        self._order = order
+        self._lats = [lat_rad[i] for i in order]
+        self._xs, self._ys, self._zs = _unit_vectors([coords[i] for i in order])
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def query_radius(
+        self, lat: float, lon: float, max_distance_km: float
+    ) -> list[tuple[int, float]]:
+        """
+        Find all indexed points within ``max_distance_km`` of a location.
+
+        Args:
+            lat: Latitude of the query point in decimal degrees
+            lon: Longitude of the query point in decimal degrees
+            max_distance_km: Search radius in kilometers
+
+        Returns:
+            List of (index into the original coords, distance_km) tuples
+        """
+        lat_q = math.radians(lat)
+        max_dlat = max_distance_km / EARTH_RADIUS_KM
+        max_chord_sq = _max_chord_sq(max_distance_km)
+        (x_q,), (y_q,), (z_q,) = _unit_vectors([(lat, lon)])
+
+        lo = bisect_left(self._lats, lat_q - max_dlat)
+        hi = bisect_right(self._lats, lat_q + max_dlat)
+
+        asin = math.asin
+        sqrt = math.sqrt
+        diameter = 2 * EARTH_RADIUS_KM
+        xs = self._xs
+        ys = self._ys
+        zs = self._zs
+        order = self._order
+
+        results = []
+        for k in range(lo, hi):
+            dx = xs[k] - x_q
+            dy = ys[k] - y_q
+            dz = zs[k] - z_q
+            chord_sq = dx * dx + dy * dy + dz * dz
+            if chord_sq <= max_chord_sq:
+                results.append(
+                    (order[k], diameter * asin(min(1.0, 0.5 * sqrt(chord_sq))))
+                )
+
+        return results
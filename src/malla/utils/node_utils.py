@@ -5,14 +5,19 @@ Node utility functions for Meshtastic Mesh Health Web UI
 import atexit
 import logging
 import threading
+import time
 from typing import Any
 
 from ..database.connection import get_db_connection
 
 logger = logging.getLogger(__name__)
 
-# Cache for node names to improve performance
-node_name_cache: dict[int, str] = {}
+# Cache for node names to improve performance, mapping node_id to
+# (display_name, expires_at). Entries are kept in insertion order so the
+# oldest ones are evicted first once the cache is full.
+NODE_NAME_CACHE_TTL_SECONDS = 300
+NODE_NAME_CACHE_MAX_SIZE = 50_000
+node_name_cache: dict[int, tuple[str, float]] = {}
 cache_lock = threading.Lock()
 
 # Background thread for periodic cache invalidation
@@ -49,6 +54,25 @@ def _cache_cleanup_worker() -> None:
     # logger.info("Node name cache cleanup worker stopped")
 
 
+def _get_cached_name(node_id: int, now: float) -> str | None:
+    """Return a cached display name that has not expired. Call with cache_lock held."""
+    entry = node_name_cache.get(node_id)
+    if entry is None:
+        return None
+    if entry[1] <= now:
+        del node_name_cache[node_id]
+        return None
+    return entry[0]
+
+
+def _cache_name(node_id: int, display_name: str, now: float) -> None:
+    """Cache a display name, evicting the oldest entries if full. Call with cache_lock held."""
+    node_name_cache.pop(node_id, None)
+    while len(node_name_cache) >= NODE_NAME_CACHE_MAX_SIZE:
+        del node_name_cache[next(iter(node_name_cache))]
+    node_name_cache[node_id] = (display_name, now + NODE_NAME_CACHE_TTL_SECONDS)
+
+
 def start_cache_cleanup() -> None:
     """Start the background cache cleanup thread."""
     global _cache_cleanup_thread
@@ -112,8 +136,9 @@ def get_node_display_name(node_id: int | str) -> str:
 
     # Check cache first
     with cache_lock:
-        if node_id in node_name_cache:
-            return node_name_cache[node_id]
+        cached_name = _get_cached_name(node_id, time.time())
+    if cached_name is not None:
+        return cached_name
 
     # Query database for node info
     try:
@@ -148,7 +173,7 @@ def get_node_display_name(node_id: int | str) -> str:
 
         # Cache the result
         with cache_lock:
-            node_name_cache[node_id] = display_name
+            _cache_name(node_id, display_name, time.time())
 
         return display_name
 
@@ -288,10 +313,12 @@ def get_bulk_node_names(node_ids: list[int]) -> dict[int, str]:
     result = {}
     uncached_ids = []
 
+    now = time.time()
     with cache_lock:
         for node_id in node_ids:
-            if node_id in node_name_cache:
-                result[node_id] = node_name_cache[node_id]
+            cached_name = _get_cached_name(node_id, now)
+            if cached_name is not None:
+                result[node_id] = cached_name
             else:
                 uncached_ids.append(node_id)
 
@@ -330,7 +357,7 @@ def get_bulk_node_names(node_ids: list[int]) -> dict[int, str]:
 
                 # Cache the result
                 with cache_lock:
-                    node_name_cache[node_id] = display_name
+                    _cache_name(node_id, display_name, now)
 
             # Handle nodes not found in database
             for node_id in uncached_ids:
@@ -340,7 +367,7 @@ def get_bulk_node_names(node_ids: list[int]) -> dict[int, str]:
 
                     # Cache the fallback result
                     with cache_lock:
-                        node_name_cache[node_id] = display_name
+                        _cache_name(node_id, display_name, now)
 
         except Exception as e:
             logger.error("Error getting bulk node names: %s", e)
@@ -3,6 +3,7 @@ Traceroute utility functions for Meshtastic Mesh Health Web UI
 """
 
 import logging
+from functools import lru_cache
 from typing import Any, TypedDict
 
 from meshtastic.protobuf import mesh_pb2
@@ -23,6 +24,10 @@ def parse_traceroute_payload(raw_payload: bytes) -> RouteData:
     """
     Parse traceroute payload from raw bytes.
 
+    Decoded payloads are memoized, so the analysis views that walk the same
+    recent traceroutes decode each payload only once. Every call still gets
+    its own lists.
+
     Args:
         raw_payload: Raw payload bytes from the packet
 
@@ -44,6 +49,22 @@ def parse_traceroute_payload(raw_payload: bytes) -> RouteData:
     if not raw_payload:
         return RouteData(route_nodes=[], snr_towards=[], route_back=[], snr_back=[])
 
+    route_nodes, snr_towards, route_back, snr_back = _decode_route_discovery(
+        raw_payload
+    )
+    return RouteData(
+        route_nodes=list(route_nodes),
+        snr_towards=list(snr_towards),
+        route_back=list(route_back),
+        snr_back=list(snr_back),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _decode_route_discovery(
+    raw_payload: bytes,
+) -> tuple[tuple[int, ...], tuple[float, ...], tuple[int, ...], tuple[float, ...]]:
+    """Decode a RouteDiscovery payload into immutable route and SNR tuples."""
     try:
         # Try protobuf parsing first
         route_discovery = mesh_pb2.RouteDiscovery()
@@ -93,23 +114,21 @@ def parse_traceroute_payload(raw_payload: bytes) -> RouteData:
                 logger.warning("Invalid SNR back value: %s, error: %s", snr, e)
                 continue
 
-        result = RouteData(
-            route_nodes=route_nodes,
-            snr_towards=snr_towards,
-            route_back=route_back,
-            snr_back=snr_back,
-        )
-
         logger.debug(
-            f"Protobuf parsing successful: {len(result['route_nodes'])} nodes, "
-            f"{len(result['snr_towards'])} SNR values"
+            f"Protobuf parsing successful: {len(route_nodes)} nodes, "
+            f"{len(snr_towards)} SNR values"
+        )
+        return (
+            tuple(route_nodes),
+            tuple(snr_towards),
+            tuple(route_back),
+            tuple(snr_back),
         )
-        return result
 
     except Exception as e:
         logger.warning("Protobuf parsing failed: %s", e)
         # Return empty result instead of falling back to manual parsing
-        return RouteData(route_nodes=[], snr_towards=[], route_back=[], snr_back=[])
+        return (), (), (), ()
 
 
 def get_node_location_at_timestamp(
@@ -2,7 +2,13 @@
 
 import pytest
 import math
-from src.malla.utils.geo_utils import calculate_distance, calculate_bearing
+from src.malla.utils.geo_utils import (
+    GeoPointIndex,
+    calculate_bearing,
+    calculate_distance,
+    find_close_pairs,
+    summarize_pairwise_distances,
+)
 
 
 class TestCalculateDistance:
@@ -95,4 +101,109 @@ class TestCalculateBearing:
     def test_polar_regions(self):
         """Test bearings near poles."""
         bearing = calculate_bearing(89, 0, 89, 90)
-        assert 0 <= bearing < 360
\ No newline at end of file
+        assert 0 <= bearing < 360
+
+
+class TestFindClosePairs:
+    """Test cases for find_close_pairs function."""
+
+    def test_fewer_than_two_points(self):
+        """Test that no pairs exist without at least two points."""
+        assert find_close_pairs([], 50) == []
+        assert find_close_pairs([(40.0, -74.0)], 50) == []
+
+    def test_matches_brute_force(self):
+        """Test that the latitude sweep finds the same pairs as checking all of them."""
+        coords = [
+            (40.7128, -74.0060),
+            (40.7306, -73.9352),
+            (40.6782, -73.9442),
+            (41.0, -74.5),
+            (39.9526, -75.1652),
+            (40.7128, -74.0060),
+            (-33.8688, 151.2093),
+        ]
+
+        expected = {
+            (i, j): calculate_distance(*coords[i], *coords[j])
+            for i in range(len(coords))
+            for j in range(i + 1, len(coords))
+            if calculate_distance(*coords[i], *coords[j]) <= 50
+        }
+        pairs = find_close_pairs(coords, 50)
+
+        assert {(i, j) for i, j, _ in pairs} == set(expected)
+        for i, j, distance in pairs:
+            assert i < j
+            assert distance == pytest.approx(expected[(i, j)], abs=1e-6)
+
+
+class TestSummarizePairwiseDistances:
+    """Test cases for summarize_pairwise_distances function."""
+
+    def test_fewer_than_two_points(self):
+        """Test that an empty summary is returned without pairs."""
+        assert summarize_pairwise_distances([(40.0, -74.0)]) == (0, 0.0, 0.0, 0.0)
+
+    def test_matches_brute_force(self):
+        """Test that the running totals match the full list of distances."""
+        coords = [
+            (40.7128, -74.0060),
+            (40.7306, -73.9352),
+            (39.9526, -75.1652),
+            (-33.8688, 151.2093),
+        ]
+        distances = [
+            calculate_distance(*coords[i], *coords[j])
+            for i in range(len(coords))
+            for j in range(i + 1, len(coords))
+        ]
+
+        count, total, minimum, maximum = summarize_pairwise_distances(coords)
+
+        assert count == len(distances)
+        assert total == pytest.approx(sum(distances))
+        assert minimum == pytest.approx(min(distances))
+        assert maximum == pytest.approx(max(distances))
+
+    def test_close_and_antipodal_points(self):
+        """Test precision at both ends of the distance range."""
+        coords = [(10.0, 10.0), (10.000001, 10.0), (-10.0, -170.0)]
+
+        _, _, minimum, maximum = summarize_pairwise_distances(coords)
+
+        assert minimum == pytest.approx(calculate_distance(10.0, 10.0, 10.000001, 10.0), rel=1e-6)
+        assert maximum == pytest.approx(math.pi * 6371.0, rel=1e-6)
+
+
+class TestGeoPointIndex:
+    """Test cases for GeoPointIndex."""
+
+    def test_empty_index(self):
+        """Test querying an index without points."""
+        index = GeoPointIndex([])
+        assert len(index) == 0
+        assert index.query_radius(40.0, -74.0, 100) == []
+
+    def test_query_radius_matches_brute_force(self):
+        """Test that radius queries return exactly the points within range."""
+        coords = [
+            (40.7128, -74.0060),
+            (40.7306, -73.9352),
+            (40.6782, -73.9442),
+            (41.0, -74.5),
+            (39.9526, -75.1652),
+            (51.5074, -0.1278),
+        ]
+        index = GeoPointIndex(coords)
+
+        results = dict(index.query_radius(40.7128, -74.0060, 10))
+        expected = {
+            i: calculate_distance(40.7128, -74.0060, lat, lon)
+            for i, (lat, lon) in enumerate(coords)
+            if calculate_distance(40.7128, -74.0060, lat, lon) <= 10
+        }
+
+        assert set(results) == set(expected)
+        for i, distance in results.items():
+            assert distance == pytest.approx(expected[i], abs=1e-6)
@@ -4,7 +4,7 @@ import pytest
 import time
 from unittest.mock import Mock, patch
 from datetime import datetime
-from src.malla.services.location_service import LocationService
+from src.malla.services.location_service import GATEWAY_NODE_ID_SQL, LocationService
 
 
 class TestLocationService:
@@ -38,6 +38,8 @@ class TestLocationService:
         mock_repository.assert_called_once_with({})
         assert len(result) == 1
         assert result[0]["node_id"] == 123
+        # 1234567890 is 2009-02-13 23:31:30 UTC
+        assert result[0]["timestamp_str"] == "2009-02-13 18:31:30 EST"
 
     @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
     def test_get_node_locations_with_filters(self, mock_repository):
@@ -68,7 +70,7 @@ class TestLocationService:
     @patch('src.malla.services.location_service.datetime')
     @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
     def test_get_node_locations_min_age_filtering(self, mock_repository, mock_datetime):
-        """Test min_age_hours filtering."""
+        """Test min_age_hours is pushed down to the repository."""
         mock_datetime.now.return_value.timestamp.return_value = 1000.0
         mock_repository.return_value = [
             {
@@ -111,9 +113,10 @@ class TestLocationService:
 
         result = LocationService.get_node_locations(filters)
 
-        # Should only return locations older than 72 seconds (cutoff = 1000 - 72 = 928)
-        assert len(result) == 1
-        assert result[0]["node_id"] == 123
+        # min_age_hours is applied in the repository query, so the service
+        # passes it through and does not filter the rows again
+        mock_repository.assert_called_once_with(filters)
+        assert [loc["node_id"] for loc in result] == [123, 456]
 
     @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
     @patch('src.malla.services.traceroute_service.TracerouteService.get_network_graph_data')
@@ -295,58 +298,6 @@ class TestLocationService:
         mock_repository.assert_called_once_with({})
         assert result == []
 
-    @patch('src.malla.services.location_service.datetime')
-    @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
-    @patch('src.malla.services.location_service.logger')
-    def test_get_node_locations_min_age_logging(self, mock_logger, mock_repository, mock_datetime):
-        """Test logging for min_age_hours filtering."""
-        mock_datetime.now.return_value.timestamp.return_value = 1000.0
-        mock_repository.return_value = [
-            {
-                "node_id": 123,
-                "hex_id": "!0000007b",
-                "display_name": "Test Node 1",
-                "long_name": "Test Node 1 Long",
-                "short_name": "TN1",
-                "hw_model": "TBEAM",
-                "role": "CLIENT",
-                "primary_channel": None,
-                "latitude": 40.7128,
-                "longitude": -74.0060,
-                "altitude": 100,
-                "timestamp": 950.0,
-                "sats_in_view": None,
-                "precision_bits": None,
-                "precision_meters": None
-            },
-            {
-                "node_id": 456,
-                "hex_id": "!000001c8",
-                "display_name": "Test Node 2",
-                "long_name": "Test Node 2 Long",
-                "short_name": "TN2",
-                "hw_model": "TBEAM",
-                "role": "CLIENT",
-                "primary_channel": None,
-                "latitude": 40.7138,
-                "longitude": -74.0070,
-                "altitude": 110,
-                "timestamp": 990.0,
-                "sats_in_view": None,
-                "precision_bits": None,
-                "precision_meters": None
-            }
-        ]
-
-        filters = {"min_age_hours": 0.01}
-
-        LocationService.get_node_locations(filters)
-
-        # Should log the filtering result
-        mock_logger.info.assert_called()
-        log_messages = [call[0][0] for call in mock_logger.info.call_args_list]
-        assert any("Applied min_age_hours filter" in msg for msg in log_messages)
-
     @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
     @patch('src.malla.services.traceroute_service.TracerouteService.get_network_graph_data')
     def test_get_node_locations_network_filter_passthrough(self, mock_network, mock_repository):
@@ -455,4 +406,480 @@ class TestLocationService:
             # Should log timing information (checking for any timing-related log)
             timing_calls = [call for call in mock_logger.info.call_args_list
                           if any(word in str(call).lower() for word in ["timing", "enhanced", "locations"])]
-            assert len(timing_calls) > 0
\ No newline at end of file
+            assert len(timing_calls) > 0
+
+    @patch('src.malla.services.location_service.LocationService.get_packet_links')
+    @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.TracerouteService.get_network_graph_data')
+    def test_get_node_locations_without_network(self, mock_network, mock_repository, mock_packet_links):
+        """Position-only callers skip the topology and packet link queries."""
+        mock_repository.return_value = [
+            {
+                "node_id": 123,
+                "hex_id": "!0000007b",
+                "display_name": "Test Node",
+                "long_name": "Test Node Long",
+                "short_name": "TN",
+                "hw_model": "TBEAM",
+                "role": "CLIENT",
+                "primary_channel": None,
+                "latitude": 40.7128,
+                "longitude": -74.0060,
+                "altitude": 100,
+                "timestamp": 1234567890.0,
+            }
+        ]
+
+        result = LocationService.get_node_locations({}, include_network=False)
+
+        mock_network.assert_not_called()
+        mock_packet_links.assert_not_called()
+        assert result[0]["latitude"] == 40.7128
+        assert result[0]["direct_neighbors"] == 0
+        assert result[0]["neighbors"] == []
+
+    @patch('src.malla.services.location_service.LocationService.get_packet_links')
+    @patch('src.malla.services.location_service.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.TracerouteService.get_network_graph_data')
+    def test_get_node_locations_merges_packet_links(self, mock_network, mock_repository, mock_packet_links):
+        """Packet links update existing traceroute neighbors instead of duplicating them."""
+        mock_repository.return_value = [
+            {
+                "node_id": 123,
+                "hex_id": "!0000007b",
+                "display_name": "Test Node",
+                "long_name": "Test Node Long",
+                "short_name": "TN",
+                "hw_model": "TBEAM",
+                "role": "CLIENT",
+                "primary_channel": None,
+                "latitude": 40.7128,
+                "longitude": -74.0060,
+                "altitude": 100,
+                "timestamp": 1234567890.0,
+                "sats_in_view": None,
+                "precision_bits": None,
+                "precision_meters": None,
+            }
+        ]
+        mock_network.return_value = {
+            "links": [{"source": 123, "target": 456, "avg_snr": 5.0, "packet_count": 3}],
+            "nodes": [{"id": 123, "packet_count": 9, "avg_snr": 4.5}],
+        }
+        mock_packet_links.return_value = [
+            {"from_node_id": 123, "to_node_id": 456, "total_hops_seen": 7, "avg_rssi": -90},
+            {"from_node_id": 123, "to_node_id": 789, "total_hops_seen": 2, "avg_snr": 1.0},
+        ]
+
+        result = LocationService.get_node_locations({})
+
+        node = result[0]
+        assert node["packet_count"] == 9
+        assert node["avg_snr"] == 4.5
+        assert node["last_seen_network"] is None
+        assert node["direct_neighbors"] == 2
+        by_id = {n["neighbor_id"]: n for n in node["neighbors"]}
+        assert by_id[456]["traceroute_count"] == 3
+        assert by_id[456]["packet_count"] == 7
+        assert by_id[456]["avg_rssi"] == -90
+        assert by_id[789]["traceroute_count"] == 0
+        assert by_id[789]["packet_count"] == 2
+
+
+class TestLocationServiceNeighbors:
+    """Test cases for LocationService.get_node_neighbors."""
+
+    def setup_method(self):
+        """Clear cache before each test."""
+        LocationService.clear_cache()
+
+    @staticmethod
+    def _location(node_id, latitude, longitude):
+        return {
+            "node_id": node_id,
+            "display_name": f"Node {node_id}",
+            "latitude": latitude,
+            "longitude": longitude,
+            "altitude": None,
+            "hw_model": "TBEAM",
+            "timestamp": 1000.0,
+        }
+
+    @patch('src.malla.services.location_service.LocationService.get_node_locations')
+    def test_get_node_neighbors_within_distance(self, mock_locations):
+        """Only nodes inside the radius are returned, closest first."""
+        mock_locations.return_value = [
+            self._location(1, 40.7128, -74.0060),
+            self._location(2, 40.7306, -73.9352),  # ~6.3 km
+            self._location(3, 40.7200, -74.0000),  # ~0.9 km
+            self._location(4, 39.9526, -75.1652),  # ~130 km
+        ]
+
+        neighbors = LocationService.get_node_neighbors(1, max_distance_km=10)
+
+        assert [n["node_id"] for n in neighbors] == [3, 2]
+
+    @patch('src.malla.services.location_service.LocationService.get_node_locations')
+    def test_get_node_neighbors_reuses_cached_index(self, mock_locations):
+        """Back-to-back neighbor queries share one location lookup."""
+        mock_locations.return_value = [
+            self._location(1, 40.7128, -74.0060),
+            self._location(2, 40.7306, -73.9352),
+        ]
+
+        LocationService.get_node_neighbors(1)
+        LocationService.get_node_neighbors(2)
+
+        mock_locations.assert_called_once()
+
+    @patch('src.malla.services.location_service.LocationService.get_node_locations')
+    def test_get_node_neighbors_unknown_node(self, mock_locations):
+        """Nodes without a location have no neighbors."""
+        mock_locations.return_value = [self._location(1, 40.7128, -74.0060)]
+
+        assert LocationService.get_node_neighbors(99) == []
+
+    @patch('src.malla.services.location_service.LocationService.get_node_locations')
+    def test_hop_distances_and_neighbors_share_locations(self, mock_locations):
+        """Hop distances and neighbor queries reuse one enhanced location lookup."""
+        mock_locations.return_value = [
+            self._location(1, 40.7128, -74.0060),
+            self._location(2, 40.7306, -73.9352),
+        ]
+
+        distances = LocationService.get_node_hop_distances()
+        LocationService.get_node_neighbors(1)
+
+        assert len(distances) == 1
+        mock_locations.assert_called_once_with({}, include_network=False)
+
+    @patch('src.malla.services.location_service.LocationService.get_node_locations')
+    def test_cached_node_locations_keyed_by_filters(self, mock_locations):
+        """Different filters are cached separately."""
+        mock_locations.return_value = []
+
+        LocationService.get_cached_node_locations({"gateway_id": "a"})
+        LocationService.get_cached_node_locations({"gateway_id": "a"})
+        LocationService.get_cached_node_locations({"gateway_id": "b"})
+
+        assert mock_locations.call_count == 2
+
+
+class TestLocationStatistics:
+    """Test cases for LocationService.get_location_statistics."""
+
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_position_packet_counts_single_query(self, mock_conn, mock_cursor_factory):
+        """Total and recent position packets come from one query."""
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = {"total_count": 120, "recent_count": 7}
+        mock_cursor_factory.return_value = mock_cursor
+        locations = [
+            {"latitude": 40.7128, "longitude": -74.0060, "altitude": 10, "timestamp": time.time()},
+            {"latitude": 40.7306, "longitude": -73.9352, "altitude": None, "timestamp": 0.0},
+        ]
+
+        stats = LocationService.get_location_statistics(locations)
+
+        mock_cursor.execute.assert_called_once()
+        assert "FILTER" in mock_cursor.execute.call_args[0][0]
+        assert stats["total_position_packets"] == 120
+        assert stats["recent_position_packets"] == 7
+        assert stats["recent_nodes_with_location"] == 1
+
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_bounds_and_elevation(self, mock_conn, mock_cursor_factory):
+        """Bounding box and elevation stats match the input extremes."""
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = {"total_count": 0, "recent_count": 0}
+        mock_cursor_factory.return_value = mock_cursor
+        locations = [
+            {"latitude": 41.0, "longitude": -73.0, "altitude": 50, "timestamp": 0.0},
+            {"latitude": 40.0, "longitude": -75.0, "altitude": None, "timestamp": 0.0},
+            {"latitude": 42.0, "longitude": -74.0, "altitude": 10, "timestamp": 0.0},
+            {"latitude": 40.5, "longitude": -72.0, "altitude": 30, "timestamp": 0.0},
+        ]
+
+        stats = LocationService.get_location_statistics(locations)
+
+        assert stats["coverage_area"]["bounding_box"] == {
+            "min_lat": 40.0,
+            "max_lat": 42.0,
+            "min_lon": -75.0,
+            "max_lon": -72.0,
+        }
+        assert stats["coverage_area"]["center"] == {"latitude": 41.0, "longitude": -73.5}
+        assert stats["elevation_stats"]["min_elevation"] == 10
+        assert stats["elevation_stats"]["max_elevation"] == 50
+        assert stats["elevation_stats"]["avg_elevation"] == 30
+        assert stats["elevation_stats"]["nodes_with_elevation"] == 3
+        assert stats["elevation_stats"]["elevation_range"] == 40
+
+
+class TestTracerouteLinks:
+    """Test cases for LocationService.get_traceroute_links."""
+
+    @patch('src.malla.database.schema_tier_b.get_longest_links_optimized')
+    def test_converts_tier_b_links(self, mock_links):
+        """Tier B links are converted to map links."""
+        last_seen = datetime(2024, 1, 1, 12, 0, 0)
+        mock_links.return_value = [
+            {"from_node_id": 1, "to_node_id": 2, "distance_km": 12.5,
+             "last_seen": last_seen, "traceroute_count": 4, "snr": 6.0},
+            {"from_node_id": 5, "to_node_id": 6, "distance_km": None,
+             "last_seen": last_seen.timestamp(), "traceroute_count": 30, "snr": None},
+        ]
+
+        links = LocationService.get_traceroute_links()
+
+        assert mock_links.call_args.kwargs["max_distance_km"] == 250
+        assert [(l["from_node_id"], l["to_node_id"]) for l in links] == [(1, 2), (5, 6)]
+        assert links[0]["success_rate"] == 40
+        assert links[1]["success_rate"] == 100
+        assert links[0]["total_hops_seen"] == 4
+        assert links[0]["avg_snr"] == 6.0
+        assert links[0]["last_seen_str"] == "2024-01-01 12:00:00"
+        assert links[0]["distance_km"] == 12.5
+
+
+class TestHaversineDistance:
+    """Test cases for the haversine helpers."""
+
+    def test_known_distance(self):
+        """New York to Los Angeles is roughly 3936 km."""
+        distance = LocationService.calculate_haversine_distance(
+            40.7128, -74.0060, 34.0522, -118.2437
+        )
+        assert distance == pytest.approx(3936, rel=0.01)
+
+    def test_same_point(self):
+        """A point is zero km from itself."""
+        assert LocationService.calculate_haversine_distance(40.0, -74.0, 40.0, -74.0) == 0.0
+
+    def test_batch_matches_scalar(self):
+        """The batch API returns the scalar result for every pair."""
+        lat1 = [40.7128, 51.5074, -33.8688]
+        lon1 = [-74.0060, -0.1278, 151.2093]
+        lat2 = [34.0522, 48.8566, 40.7128]
+        lon2 = [-118.2437, 2.3522, -74.0060]
+
+        distances = LocationService.calculate_haversine_distance_batch(lat1, lon1, lat2, lon2)
+
+        assert distances == [
+            pytest.approx(LocationService.calculate_haversine_distance(*pair))
+            for pair in zip(lat1, lon1, lat2, lon2)
+        ]
+
+
+class TestPacketLinks:
+    """Test cases for LocationService.get_packet_links."""
+
+    def setup_method(self):
+        """Clear cache before each test."""
+        LocationService.clear_cache()
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_distance_filtering(self, mock_conn, mock_cursor_factory, mock_locations):
+        """Links are kept in order, long links dropped and unlocated links kept."""
+        mock_cursor = Mock()
+        mock_cursor.fetchmany.side_effect = [[
+            {"node_a": 1, "node_b": 2, "packet_count": 3, "max_direction_count": 3,
+             "avg_rssi": -80.0, "avg_snr": 5.0, "last_seen": 1000.0, "is_bidirectional": False},
+            {"node_a": 1, "node_b": 3, "packet_count": 1, "max_direction_count": 1,
+             "avg_rssi": -95.0, "avg_snr": 1.0, "last_seen": 1000.0, "is_bidirectional": False},
+            {"node_a": 1, "node_b": 4, "packet_count": 2, "max_direction_count": 2,
+             "avg_rssi": -90.0, "avg_snr": 2.0, "last_seen": 1000.0, "is_bidirectional": False},
+        ], []]
+        mock_cursor_factory.return_value = mock_cursor
+        mock_locations.return_value = [
+            {"node_id": 1, "latitude": 40.7128, "longitude": -74.0060},
+            {"node_id": 2, "latitude": 40.7306, "longitude": -73.9352},
+            {"node_id": 3, "latitude": 34.0522, "longitude": -118.2437},
+        ]
+
+        links = LocationService.get_packet_links()
+
+        assert [(l["from_node_id"], l["to_node_id"]) for l in links] == [(1, 2), (1, 4)]
+        assert links[0]["distance_km"] == pytest.approx(6.29, abs=0.01)
+        assert links[1]["distance_km"] is None
+        assert links[0]["last_seen_str"] == time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.localtime(1000.0)
+        )
+        query = mock_cursor.execute.call_args[0][0]
+        assert "THEN ('x' || lpad(substring(gateway_id from 2), 8, '0'))::bit(32)::bigint END AS gateway_node_id" in query
+        assert mock_cursor_factory.call_args.kwargs["name"] == "packet_links"
+        mock_conn.return_value.close.assert_called_once()
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_groups_by_parsed_gateway_node(self, mock_conn, mock_cursor_factory, mock_locations):
+        """Directions are grouped by the parsed gateway, not packet_history.to_node_id."""
+        mock_cursor = Mock()
+        mock_cursor.fetchmany.side_effect = [[]]
+        mock_cursor_factory.return_value = mock_cursor
+        mock_locations.return_value = []
+
+        LocationService.get_packet_links()
+
+        query = mock_cursor.execute.call_args[0][0]
+        directed = query[:query.index("FROM directed")]
+        group_by = directed.split("GROUP BY")[1].splitlines()[0]
+        assert [col.strip() for col in group_by.split(",")] == [
+            "from_node_id",
+            "gateway_node_id",
+        ]
+        # A GROUP BY name matching an input column binds to that column, so
+        # the parsed gateway must not be aliased to one
+        assert f"{GATEWAY_NODE_ID_SQL} AS gateway_node_id" in directed
+        assert "AS to_node_id" not in directed
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_latitude_prefilter_skips_distance(self, mock_conn, mock_cursor_factory, mock_locations):
+        """Pairs too far apart in latitude are dropped before measuring."""
+        mock_cursor = Mock()
+        mock_cursor.fetchmany.side_effect = [[
+            {"node_a": 1, "node_b": 2, "packet_count": 3, "max_direction_count": 3,
+             "avg_rssi": -80.0, "avg_snr": 5.0, "last_seen": 1000.0, "is_bidirectional": False},
+            {"node_a": 1, "node_b": 3, "packet_count": 1, "max_direction_count": 1,
+             "avg_rssi": -95.0, "avg_snr": 1.0, "last_seen": 1000.0, "is_bidirectional": False},
+        ], []]
+        mock_cursor_factory.return_value = mock_cursor
+        mock_locations.return_value = [
+            {"node_id": 1, "latitude": 40.0, "longitude": -74.0},
+            {"node_id": 2, "latitude": 40.0, "longitude": -71.5},
+            {"node_id": 3, "latitude": 43.0, "longitude": -74.0},
+        ]
+
+        with patch.object(
+            LocationService,
+            "calculate_haversine_distance_batch",
+            wraps=LocationService.calculate_haversine_distance_batch,
+        ) as mock_batch:
+            links = LocationService.get_packet_links()
+
+        assert [(l["from_node_id"], l["to_node_id"]) for l in links] == [(1, 2)]
+        assert mock_batch.call_args[0] == ([40.0], [-74.0], [40.0], [-71.5])
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.database.connection_postgres.get_postgres_cursor')
+    @patch('src.malla.database.connection.get_db_connection')
+    def test_merges_both_directions(self, mock_conn, mock_cursor_factory, mock_locations):
+        """Both directions of a pair are merged into one link by the query."""
+        mock_cursor = Mock()
+        mock_cursor.fetchmany.side_effect = [[
+            {"node_a": 1, "node_b": 2, "packet_count": 23, "max_direction_count": 20,
+             "avg_rssi": -85.04, "avg_snr": 4.0333333, "last_seen": 2000.0,
+             "is_bidirectional": True},
+            {"node_a": 1, "node_b": 3, "packet_count": 1, "max_direction_count": 1,
+             "avg_rssi": None, "avg_snr": None, "last_seen": 2000.0,
+             "is_bidirectional": False},
+        ], []]
+        mock_cursor_factory.return_value = mock_cursor
+        mock_locations.return_value = []
+
+        links = LocationService.get_packet_links()
+
+        assert len(links) == 2
+        link = links[0]
+        assert (link["from_node_id"], link["to_node_id"]) == (1, 2)
+        assert link["is_bidirectional"] is True
+        assert link["total_hops_seen"] == 23
+        assert link["success_rate"] == 100
+        assert link["avg_rssi"] == -85.0
+        assert link["avg_snr"] == 4.0
+        assert links[1]["avg_rssi"] is None
+        assert links[1]["avg_snr"] is None
+        assert link["last_seen_str"] == time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.localtime(2000.0)
+        )
+        query = mock_cursor.execute.call_args[0][0]
+        assert "GROUP BY from_node_id, gateway_node_id" in query
+        assert "LEAST(from_node_id, gateway_node_id)" in query
+        assert "GROUP BY node_a, node_b" in query
+
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    def test_locations_by_node_reused_for_covered_nodes(self, mock_locations):
+        """A recent lookup is reused while it covers all requested nodes."""
+        mock_locations.return_value = [
+            {"node_id": 1, "latitude": 40.0, "longitude": -74.0},
+        ]
+
+        first = LocationService._get_locations_by_node({1, 2})
+        second = LocationService._get_locations_by_node({2})
+        LocationService._get_locations_by_node({2, 3})
+
+        assert first == {1: mock_locations.return_value[0]}
+        assert second is first
+        assert mock_locations.call_count == 2
+        assert sorted(mock_locations.call_args[0][0]["node_ids"]) == [2, 3]
+
+
+class TestDensityStatistics:
+    """Test cases for LocationService._calculate_density_statistics."""
+
+    def setup_method(self):
+        """Clear cache before each test."""
+        LocationService.clear_cache()
+
+    @patch('src.malla.services.location_service.summarize_pairwise_distances')
+    def test_pairwise_summary_reused_for_same_points(self, mock_summary):
+        """The quadratic summary only reruns when the points change."""
+        mock_summary.return_value = (1, 10.0, 10.0, 10.0)
+        locations = [
+            {"latitude": 40.0, "longitude": -74.0},
+            {"latitude": 40.1, "longitude": -74.0},
+        ]
+
+        first = LocationService._calculate_density_statistics(locations)
+        second = LocationService._calculate_density_statistics(list(locations))
+        LocationService._calculate_density_statistics(
+            locations + [{"latitude": 40.2, "longitude": -74.0}]
+        )
+
+        assert first == second
+        assert first["average_node_separation_km"] == 10.0
+        assert mock_summary.call_count == 2
+
+
+class TestLocationFreshness:
+    """Test cases for LocationService._analyze_location_freshness."""
+
+    def test_categories_at_boundaries(self):
+        """Each bucket's upper bound belongs to the next, older bucket."""
+        now = 100 * 86400.0
+        ages = [0, 3599, 3600, 86399, 86400, 7 * 86400, 30 * 86400 - 1, 30 * 86400]
+        locations = [{"timestamp": now - age} for age in ages] + [{"timestamp": None}]
+
+        result = LocationService._analyze_location_freshness(locations, now)
+
+        assert result["categories"] == {
+            "very_fresh": 2,
+            "fresh": 2,
+            "recent": 1,
+            "old": 2,
+            "very_old": 1,
+        }
+        assert result["newest_location_days"] == 0
+        assert result["oldest_location_days"] == 30
+        assert result["average_age_days"] == round(sum(ages) / len(ages) / 86400, 2)
+
+    def test_empty(self):
+        """No locations gives an empty analysis."""
+        assert LocationService._analyze_location_freshness([], 0.0) == {}
+
+    def test_without_timestamps(self):
+        """Locations without timestamps give zeroed statistics."""
+        result = LocationService._analyze_location_freshness([{"timestamp": None}], 0.0)
+
+        assert sum(result["categories"].values()) == 0
+        assert result["average_age_days"] == 0
+        assert result["oldest_location_days"] == 0
+        assert result["newest_location_days"] == 0
@@ -0,0 +1,47 @@
+"""Tests for the materialized view refresher."""
+
+import threading
+import time
+from unittest.mock import patch
+
+from src.malla.services.materialized_view_refresher import MaterializedViewRefresher
+
+
+class TestMaterializedViewRefresher:
+    """Test cases for MaterializedViewRefresher."""
+
+    @patch('src.malla.services.materialized_view_refresher.refresh_longest_links_mv')
+    @patch('src.malla.services.materialized_view_refresher.maintain_traceroute_hops_partitions')
+    def test_stop_interrupts_retry_wait(self, mock_maintain, mock_refresh):
+        """A failed cycle waits on the stop event, so stop returns promptly."""
+        failed = threading.Event()
+
+        def fail():
+            failed.set()
+            raise RuntimeError("database unavailable")
+
+        mock_maintain.side_effect = fail
+        refresher = MaterializedViewRefresher(refresh_interval_minutes=5)
+
+        refresher.start()
+        assert failed.wait(timeout=5)
+        started = time.monotonic()
+        refresher.stop()
+
+        assert time.monotonic() - started < 5
+        assert not refresher.is_running()
+        mock_refresh.assert_not_called()
+
+    @patch('src.malla.services.materialized_view_refresher.refresh_longest_links_mv')
+    @patch('src.malla.services.materialized_view_refresher.maintain_traceroute_hops_partitions')
+    def test_cycle_skips_unchanged_view(self, mock_maintain, mock_refresh):
+        """Periodic refreshes skip the view when no hops changed."""
+        refreshed = threading.Event()
+        mock_refresh.side_effect = lambda **kwargs: refreshed.set()
+        refresher = MaterializedViewRefresher(refresh_interval_minutes=5)
+
+        refresher.start()
+        assert refreshed.wait(timeout=5)
+        refresher.stop()
+
+        mock_refresh.assert_called_once_with(skip_if_unchanged=True)
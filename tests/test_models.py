@@ -220,6 +220,36 @@ class TestTraceroutePacket:
         # Logger should be available for use (tested by import success)
         assert hasattr(packet, 'packet_data')
 
+    @patch('src.malla.utils.node_utils.get_bulk_node_names')
+    def test_resolve_node_names_bulk(self, mock_names):
+        """Names for several packets are looked up once and applied to each."""
+        route_data: RouteData = {
+            "route_nodes": [555],
+            "snr_towards": [],
+            "route_back": [],
+            "snr_back": [],
+        }
+        packets = [
+            TraceroutePacket(
+                self.sample_packet_data,
+                resolve_names=False,
+                pre_parsed_route_data=route_data,
+            ),
+            TraceroutePacket(
+                {"id": "other", "from_node_id": 1, "to_node_id": 2},
+                resolve_names=False,
+            ),
+        ]
+        mock_names.return_value = {555: "Relay", 1: "One"}
+
+        TraceroutePacket.resolve_node_names_bulk(packets)
+
+        mock_names.assert_called_once()
+        assert set(mock_names.call_args[0][0]) == {123456789, 987654321, 555, 1, 2}
+        assert packets[0].forward_path.node_names[1] == "Relay"
+        assert packets[1].from_node_name == "One"
+        assert packets[1].to_node_name == "!00000002"
+
 
 class TestRouteDataTypedDict:
     """Test cases for RouteData TypedDict."""
@@ -0,0 +1,64 @@
+"""Tests for node_utils module."""
+
+from unittest.mock import MagicMock, patch
+
+from src.malla.utils import node_utils
+from src.malla.utils.node_utils import clear_node_name_cache, get_bulk_node_names
+
+
+class TestBulkNodeNameCache:
+    """Test cases for the node name cache used by get_bulk_node_names."""
+
+    def setup_method(self):
+        """Start each test with an empty node name cache."""
+        clear_node_name_cache()
+
+    def teardown_method(self):
+        """Leave no cached names behind for other tests."""
+        clear_node_name_cache()
+
+    @patch('src.malla.database.adapter.get_db_adapter')
+    def test_only_missing_ids_are_queried(self, mock_get_db):
+        """Cached names are reused and only unknown nodes hit the database."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.side_effect = [
+            [{"node_id": 1, "long_name": "One", "short_name": None, "hex_id": None}],
+            [],
+        ]
+
+        first = get_bulk_node_names([1, 2])
+        second = get_bulk_node_names([1, 2, 3])
+
+        assert first == {1: "One", 2: "!00000002"}
+        assert second == {1: "One", 2: "!00000002", 3: "!00000003"}
+        assert mock_db.execute.call_args_list[1][0][1] == (3,)
+
+    @patch('src.malla.utils.node_utils.time.time')
+    @patch('src.malla.database.adapter.get_db_adapter')
+    def test_expired_names_are_refetched(self, mock_get_db, mock_time):
+        """Names older than the TTL are looked up again."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.side_effect = [
+            [{"node_id": 1, "long_name": "Old", "short_name": None, "hex_id": None}],
+            [{"node_id": 1, "long_name": "New", "short_name": None, "hex_id": None}],
+        ]
+        mock_time.return_value = 1000.0
+        assert get_bulk_node_names([1]) == {1: "Old"}
+
+        mock_time.return_value = 1000.0 + node_utils.NODE_NAME_CACHE_TTL_SECONDS
+        assert get_bulk_node_names([1]) == {1: "New"}
+        assert mock_db.execute.call_count == 2
+
+    @patch('src.malla.database.adapter.get_db_adapter')
+    def test_oldest_entries_evicted_when_full(self, mock_get_db):
+        """The cache never grows past its maximum size."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.return_value = []
+
+        with patch.object(node_utils, "NODE_NAME_CACHE_MAX_SIZE", 2):
+            get_bulk_node_names([1, 2, 3])
+
+        assert list(node_utils.node_name_cache) == [2, 3]
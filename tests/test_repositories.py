@@ -132,6 +132,128 @@ class TestTracerouteRepository:
         """Test that TracerouteRepository has expected methods."""
         assert hasattr(TracerouteRepository, '__dict__')
 
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_node_traceroute_counts_in_sql(self, mock_get_db):
+        """Success counts come from one aggregate query and NULLs become zero."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchone.return_value = {
+            "source_total": 4,
+            "source_successful": 3,
+            "dest_total": 0,
+            "dest_successful": None,
+        }
+
+        result = TracerouteRepository.get_node_traceroute_counts(0x1234)
+
+        query, params = mock_db.execute.call_args[0]
+        assert "FILTER" in query
+        assert params == (0x1234,) * 5
+        mock_db.fetchall.assert_not_called()
+        assert result == {
+            "source_total": 4,
+            "source_successful": 3,
+            "dest_total": 0,
+            "dest_successful": 0,
+        }
+
+    @patch('src.malla.database.repositories.parse_traceroute_payload')
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_traceroute_packets_route_node_filter(self, mock_get_db, mock_parse):
+        """Route nodes are parsed once per row and reused for route_node filtering."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchone.return_value = {"total": 2}
+        row = {
+            "timestamp": 100.0,
+            "timestamp_str": "now",
+            "processed_successfully": True,
+            "hop_start": 3,
+            "hop_limit": 1,
+        }
+        mock_db.fetchall.return_value = [
+            dict(row, id=1, from_node_id=1, to_node_id=2, raw_payload=b"a"),
+            dict(row, id=2, from_node_id=3, to_node_id=4, raw_payload=b"b"),
+        ]
+        mock_parse.side_effect = [{"route_nodes": [9]}, {"route_nodes": []}]
+
+        result = TracerouteRepository.get_traceroute_packets(filters={"route_node": 9})
+
+        assert mock_parse.call_count == 2
+        assert [packet["id"] for packet in result["packets"]] == [1]
+        assert result["packets"][0]["route"] == "[9]"
+        assert result["total_count"] == 1
+
+    @patch('src.malla.utils.node_utils.get_bulk_node_names')
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_traceroute_packets_grouped_names_page_once(self, mock_get_db, mock_names):
+        """Grouped route displays are named for the returned page in one lookup."""
+        from meshtastic.protobuf import mesh_pb2
+
+        route_discovery = mesh_pb2.RouteDiscovery()
+        route_discovery.route.extend([9])
+        route_discovery.snr_towards.extend([20, 20])
+        payload = route_discovery.SerializeToString()
+
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        row = {
+            "timestamp_str": "now",
+            "gateway_id": "!gw",
+            "processed_successfully": True,
+            "hop_start": 3,
+            "hop_limit": 1,
+            "rssi": -80,
+            "snr": 5.0,
+            "payload_length": len(payload),
+            "raw_payload": payload,
+        }
+        mock_db.fetchall.return_value = [
+            dict(row, id=1, timestamp=300.0, mesh_packet_id=11, from_node_id=1, to_node_id=2),
+            dict(row, id=2, timestamp=200.0, mesh_packet_id=12, from_node_id=3, to_node_id=4),
+            dict(row, id=3, timestamp=100.0, mesh_packet_id=13, from_node_id=5, to_node_id=6),
+        ]
+        mock_names.return_value = {1: "One", 9: "Nine", 2: "Two"}
+
+        result = TracerouteRepository.get_traceroute_packets(limit=2, group_packets=True)
+
+        assert [packet["id"] for packet in result["packets"]] == [1, 2]
+        mock_names.assert_called_once()
+        assert set(mock_names.call_args[0][0]) == {1, 2, 3, 4, 9}
+        assert result["packets"][0]["route"] == "[9]"
+        assert result["packets"][0]["route_display"].startswith("One -> Nine")
+
+    @patch('src.malla.database.repositories.get_postgres_cursor')
+    @patch('src.malla.database.repositories.get_postgres_connection')
+    def test_iter_recent_traceroute_routes_streams(self, mock_conn, mock_cursor_factory):
+        """Routes are read in chunks from a named cursor and the connection is closed."""
+        cursor = mock_cursor_factory.return_value
+        cursor.fetchmany.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+
+        rows = list(TracerouteRepository.iter_recent_traceroute_routes(limit=3))
+
+        assert [row["id"] for row in rows] == [1, 2, 3]
+        assert mock_cursor_factory.call_args.kwargs["name"] == "recent_traceroute_routes"
+        assert cursor.execute.call_args[0][1] == (3,)
+        mock_conn.return_value.close.assert_called_once()
+
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_traceroute_routes_filters_in_query(self, mock_get_db):
+        """Filters are applied in SQL and only routes with a payload are fetched."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.return_value = [{"id": 1, "raw_payload": b"a"}]
+
+        result = TracerouteRepository.get_traceroute_routes(
+            filters={"start_time": 100.0, "gateway_id": "!abcd"}, limit=50
+        )
+
+        query, params = mock_db.execute.call_args[0]
+        assert "raw_payload IS NOT NULL" in query
+        assert "COUNT" not in query
+        assert params == (100.0, "!abcd", 50)
+        assert result == [{"id": 1, "raw_payload": b"a"}]
+
 
 class TestLocationRepository:
     """Test LocationRepository functionality."""
@@ -144,6 +266,47 @@ class TestLocationRepository:
         """Test that LocationRepository has expected methods."""
         assert hasattr(LocationRepository, '__dict__')
 
+    @patch('src.malla.database.repositories.get_db_adapter')
+    @patch('time.time')
+    def test_get_node_locations_min_age_in_query(self, mock_time, mock_get_db):
+        """Test min_age_hours filters each node's latest position in SQL."""
+        mock_time.return_value = 10000.0
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.return_value = []
+
+        LocationRepository.get_node_locations({"min_age_hours": 1})
+
+        query, params = mock_db.execute.call_args[0]
+        assert "HAVING MAX(timestamp) <= %s" in query
+        assert params == (6400.0,)
+
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_node_locations_node_ids_as_array(self, mock_get_db):
+        """Requested node IDs are passed as a single array parameter."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.return_value = []
+
+        LocationRepository.get_node_locations({"node_ids": [3, "!00000002", "1"]})
+
+        query, params = mock_db.execute.call_args[0]
+        assert "from_node_id = ANY(%s)" in query
+        assert params == ([3, 2, 1],)
+
+    @patch('src.malla.database.repositories.get_db_adapter')
+    def test_get_node_locations_without_min_age(self, mock_get_db):
+        """Test no HAVING clause is emitted without min_age_hours."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.fetchall.return_value = []
+
+        LocationRepository.get_node_locations({})
+
+        query, params = mock_db.execute.call_args[0]
+        assert "HAVING" not in query
+        assert params == ()
+
 
 class TestRepositoryBasicFunctionality:
     """Test basic functionality of all repository classes."""
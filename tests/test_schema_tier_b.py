@@ -0,0 +1,301 @@
+"""Tests for the Tier B database schema helpers."""
+
+from datetime import date
+from unittest.mock import Mock, patch
+
+from src.malla.database.schema_tier_b import (
+    _hops_partition_name,
+    create_tier_b_schema,
+    ensure_traceroute_hops_partitions,
+    get_longest_links_optimized,
+    refresh_longest_links_mv,
+    schedule_longest_links_refresh,
+    unschedule_longest_links_refresh,
+)
+
+
+class TestTracerouteHopsPartitions:
+    """Test cases for daily traceroute_hops partition maintenance."""
+
+    def test_partition_name(self):
+        """Partition names are derived from the day they cover."""
+        assert _hops_partition_name(date(2025, 3, 7)) == "traceroute_hops_p20250307"
+
+    def test_skips_unpartitioned_table(self):
+        """Legacy plain tables are left alone."""
+        cursor = Mock()
+        cursor.fetchone.return_value = None
+
+        assert ensure_traceroute_hops_partitions(cursor) == 0
+        cursor.execute.assert_called_once()
+
+    def test_creates_missing_partitions(self):
+        """Yesterday through days_ahead partitions are created when missing."""
+        cursor = Mock()
+        # First row marks the table as partitioned, then every lookup misses
+        cursor.fetchone.side_effect = [{"?column?": 1}] + [{"oid": None}] * 4
+
+        created = ensure_traceroute_hops_partitions(cursor, days_ahead=2)
+
+        assert created == 4
+        create_calls = [
+            call[0][0]
+            for call in cursor.execute.call_args_list
+            if "PARTITION OF traceroute_hops" in call[0][0]
+        ]
+        assert len(create_calls) == 4
+
+    def test_existing_partitions_are_not_recreated(self):
+        """Partitions that already exist are skipped."""
+        cursor = Mock()
+        cursor.fetchone.side_effect = [{"?column?": 1}] + [{"oid": "exists"}] * 3
+
+        assert ensure_traceroute_hops_partitions(cursor, days_ahead=1) == 0
+
+
+class TestCreateTierBSchema:
+    """Test cases for create_tier_b_schema."""
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_legacy_plain_table_gets_rest_of_schema(
+        self, mock_conn, mock_cursor_factory
+    ):
+        """A plain traceroute_hops gets no partitions but everything else."""
+        cursor = Mock()
+        cursor.fetchone.return_value = None
+        mock_cursor_factory.return_value = cursor
+
+        create_tier_b_schema()
+
+        executed = [call[0][0] for call in cursor.execute.call_args_list]
+        assert not any("PARTITION OF traceroute_hops" in sql for sql in executed)
+        assert any(
+            "CREATE MATERIALIZED VIEW longest_links_mv" in sql for sql in executed
+        )
+        function_sql = next(
+            sql for sql in executed
+            if "FUNCTION refresh_longest_links_mv_if_changed" in sql
+        )
+        assert "pg_try_advisory_xact_lock(hashtext('mv_refresh'))" in function_sql
+        assert "'lock_timeout', '30s'" in function_sql
+        assert "INSERT INTO mv_refresh_state" in function_sql
+        mock_conn.return_value.commit.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_partitioned_table_gets_default_partition(
+        self, mock_conn, mock_cursor_factory
+    ):
+        """A partitioned traceroute_hops gets its catch-all partition."""
+        cursor = Mock()
+        cursor.fetchone.return_value = {"?column?": 1, "oid": "exists"}
+        mock_cursor_factory.return_value = cursor
+
+        create_tier_b_schema()
+
+        executed = [call[0][0] for call in cursor.execute.call_args_list]
+        assert any(
+            "PARTITION OF traceroute_hops DEFAULT" in sql for sql in executed
+        )
+
+
+class TestScheduleLongestLinksRefresh:
+    """Test cases for pg_cron scheduling."""
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_schedules_when_pg_cron_installed(self, mock_conn, mock_cursor_factory):
+        """The refresh job is registered with cron.schedule."""
+        cursor = Mock()
+        cursor.fetchone.return_value = {"?column?": 1}
+        mock_cursor_factory.return_value = cursor
+
+        assert schedule_longest_links_refresh(5) is True
+        sql, params = cursor.execute.call_args[0]
+        assert "cron.schedule" in sql
+        assert params[1] == "*/5 * * * *"
+        assert params[2] == "SELECT refresh_longest_links_mv_if_changed()"
+        mock_conn.return_value.commit.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_falls_back_without_pg_cron(self, mock_conn, mock_cursor_factory):
+        """Without the extension the caller keeps refreshing itself."""
+        cursor = Mock()
+        cursor.fetchone.return_value = None
+        mock_cursor_factory.return_value = cursor
+
+        assert schedule_longest_links_refresh(5) is False
+        cursor.execute.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_rejects_interval_cron_cannot_express(self, mock_conn):
+        """Intervals outside 1-59 minutes are not scheduled."""
+        assert schedule_longest_links_refresh(90) is False
+        mock_conn.assert_not_called()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_unschedules_job(self, mock_conn, mock_cursor_factory):
+        """The refresh job is removed by name when pg_cron is installed."""
+        cursor = Mock()
+        cursor.fetchone.return_value = {"?column?": 1}
+        mock_cursor_factory.return_value = cursor
+
+        unschedule_longest_links_refresh()
+
+        sql, params = cursor.execute.call_args[0]
+        assert "cron.unschedule" in sql
+        assert params == ("mv-refresh",)
+        mock_conn.return_value.commit.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_unschedule_without_pg_cron(self, mock_conn, mock_cursor_factory):
+        """Nothing is unscheduled without the extension."""
+        cursor = Mock()
+        cursor.fetchone.return_value = None
+        mock_cursor_factory.return_value = cursor
+
+        unschedule_longest_links_refresh()
+
+        cursor.execute.assert_called_once()
+
+
+class TestRefreshLongestLinksMv:
+    """Test cases for refresh_longest_links_mv."""
+
+    @staticmethod
+    def _executed(cursor):
+        return [call[0][0] for call in cursor.execute.call_args_list]
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_skips_when_no_new_hops(self, mock_conn, mock_cursor_factory):
+        """No REFRESH is issued when hops did not change since the last one."""
+        cursor = Mock()
+        cursor.fetchone.side_effect = [
+            {"locked": True},
+            {"tracked": True},
+            {"change_seq": 5, "refreshed_seq": 5},
+        ]
+        mock_cursor_factory.return_value = cursor
+
+        refresh_longest_links_mv(skip_if_unchanged=True)
+
+        executed = self._executed(cursor)
+        assert not any("REFRESH MATERIALIZED VIEW" in sql for sql in executed)
+        assert "pg_advisory_unlock" in executed[-1]
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_refreshes_when_new_hops(self, mock_conn, mock_cursor_factory):
+        """Changed hops trigger a concurrent refresh and record the counter."""
+        cursor = Mock()
+        cursor.fetchone.side_effect = [
+            {"locked": True},
+            {"tracked": True},
+            {"change_seq": 6, "refreshed_seq": 5},
+        ]
+        mock_cursor_factory.return_value = cursor
+
+        refresh_longest_links_mv(skip_if_unchanged=True)
+
+        executed = self._executed(cursor)
+        assert any("REFRESH MATERIALIZED VIEW CONCURRENTLY" in sql for sql in executed)
+        state_call = next(
+            call for call in cursor.execute.call_args_list
+            if "mv_refresh_state" in call[0][0] and "INSERT" in call[0][0]
+        )
+        assert state_call[0][1] == (6,)
+        refresh_at = next(
+            i for i, sql in enumerate(executed) if "REFRESH MATERIALIZED VIEW" in sql
+        )
+        assert "SET LOCAL statement_timeout = 0" in executed[:refresh_at]
+        assert "SET LOCAL lock_timeout = '30s'" in executed[:refresh_at]
+        mock_conn.return_value.commit.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_refreshes_without_recorded_state(self, mock_conn, mock_cursor_factory):
+        """A view never refreshed through the counter is treated as stale."""
+        cursor = Mock()
+        cursor.fetchone.side_effect = [
+            {"locked": True},
+            {"tracked": True},
+            {"change_seq": None, "refreshed_seq": None},
+        ]
+        mock_cursor_factory.return_value = cursor
+
+        refresh_longest_links_mv(skip_if_unchanged=True)
+
+        executed = self._executed(cursor)
+        assert any("REFRESH MATERIALIZED VIEW CONCURRENTLY" in sql for sql in executed)
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_refreshes_without_change_state_tables(
+        self, mock_conn, mock_cursor_factory
+    ):
+        """Older schemas without the change counter are always refreshed."""
+        cursor = Mock()
+        cursor.fetchone.side_effect = [{"locked": True}, {"tracked": False}]
+        mock_cursor_factory.return_value = cursor
+
+        refresh_longest_links_mv(skip_if_unchanged=True)
+
+        executed = self._executed(cursor)
+        assert any("REFRESH MATERIALIZED VIEW CONCURRENTLY" in sql for sql in executed)
+        assert not any("mv_refresh_state" in sql for sql in executed[2:])
+        mock_conn.return_value.commit.assert_called_once()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_skips_when_lock_held(self, mock_conn, mock_cursor_factory):
+        """A concurrent refresh holding the advisory lock wins."""
+        cursor = Mock()
+        cursor.fetchone.return_value = {"locked": False}
+        mock_cursor_factory.return_value = cursor
+
+        refresh_longest_links_mv()
+
+        assert cursor.execute.call_count == 1
+        mock_conn.return_value.close.assert_called_once()
+
+
+class TestGetLongestLinksOptimized:
+    """Test cases for get_longest_links_optimized."""
+
+    @staticmethod
+    def _position(latitude, longitude):
+        from meshtastic import mesh_pb2
+
+        position = mesh_pb2.Position()
+        position.latitude_i = int(latitude * 1e7)
+        position.longitude_i = int(longitude * 1e7)
+        return position.SerializeToString()
+
+    @patch('src.malla.database.schema_tier_b.get_postgres_cursor')
+    @patch('src.malla.database.schema_tier_b.get_postgres_connection')
+    def test_max_distance_drops_long_links(self, mock_conn, mock_cursor_factory):
+        """Links longer than max_distance_km are dropped; unknown distances are kept."""
+        mock_cursor = Mock()
+        link = {"traceroute_count": 3, "avg_snr": 5.0, "last_seen": 1000.0, "first_seen": 900.0}
+        mock_cursor.fetchall.side_effect = [
+            [
+                {"from_node_id": 1, "to_node_id": 2, **link},
+                {"from_node_id": 1, "to_node_id": 3, **link},
+                {"from_node_id": 1, "to_node_id": 4, **link},
+            ],
+            [
+                {"from_node_id": 1, "raw_payload": self._position(40.7128, -74.0060), "timestamp": 1.0},
+                {"from_node_id": 2, "raw_payload": self._position(40.7306, -73.9352), "timestamp": 1.0},
+                {"from_node_id": 3, "raw_payload": self._position(34.0522, -118.2437), "timestamp": 1.0},
+            ],
+        ]
+        mock_cursor_factory.return_value = mock_cursor
+
+        links = get_longest_links_optimized(min_distance_km=0, max_distance_km=250)
+
+        assert {link["to_node_id"] for link in links} == {2, 4}
@@ -0,0 +1,175 @@
+"""Tests for the Tier B pipeline management script."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.malla.scripts import tier_b_manager
+
+
+@pytest.fixture(autouse=True)
+def probe_cache(tmp_path, monkeypatch):
+    """Keep the probe cache out of the user's home directory."""
+    path = tmp_path / "schema_probe.json"
+    monkeypatch.setattr(tier_b_manager, "PROBE_CACHE_PATH", path)
+    return path
+
+
+class TestCheckSchema:
+    """Test cases for check_schema."""
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_check_schema_all_present(self, mock_conn, mock_cursor_factory):
+        """Both relations found in a single catalog query."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [
+            {"relname": "traceroute_hops"},
+            {"relname": "longest_links_mv"},
+        ]
+        mock_cursor_factory.return_value = mock_cursor
+
+        assert tier_b_manager.check_schema() is True
+        mock_cursor.execute.assert_called_once()
+        assert "pg_class" in mock_cursor.execute.call_args[0][0]
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_check_schema_missing_view(self, mock_conn, mock_cursor_factory):
+        """Missing materialized view reports failure."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [{"relname": "traceroute_hops"}]
+        mock_cursor_factory.return_value = mock_cursor
+
+        assert tier_b_manager.check_schema() is False
+
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_check_schema_connection_error(self, mock_conn):
+        """Connection errors are reported as a failed check."""
+        mock_conn.side_effect = Exception("connection refused")
+
+        assert tier_b_manager.check_schema() is False
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_check_schema_debug_explains_probe(self, mock_conn, mock_cursor_factory):
+        """--debug runs the probe under EXPLAIN before the real query."""
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = {"QUERY PLAN": [{"Plan": {}}]}
+        mock_cursor.fetchall.return_value = []
+        mock_cursor_factory.return_value = mock_cursor
+
+        tier_b_manager.check_schema(debug=True)
+
+        queries = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert queries[0].startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)")
+        assert not queries[1].startswith("EXPLAIN")
+
+
+class TestRefreshView:
+    """Test cases for refresh_view."""
+
+    @patch('src.malla.scripts.tier_b_manager.force_refresh_materialized_view')
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_dry_run_does_not_refresh(self, mock_conn, mock_cursor_factory, mock_refresh):
+        """A dry run explains the view definition without refreshing."""
+        mock_cursor = Mock()
+        mock_cursor.fetchone.side_effect = [
+            {"definition": " SELECT 1;"},
+            {"QUERY PLAN": []},
+        ]
+        mock_cursor_factory.return_value = mock_cursor
+
+        assert tier_b_manager.refresh_view(debug=True, dry_run=True) is True
+        mock_refresh.assert_not_called()
+        explain_sql = mock_cursor.execute.call_args_list[1][0][0]
+        assert explain_sql.startswith("EXPLAIN")
+        assert not explain_sql.endswith(";")
+
+
+class TestProbeCache:
+    """Test cases for the --stale-ok probe cache."""
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_stale_ok_skips_connection(self, mock_conn, mock_cursor_factory, probe_cache):
+        """A recent successful check is reused without connecting."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [
+            {"relname": "traceroute_hops"},
+            {"relname": "longest_links_mv"},
+        ]
+        mock_cursor_factory.return_value = mock_cursor
+
+        assert tier_b_manager.check_schema() is True
+        assert probe_cache.exists()
+        mock_conn.reset_mock()
+
+        assert tier_b_manager.check_schema(stale_ok=True) is True
+        mock_conn.assert_not_called()
+
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_stale_ok_ignores_expired_entry(self, mock_conn, probe_cache):
+        """Entries older than the TTL fall through to the database."""
+        probe_cache.write_text('{"schema": {"ok": true, "ts": 0}}')
+        mock_conn.side_effect = Exception("connection refused")
+
+        assert tier_b_manager.check_schema(stale_ok=True) is False
+        mock_conn.assert_called_once()
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_stale_ok_ignores_other_database(self, mock_conn, mock_cursor_factory):
+        """Results cached for another database are a cache miss."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [
+            {"relname": "traceroute_hops"},
+            {"relname": "longest_links_mv"},
+        ]
+        mock_cursor_factory.return_value = mock_cursor
+
+        with patch.object(
+            tier_b_manager, "_database_identity", return_value="malla@db-a:5432/malla"
+        ):
+            assert tier_b_manager.check_schema() is True
+        mock_conn.reset_mock()
+        mock_conn.side_effect = Exception("connection refused")
+
+        with patch.object(
+            tier_b_manager, "_database_identity", return_value="malla@db-b:5432/malla"
+        ):
+            assert tier_b_manager.check_schema(stale_ok=True) is False
+        mock_conn.assert_called_once()
+
+    @patch('src.malla.scripts.tier_b_manager.initialize_tier_b_pipeline')
+    def test_init_invalidates_cache(self, mock_init, probe_cache):
+        """Initializing the pipeline drops cached probe results."""
+        probe_cache.write_text('{"schema": {"ok": true, "ts": 0}}')
+
+        tier_b_manager.init_pipeline()
+
+        assert not probe_cache.exists()
+
+
+class TestShowStats:
+    """Test cases for show_stats."""
+
+    @patch('src.malla.scripts.tier_b_manager.get_postgres_cursor')
+    @patch('src.malla.scripts.tier_b_manager.get_db_connection')
+    def test_counts_use_tuple_rows(self, mock_conn, mock_cursor_factory, capsys):
+        """Count queries go through a plain cursor and are read positionally."""
+        count_cursor = Mock()
+        count_cursor.fetchone.side_effect = [(1200,), (34,), (56,)]
+        mock_conn.return_value.cursor.return_value = count_cursor
+        dict_cursor = Mock()
+        dict_cursor.fetchone.return_value = {"last_refresh": None}
+        mock_cursor_factory.return_value = dict_cursor
+
+        tier_b_manager.show_stats()
+
+        output = capsys.readouterr().out
+        assert "Total hops stored: 1,200" in output
+        assert "Recent hops (24h): 34" in output
+        assert "Links in materialized view: 56" in output
+        assert count_cursor.execute.call_count == 3
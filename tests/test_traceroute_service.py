@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from src.malla.services.traceroute_service import TracerouteService
+from src.malla.utils.cache import get_analytics_cache
 
 
 class TestTracerouteService:
@@ -53,20 +54,18 @@ class TestTracerouteService:
             search="test"
         )
 
-        # Verify TraceroutePacket creation
+        # Verify TraceroutePacket creation; the row is enhanced in place
+        enhanced_tr = result["traceroutes"][0]
         mock_tr_packet_class.assert_called_once_with(
-            packet_data={
-                "id": "packet1",
-                "timestamp": 1234567890.0,
-                "from_node_id": 123,
-                "to_node_id": 456,
-                "raw_payload": b"test_payload"  # Should be converted from memoryview
-            },
-            resolve_names=True
+            packet_data=enhanced_tr, resolve_names=False
+        )
+        mock_tr_packet_class.resolve_node_names_bulk.assert_called_once_with(
+            [mock_tr_packet]
         )
+        assert enhanced_tr is mock_repository.return_value["packets"][0]
+        assert enhanced_tr["raw_payload"] == b"test_payload"
 
         # Verify enhanced fields
-        enhanced_tr = result["traceroutes"][0]
         assert enhanced_tr["has_return_path"] is True
         assert enhanced_tr["is_complete"] is True
         assert enhanced_tr["display_path"] == "Node1 -> Node2"
@@ -119,10 +118,11 @@ class TestTracerouteService:
 
         result = TracerouteService.get_traceroutes()
 
-        # Verify payload was converted from memoryview to bytes
+        # Verify the payload is passed through without copying it to bytes;
+        # TraceroutePacket and the API's base64 encoding accept memoryview
         call_args = mock_tr_packet_class.call_args[1]
         assert call_args["packet_data"]["raw_payload"] == test_payload
-        assert isinstance(call_args["packet_data"]["raw_payload"], bytes)
+        assert call_args["packet_data"]["raw_payload"] is mock_repository.return_value["packets"][0]["raw_payload"]
 
     @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_packets')
     @patch('src.malla.services.traceroute_service.TraceroutePacket')
@@ -282,4 +282,377 @@ class TestTracerouteService:
                 offset=0,     # Default page=1 -> offset=0
                 filters={},   # No filters by default
                 search=None   # No search by default
-            )
\ No newline at end of file
+            )
+
+class TestTracerouteAnalysis:
+    """Test cases for TracerouteService.get_traceroute_analysis."""
+
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_analysis_data')
+    @patch('src.malla.services.traceroute_service.get_analytics_cache')
+    def test_counts_come_from_aggregate(self, mock_cache, mock_data, mock_parse, mock_names):
+        """Success rate uses database counts; route stats use the parsed sample."""
+        mock_cache.return_value.get.return_value = None
+        mock_data.return_value = {
+            "total_count": 10,
+            "successful_count": 8,
+            "routes": [
+                {"from_node_id": 1, "to_node_id": 2, "raw_payload": b"a"},
+                {"from_node_id": 1, "to_node_id": 2, "raw_payload": b"b"},
+            ],
+        }
+        mock_parse.side_effect = [
+            {"route_nodes": [3], "route_back": [3]},
+            {"route_nodes": [3, 4, 5], "route_back": []},
+        ]
+        mock_names.side_effect = lambda ids: {node_id: f"n{node_id}" for node_id in ids}
+
+        result = TracerouteService.get_traceroute_analysis(hours=24)
+
+        assert result["total_traceroutes"] == 10
+        assert result["successful_traceroutes"] == 8
+        assert result["success_rate"] == 80.0
+        assert result["analyzed_traceroutes"] == 2
+        assert result["traceroutes_with_return"] == 1
+        assert result["return_path_rate"] == 50.0
+        assert result["unique_routes"] == 2
+        assert result["avg_route_length"] == 2.0
+        assert result["top_participating_nodes"][0] == {
+            "node_id": 1,
+            "node_name": "n1",
+            "participation_count": 2,
+        }
+        kwargs = mock_data.call_args.kwargs
+        assert kwargs["route_limit"] == 98
+        assert kwargs["end_time"] - kwargs["start_time"] == 24 * 3600
+        mock_cache.return_value.set.assert_called_once()
+
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_analysis_data')
+    @patch('src.malla.services.traceroute_service.get_analytics_cache')
+    def test_no_traceroutes(self, mock_cache, mock_data):
+        """An empty window returns zeroed statistics."""
+        mock_cache.return_value.get.return_value = None
+        mock_data.return_value = {"total_count": 0, "successful_count": 0, "routes": []}
+
+        result = TracerouteService.get_traceroute_analysis(hours=1)
+
+        assert result["total_traceroutes"] == 0
+        assert result["analyzed_traceroutes"] == 0
+        assert result["top_participating_nodes"] == []
+
+
+class TestNodeTracerouteStats:
+    """Test cases for TracerouteService.get_node_traceroute_stats."""
+
+    def setup_method(self):
+        """Start each test with an empty analytics cache."""
+        get_analytics_cache().clear()
+
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_packets')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_node_traceroute_counts')
+    def test_counts_and_forward_route_participation(
+        self, mock_counts, mock_packets, mock_routes, mock_parse, mock_names
+    ):
+        """Counts come from one query; hops from recent successful forward routes."""
+        mock_counts.return_value = {
+            "source_total": 4,
+            "source_successful": 3,
+            "dest_total": 2,
+            "dest_successful": 0,
+        }
+        mock_routes.return_value = [
+            {"raw_payload": b"a"},
+            {"raw_payload": b"b"},
+            {"raw_payload": b"c"},
+        ]
+        mock_parse.side_effect = [
+            {"route_nodes": [0x1234, 9]},
+            {"route_nodes": [9]},
+            {"route_nodes": [0x1234]},
+        ]
+        mock_names.return_value = {0x1234: "Node"}
+
+        result = TracerouteService.get_node_traceroute_stats(0x1234)
+
+        mock_counts.assert_called_once_with(0x1234)
+        mock_routes.assert_called_once_with(
+            filters={"processed_successfully_only": True}, limit=1000
+        )
+        mock_packets.assert_not_called()
+        assert result["node_name"] == "Node"
+        assert result["as_source"] == {"total": 4, "successful": 3, "success_rate": 75.0}
+        assert result["as_destination"]["success_rate"] == 0
+        assert result["as_intermediate_hop"] == {"participation_count": 2}
+        assert result["total_involvement"] == 8
+
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_node_traceroute_counts')
+    def test_result_is_cached(self, mock_counts, mock_routes, mock_names):
+        """Repeated calls for the same node are served from the cache."""
+        mock_counts.return_value = {
+            "source_total": 1,
+            "source_successful": 1,
+            "dest_total": 0,
+            "dest_successful": 0,
+        }
+        mock_routes.return_value = []
+        mock_names.return_value = {}
+
+        first = TracerouteService.get_node_traceroute_stats(7)
+        second = TracerouteService.get_node_traceroute_stats(7)
+
+        assert second == first
+        mock_counts.assert_called_once_with(7)
+
+
+class TestNetworkGraphData:
+    """Test cases for TracerouteService.get_network_graph_data."""
+
+    def setup_method(self):
+        """Start each test with an empty analytics cache."""
+        get_analytics_cache().clear()
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_node_names_resolved_once(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """Packets are built without names and graph nodes are named in one lookup."""
+        mock_routes.return_value = [
+            {"id": 1, "timestamp": 100.0, "raw_payload": b"a"},
+            {"id": 2, "timestamp": 200.0, "raw_payload": b"b"},
+        ]
+        mock_parse.return_value = {"snr_towards": [5.0], "snr_back": []}
+        hop = Mock(from_node_id=1, to_node_id=2, snr=5.0)
+        mock_tr_packet_class.return_value.get_rf_hops.return_value = [hop]
+        mock_names.return_value = {1: "One"}
+        mock_locations.return_value = []
+
+        result = TracerouteService.get_network_graph_data()
+
+        for call in mock_tr_packet_class.call_args_list:
+            assert call.kwargs["resolve_names"] is False
+            assert call.kwargs["pre_parsed_route_data"] is mock_parse.return_value
+        mock_names.assert_called_once_with([1, 2])
+        names = {node["id"]: node["name"] for node in result["nodes"]}
+        assert names == {1: "One", 2: "!00000002"}
+        assert result["links"][0]["packet_count"] == 2
+        assert result["stats"]["packets_analyzed"] == 2
+        assert mock_routes.call_args.kwargs["limit"] == 250
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_packets_without_snr_skipped(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """Packets without SNR readings are skipped before a TraceroutePacket is built."""
+        mock_routes.return_value = [{"id": 1, "timestamp": 100.0, "raw_payload": b""}]
+        mock_parse.return_value = {"snr_towards": [], "snr_back": []}
+        mock_names.return_value = {}
+        mock_locations.return_value = []
+
+        result = TracerouteService.get_network_graph_data()
+
+        mock_tr_packet_class.assert_not_called()
+        assert result["stats"]["packets_analyzed"] == 1
+        assert result["stats"]["packets_with_rf_hops"] == 0
+        assert result["nodes"] == []
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_bad_packet_skipped_during_aggregation(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """A packet that fails while its hops are aggregated is logged and skipped."""
+        mock_routes.return_value = [
+            {"id": 1, "timestamp": 100.0, "raw_payload": b"a"},
+            {"id": 2, "timestamp": None, "raw_payload": b"b"},
+        ]
+        mock_parse.return_value = {"snr_towards": [5.0], "snr_back": []}
+        hop = Mock(from_node_id=1, to_node_id=2, snr=5.0)
+        mock_tr_packet_class.return_value.get_rf_hops.return_value = [hop]
+        mock_names.return_value = {}
+        mock_locations.return_value = []
+
+        result = TracerouteService.get_network_graph_data()
+
+        assert [(link["source"], link["target"]) for link in result["links"]] == [(1, 2)]
+        assert result["stats"]["packets_analyzed"] == 2
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_link_and_node_aggregates(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """Links and nodes aggregate every hop that passes the SNR filters."""
+        mock_routes.return_value = [
+            {"id": 10, "timestamp": 100.0, "raw_payload": b"a"},
+            {"id": 11, "timestamp": 300.0, "raw_payload": b"b"},
+            {"id": 12, "timestamp": 200.0, "raw_payload": b"c"},
+        ]
+        mock_parse.return_value = {"snr_towards": [1.0], "snr_back": []}
+        hops_by_packet = [
+            [Mock(from_node_id=1, to_node_id=2, snr=4.0), Mock(from_node_id=2, to_node_id=3, snr=-30.0)],
+            [Mock(from_node_id=2, to_node_id=1, snr=6.0), Mock(from_node_id=1, to_node_id=0xFFFFFFFF, snr=2.0)],
+            [Mock(from_node_id=3, to_node_id=2, snr=0), Mock(from_node_id=2, to_node_id=4, snr=-10.0)],
+        ]
+        mock_tr_packet_class.side_effect = [
+            Mock(**{"get_rf_hops.return_value": hops}) for hops in hops_by_packet
+        ]
+        mock_names.return_value = {}
+        mock_locations.return_value = [{"node_id": 4, "latitude": 1.0, "longitude": 2.0}]
+
+        result = TracerouteService.get_network_graph_data(include_indirect=True)
+
+        links = {(link["source"], link["target"]): link for link in result["links"]}
+        assert set(links) == {(1, 2), (2, 4)}
+        assert links[(1, 2)]["avg_snr"] == 5.0
+        assert links[(1, 2)]["packet_count"] == 2
+        assert links[(1, 2)]["last_packet_id"] == 11
+        assert links[(2, 4)]["strength"] == 2.0
+
+        nodes = {node["id"]: node for node in result["nodes"]}
+        assert [node["id"] for node in result["nodes"]] == [1, 2, 4]
+        assert nodes[1]["packet_count"] == 2
+        assert nodes[1]["avg_snr"] == 4.0
+        assert nodes[1]["connections"] == 1
+        assert nodes[1]["last_seen"] == 300.0
+        assert nodes[2]["packet_count"] == 3
+        assert nodes[2]["avg_snr"] == -2.0
+        assert nodes[2]["connections"] == 2
+        assert nodes[4]["avg_snr"] is None
+        assert nodes[4]["location"]["latitude"] == 1.0
+
+        assert result["stats"]["links_filtered_by_snr"] == 1
+        assert result["stats"]["links_filtered_due_to_snr_0"] == 1
+        assert result["stats"]["total_rf_hops"] == 6
+        indirect = {(conn["source"], conn["target"]) for conn in result["indirect_connections"]}
+        assert indirect == {(1, 3), (2, 0xFFFFFFFF), (3, 4)}
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_min_snr_no_limit(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """A min_snr of -200 keeps every hop with an SNR reading."""
+        mock_routes.return_value = [{"id": 1, "timestamp": 100.0, "raw_payload": b"a"}]
+        mock_parse.return_value = {"snr_towards": [1.0], "snr_back": []}
+        mock_tr_packet_class.return_value.get_rf_hops.return_value = [
+            Mock(from_node_id=1, to_node_id=2, snr=-150.0),
+            Mock(from_node_id=2, to_node_id=3, snr=None),
+        ]
+        mock_names.return_value = {}
+        mock_locations.return_value = []
+
+        result = TracerouteService.get_network_graph_data(min_snr=-200)
+
+        assert [(link["source"], link["target"]) for link in result["links"]] == [(1, 2)]
+        assert result["stats"]["links_filtered_by_snr"] == 1
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TraceroutePacket')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_indirect_connection_without_snr(self, mock_routes, mock_parse, mock_tr_packet_class, mock_names, mock_locations):
+        """A multi-hop path with no usable SNR readings gets no average SNR."""
+        mock_routes.return_value = [{"id": 1, "timestamp": 100.0, "raw_payload": b"a"}]
+        mock_parse.return_value = {"snr_towards": [0.0], "snr_back": []}
+        mock_tr_packet_class.return_value.get_rf_hops.return_value = [
+            Mock(from_node_id=1, to_node_id=2, snr=0),
+            Mock(from_node_id=2, to_node_id=3, snr=None),
+        ]
+        mock_names.return_value = {}
+        mock_locations.return_value = []
+
+        result = TracerouteService.get_network_graph_data()
+
+        assert len(result["indirect_connections"]) == 1
+        assert result["indirect_connections"][0]["avg_snr"] is None
+        assert result["indirect_connections"][0]["hop_count"] == 2
+
+    @patch('src.malla.database.repositories.LocationRepository.get_node_locations')
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.get_traceroute_routes')
+    def test_result_is_cached_per_arguments(self, mock_routes, mock_names, mock_locations):
+        """Repeated calls with the same arguments are served from the cache."""
+        mock_routes.return_value = []
+        mock_names.return_value = {}
+        mock_locations.return_value = []
+
+        first = TracerouteService.get_network_graph_data(filters={"gateway_id": "!a"})
+        second = TracerouteService.get_network_graph_data(filters={"gateway_id": "!a"})
+        TracerouteService.get_network_graph_data(filters={"gateway_id": "!b"})
+
+        assert second is first
+        assert mock_routes.call_count == 2
+
+
+class TestRoutePatterns:
+    """Test cases for TracerouteService.get_route_patterns."""
+
+    def setup_method(self):
+        """Start each test with an empty analytics cache."""
+        get_analytics_cache().clear()
+
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.services.traceroute_service.parse_traceroute_payload')
+    @patch('src.malla.services.traceroute_service.TracerouteRepository.iter_recent_traceroute_routes')
+    def test_patterns_grouped_by_endpoints_and_route(self, mock_routes, mock_parse, mock_names):
+        """Both directions of a route count towards one pattern, most frequent first."""
+        mock_routes.return_value = iter([
+            {"id": 1, "timestamp": 10.0, "from_node_id": 1, "to_node_id": 2, "raw_payload": b"a"},
+            {"id": 2, "timestamp": 20.0, "from_node_id": 2, "to_node_id": 1, "raw_payload": b"a"},
+            {"id": 3, "timestamp": 30.0, "from_node_id": 1, "to_node_id": 3, "raw_payload": b"b"},
+            {"id": 4, "timestamp": 40.0, "from_node_id": 1, "to_node_id": 3, "raw_payload": b"c"},
+        ])
+        mock_parse.side_effect = [
+            {"route_nodes": [5]},
+            {"route_nodes": [6]},
+            {"route_nodes": []},
+        ]
+        mock_names.side_effect = lambda ids: {node_id: f"n{node_id}" for node_id in ids}
+
+        result = TracerouteService.get_route_patterns(limit=1)
+
+        mock_routes.assert_called_once_with(limit=1000)
+        assert mock_parse.call_count == 3  # The repeated payload is parsed once
+        assert result["total_patterns"] == 2
+        assert result["analyzed_traceroutes"] == 4
+        pattern = result["patterns"][0]
+        assert pattern["count"] == 2
+        assert pattern["endpoints"] == (1, 2)
+        assert [example["packet_id"] for example in pattern["examples"]] == [1, 2]
+        assert pattern["route_display"] == "n5"
+
+
+class TestLongestLinksAnalysis:
+    """Test cases for TracerouteService.get_longest_links_analysis."""
+
+    @patch('src.malla.services.traceroute_service.get_bulk_node_names')
+    @patch('src.malla.database.connection_postgres.get_postgres_connection')
+    @patch('src.malla.database.schema_tier_b.get_longest_links_optimized')
+    def test_summary_uses_longest_link(self, mock_links, mock_conn, mock_names):
+        """The summary reports the longest link and keeps the query order."""
+        mock_links.return_value = [
+            {"from_node_id": 1, "to_node_id": 2, "distance_km": 12.5},
+            {"from_node_id": 3, "to_node_id": 4, "distance_km": None},
+        ]
+        mock_conn.side_effect = RuntimeError("no database")
+        mock_names.return_value = {}
+
+        result = TracerouteService.get_longest_links_analysis()
+
+        assert result["summary"]["longest_direct"] == "12.50 km"
+        assert result["summary"]["longest_path"] == "N/A"
+        assert [link["from_node_id"] for link in result["direct_links"]] == [1, 3]
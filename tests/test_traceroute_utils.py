@@ -0,0 +1,53 @@
+"""Tests for traceroute_utils module."""
+
+from meshtastic.protobuf import mesh_pb2
+
+from src.malla.utils.traceroute_utils import (
+    _decode_route_discovery,
+    parse_traceroute_payload,
+)
+
+
+def _payload(route, snr_towards=(), route_back=(), snr_back=()):
+    route_discovery = mesh_pb2.RouteDiscovery()
+    route_discovery.route.extend(route)
+    route_discovery.snr_towards.extend(snr_towards)
+    route_discovery.route_back.extend(route_back)
+    route_discovery.snr_back.extend(snr_back)
+    return route_discovery.SerializeToString()
+
+
+class TestParseTraceroutePayload:
+    """Test cases for parse_traceroute_payload function."""
+
+    def setup_method(self):
+        """Start each test with an empty decode cache."""
+        _decode_route_discovery.cache_clear()
+
+    def test_parses_routes_and_snr(self):
+        """Route nodes are returned as-is and SNR values are scaled by 4."""
+        payload = _payload([1, 2], snr_towards=[20, -8], route_back=[3], snr_back=[4])
+
+        result = parse_traceroute_payload(memoryview(payload))
+
+        assert result == {
+            "route_nodes": [1, 2],
+            "snr_towards": [5.0, -2.0],
+            "route_back": [3],
+            "snr_back": [1.0],
+        }
+
+    def test_empty_payload(self):
+        """An empty payload gives empty routes."""
+        assert parse_traceroute_payload(b"")["route_nodes"] == []
+
+    def test_repeated_payload_decoded_once(self):
+        """The same payload is decoded once and each caller gets its own lists."""
+        payload = _payload([1, 2])
+
+        first = parse_traceroute_payload(payload)
+        first["route_nodes"].append(99)
+        second = parse_traceroute_payload(bytes(payload))
+
+        assert second["route_nodes"] == [1, 2]
+        assert _decode_route_discovery.cache_info().hits == 1